@@ -0,0 +1,42 @@
+# App/condicional.py
+"""
+GET condicional (ETag) para as páginas mais acessadas.
+
+Cada página monta sua ETag a partir de marcas baratas (versões em cache,
+data do dia), sem consultar as tabelas nem renderizar nada. Com o
+condition() do Django, uma visita repetida com o mesmo If-None-Match recebe
+304 antes de a view rodar.
+
+O usuário entra na ETag porque o cabeçalho do base.html mostra o nome dele,
+e o cookie do CSRF porque a página embute o token. Não há Last-Modified:
+as marcas não têm data (uma exclusão não muda a última atualização, por
+exemplo), e um cliente que só mandasse If-Modified-Since receberia 304 com
+conteúdo velho.
+"""
+import hashlib
+
+from django.conf import settings
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+
+def etag_da_pagina(request, *marcas):
+    user = request.user
+    dados = (
+        user.pk, user.get_username(), getattr(user, 'first_name', ''), getattr(user, 'last_name', ''), user.is_staff,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME), *marcas,
+    )
+    return hashlib.sha256(repr(dados).encode()).hexdigest()[:32]
+
+
+def get_condicional(marcas):
+    """
+    Decorador: `marcas(request, *args, **kwargs)` devolve o que identifica a
+    versão da página. A resposta sai com ETag e obriga o navegador a
+    revalidar (private, no-cache).
+    """
+    def decorador(view):
+        def etag(request, *args, **kwargs):
+            return etag_da_pagina(request, *marcas(request, *args, **kwargs))
+        return cache_control(private=True, no_cache=True)(condition(etag_func=etag)(view))
+    return decorador
@@ -0,0 +1,74 @@
+# App/consumers.py
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.utils import timezone
+
+from .fila_mensagens import obter_fila
+from .historico import POR_PAGINA, buffer, pagina_de_historico, pagina_do_buffer, serializar
+from .models import ChatMessage
+from .nao_lidas import marcar_como_lida
+
+TAMANHO_MAXIMO_MENSAGEM = 2000
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+
+        self.room_name = self.scope['url_route']['kwargs']['room_name']
+        self.room_group_name = f'chat_{self.room_name}'
+        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        buffer.entrar(self.room_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'room_group_name'):
+            await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+            buffer.sair(self.room_name)
+            # Não deixa mensagens desta conexão esperando o próximo lote
+            await obter_fila().descarregar()
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict):
+            return
+        if content.get('type') == 'history':
+            await self.enviar_historico(content.get('before'), content.get('limit'))
+            return
+        if content.get('type') == 'read':
+            await database_sync_to_async(marcar_como_lida)(self.user, self.room_name)
+            return
+
+        mensagem = content.get('message')
+        if not isinstance(mensagem, str) or not mensagem.strip():
+            return
+        mensagem = mensagem[:TAMANHO_MAXIMO_MENSAGEM]
+        agora = timezone.now()
+        dados = serializar(mensagem, self.user.username, agora)
+
+        # Broadcast imediato; a gravação no banco sai em lote pela fila. O buffer
+        # recebe a mensagem em chat_message, como as enviadas por outros processos
+        await obter_fila().adicionar(ChatMessage(
+            user_id=self.user.pk, room_name=self.room_name, message=mensagem, timestamp=agora,
+        ))
+        await self.channel_layer.group_send(self.room_group_name, {'type': 'chat.message', **dados})
+
+    async def enviar_historico(self, before=None, limite=None):
+        """Responde {'type': 'history', 'messages': [...], 'before': cursor}."""
+        limite = limite if isinstance(limite, int) else POR_PAGINA
+        # Replay ao entrar na sala: com o buffer quente não há ida ao banco
+        pagina = pagina_do_buffer(self.room_name, limite) if not before else None
+        if pagina is None:
+            pagina = await database_sync_to_async(pagina_de_historico)(self.room_name, before, limite)
+        await self.send_json({'type': 'history', **pagina})
+
+    async def chat_message(self, event):
+        buffer.adicionar(self.room_name, {campo: event.get(campo) for campo in ('id', 'message', 'username', 'timestamp')})
+        await self.send_json({
+            'message': event['message'],
+            'username': event['username'],
+            'timestamp': event['timestamp'],
+        })
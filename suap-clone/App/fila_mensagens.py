@@ -0,0 +1,122 @@
+# App/fila_mensagens.py
+"""
+Fila de gravação das mensagens do chat.
+
+O consumer faz o broadcast na hora e só enfileira a mensagem; uma tarefa em
+segundo plano grava os lotes com bulk_create. Com pouco tráfego cada lote sai
+em até INTERVALO_SEGUNDOS; sob carga os lotes crescem até TAMANHO_LOTE e um
+único INSERT grava centenas de mensagens, sem bloquear o event loop.
+
+Um lote que falha volta para a frente da fila e é tentado de novo, até
+MAXIMO_TENTATIVAS vezes seguidas. A fila guarda no máximo MAXIMO_PENDENTES
+mensagens: passando disso, quem envia espera uma gravação (contrapressão)
+em vez de acumular memória enquanto o banco está lento ou fora. O que estiver
+pendente é gravado quando um consumer desconecta e quando o servidor encerra
+(evento lifespan.shutdown, ver `ciclo_de_vida`).
+"""
+import asyncio
+import logging
+import weakref
+
+from channels.db import database_sync_to_async
+
+from .models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+INTERVALO_SEGUNDOS = 0.05
+MAXIMO_PENDENTES = 10 * TAMANHO_LOTE
+MAXIMO_TENTATIVAS = 3
+
+
+class FilaDeMensagens:
+
+    def __init__(self, tamanho_lote=TAMANHO_LOTE, intervalo=INTERVALO_SEGUNDOS,
+                 maximo_pendentes=MAXIMO_PENDENTES, maximo_tentativas=MAXIMO_TENTATIVAS):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.maximo_pendentes = maximo_pendentes
+        self.maximo_tentativas = maximo_tentativas
+        self._pendentes = []
+        # Falhas seguidas do lote que está na frente da fila
+        self._tentativas = 0
+        self._lote_cheio = asyncio.Event()
+        # Serializa as gravações: quem chama descarregar() espera a que estiver em andamento
+        self._gravando = asyncio.Lock()
+        self._tarefa = None
+
+    async def adicionar(self, mensagem):
+        # Cada gravação esvazia a fila ou, depois de MAXIMO_TENTATIVAS falhas, descarta o lote
+        while len(self._pendentes) >= self.maximo_pendentes:
+            await self.descarregar()
+        self._pendentes.append(mensagem)
+        if len(self._pendentes) >= self.tamanho_lote:
+            self._lote_cheio.set()
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.create_task(self._descarregar_periodicamente())
+
+    async def _descarregar_periodicamente(self):
+        # A tarefa termina quando a fila esvazia e é recriada na próxima mensagem
+        while self._pendentes:
+            try:
+                await asyncio.wait_for(self._lote_cheio.wait(), timeout=self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+            await self.descarregar()
+
+    async def descarregar(self):
+        """Grava tudo o que está pendente (e espera gravações em andamento)."""
+        async with self._gravando:
+            self._lote_cheio.clear()
+            lote, self._pendentes = self._pendentes, []
+            if not lote:
+                return
+            try:
+                await database_sync_to_async(ChatMessage.objects.bulk_create)(
+                    lote, batch_size=self.tamanho_lote
+                )
+            except Exception:
+                self._tentativas += 1
+                if self._tentativas >= self.maximo_tentativas:
+                    self._tentativas = 0
+                    logger.exception("Falha ao gravar %d mensagens do chat; descartadas após %d tentativas",
+                                     len(lote), self.maximo_tentativas)
+                    return
+                logger.warning("Falha ao gravar %d mensagens do chat; vão ser tentadas de novo",
+                               len(lote), exc_info=True)
+                # Antes das que chegaram durante a gravação, para manter a ordem
+                self._pendentes = lote + self._pendentes
+            else:
+                self._tentativas = 0
+
+
+_filas = weakref.WeakKeyDictionary()
+
+
+def obter_fila():
+    """Fila do event loop atual (objetos asyncio não podem ser compartilhados entre loops)."""
+    loop = asyncio.get_running_loop()
+    fila = _filas.get(loop)
+    if fila is None:
+        fila = _filas[loop] = FilaDeMensagens()
+    return fila
+
+
+async def ciclo_de_vida(scope, receive, send):
+    """App ASGI para o protocolo lifespan: grava o que estiver pendente quando o servidor encerra."""
+    while True:
+        evento = await receive()
+        if evento['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif evento['type'] == 'lifespan.shutdown':
+            fila = _filas.get(asyncio.get_running_loop())
+            if fila is not None:
+                await fila.descarregar()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def usar_fila(fila):
+    """Troca a fila do event loop atual (o bench_channels usa uma que não grava)."""
+    _filas[asyncio.get_running_loop()] = fila
@@ -0,0 +1,187 @@
+# App/historico.py
+"""
+Histórico das salas de chat.
+
+As mensagens mais recentes de cada sala ficam num buffer circular em memória,
+alimentado pelo ChatConsumer a cada mensagem que chega pelo grupo da sala.
+Quem entra na sala recebe o replay direto do buffer, sem consultar o banco;
+páginas mais antigas (`before=<cursor>`) vêm do banco pelo índice
+(room_name, timestamp).
+
+O buffer é por processo, aquecido a partir do banco na primeira leitura. Pelo
+channel layer cada processo recebe também as mensagens enviadas pelos outros,
+mas só das salas em que tem alguém conectado: o buffer só vale para essas
+salas e esfria quando o último consumer local sai.
+"""
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+
+from .models import ChatMessage
+
+TAMANHO_BUFFER = 50
+MAXIMO_SALAS = 1000
+POR_PAGINA = 50
+MAXIMO_POR_PAGINA = 100
+SALT_CURSOR = 'App.historico.cursor'
+
+
+def _instante(mensagem):
+    return datetime.fromisoformat(mensagem['timestamp'])
+
+
+def _identidade(mensagem):
+    # Mensagens ao vivo ainda não têm id: autor e instante (em microssegundos) as distinguem
+    return mensagem['timestamp'], mensagem['username'], mensagem['message']
+
+
+class BufferDeRecentes:
+    """Últimas TAMANHO_BUFFER mensagens de cada sala (LRU de até MAXIMO_SALAS salas)."""
+
+    def __init__(self, tamanho=TAMANHO_BUFFER, maximo_salas=MAXIMO_SALAS):
+        self.tamanho = tamanho
+        self.maximo_salas = maximo_salas
+        self._lock = threading.Lock()
+        # sala -> (deque de mensagens, completo?)
+        self._salas = OrderedDict()
+        # sala -> consumers conectados neste processo
+        self._ouvintes = {}
+
+    def entrar(self, sala):
+        with self._lock:
+            self._ouvintes[sala] = self._ouvintes.get(sala, 0) + 1
+
+    def sair(self, sala):
+        with self._lock:
+            restantes = self._ouvintes.get(sala, 0) - 1
+            if restantes > 0:
+                self._ouvintes[sala] = restantes
+                return
+            # Sem ninguém na sala, as mensagens dos outros processos deixam de chegar
+            self._ouvintes.pop(sala, None)
+            self._salas.pop(sala, None)
+
+    def ouvindo(self, sala):
+        with self._lock:
+            return sala in self._ouvintes
+
+    def _guardar(self, sala, mensagens, completo):
+        if sala not in self._ouvintes:
+            return
+        self._salas[sala] = (mensagens, completo)
+        self._salas.move_to_end(sala)
+        while len(self._salas) > self.maximo_salas:
+            self._salas.popitem(last=False)
+
+    def adicionar(self, sala, mensagem):
+        """Guarda a mensagem uma vez só, ainda que vários consumers da sala a recebam."""
+        with self._lock:
+            mensagens, completo = self._salas.get(sala, (None, False))
+            if mensagens is None:
+                # Sala fria: guarda a mensagem, mas o buffer só vale depois de aquecido
+                mensagens = deque(maxlen=self.tamanho)
+            identidade = _identidade(mensagem)
+            if any(_identidade(m) == identidade for m in mensagens):
+                return
+            mensagens.append(mensagem)
+            self._guardar(sala, mensagens, completo)
+
+    def aquecer(self, sala, do_banco):
+        """Preenche a sala com as mensagens lidas do banco (da mais antiga à mais nova)."""
+        with self._lock:
+            atuais, _ = self._salas.get(sala, ((), False))
+            ultima = _instante(do_banco[-1]) if do_banco else None
+            # Mensagens chegadas durante a leitura do banco continuam no fim
+            novas = [m for m in atuais if ultima is None or _instante(m) > ultima]
+            self._guardar(sala, deque(list(do_banco) + novas, maxlen=self.tamanho), True)
+
+    def recentes(self, sala):
+        """Lista das mensagens em buffer, ou None se a sala ainda não foi aquecida."""
+        with self._lock:
+            mensagens, completo = self._salas.get(sala, (None, False))
+            return list(mensagens) if completo else None
+
+    def limpar(self):
+        with self._lock:
+            self._salas.clear()
+
+
+buffer = BufferDeRecentes()
+
+
+def serializar(message, username, timestamp, id=None):
+    # id só existe depois da gravação em lote; mensagens ao vivo vão sem ele
+    return {'id': id, 'message': message, 'username': username, 'timestamp': timestamp.isoformat()}
+
+
+def codificar_cursor(mensagem):
+    # O id desempata mensagens com o mesmo timestamp na borda da página
+    return signing.dumps([mensagem['timestamp'], mensagem['id']], salt=SALT_CURSOR)
+
+
+def decodificar_cursor(token):
+    """(timestamp, id ou None) da mensagem mais antiga já entregue, ou None se o cursor é inválido."""
+    try:
+        instante, id_ = signing.loads(token, salt=SALT_CURSOR)
+        return datetime.fromisoformat(instante), id_ if isinstance(id_, int) else None
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def mensagens_do_banco(sala, antes=None, limite=POR_PAGINA):
+    """Até `limite` mensagens anteriores ao cursor `antes`, da mais antiga à mais nova."""
+    queryset = ChatMessage.objects.filter(room_name=sala)
+    if antes is not None:
+        instante, id_ = antes
+        if id_ is None:
+            # Mensagem ainda não gravada: não há como desempatar pelo id
+            queryset = queryset.filter(timestamp__lt=instante)
+        else:
+            # Mesma ordem do order_by abaixo: (-timestamp, -id)
+            queryset = queryset.filter(Q(timestamp__lt=instante) | Q(timestamp=instante, id__lt=id_))
+    linhas = queryset.order_by('-timestamp', '-id').values_list('message', 'user__username', 'timestamp', 'id')[:limite]
+    return [serializar(*linha) for linha in reversed(list(linhas))]
+
+
+def _pagina(mensagens, tem_mais):
+    return {
+        'messages': mensagens,
+        'before': codificar_cursor(mensagens[0]) if tem_mais and mensagens else None,
+    }
+
+
+def pagina_do_buffer(sala, limite=POR_PAGINA):
+    """
+    Página mais recente servida só da memória, ou None se o buffer da sala
+    estiver frio ou não tiver mensagens suficientes para a página.
+    """
+    limite = max(1, min(limite, MAXIMO_POR_PAGINA))
+    recentes = buffer.recentes(sala)
+    if recentes is None:
+        return None
+    # Buffer incompleto só quando está cheio: pode haver mensagens mais antigas no banco
+    if limite > len(recentes) and len(recentes) >= buffer.tamanho:
+        return None
+    return _pagina(recentes[-limite:], len(recentes) > limite or len(recentes) >= buffer.tamanho)
+
+
+def pagina_de_historico(sala, before=None, limite=POR_PAGINA):
+    """
+    Uma página do histórico: {'messages': [...], 'before': cursor ou None}.
+    Sem `before` (replay ao entrar na sala) usa o buffer, aquecendo-o a partir
+    do banco se for preciso; com `before`, lê a página anterior do banco.
+    """
+    limite = max(1, min(limite, MAXIMO_POR_PAGINA))
+    antes = decodificar_cursor(before) if before else None
+    if antes is None and buffer.ouvindo(sala):
+        if buffer.recentes(sala) is None:
+            buffer.aquecer(sala, mensagens_do_banco(sala, None, buffer.tamanho))
+        pagina = pagina_do_buffer(sala, limite)
+        if pagina is not None:
+            return pagina
+
+    mensagens = mensagens_do_banco(sala, antes, limite + 1)
+    return _pagina(mensagens[-limite:], len(mensagens) > limite)
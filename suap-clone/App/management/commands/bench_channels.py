@@ -0,0 +1,138 @@
+# App/management/commands/bench_channels.py
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from App.fila_mensagens import FilaDeMensagens, usar_fila
+from App.routing import websocket_urlpatterns
+
+
+class FilaDescartavel(FilaDeMensagens):
+    """Não grava nada: o benchmark mede só a camada de canais."""
+
+    async def adicionar(self, mensagem):
+        pass
+
+
+def _com_usuario(aplicacao, usuario):
+    # Autentica o cliente simulado direto no scope, sem sessão nem banco
+    async def app(scope, receive, send):
+        return await aplicacao({**scope, 'user': usuario}, receive, send)
+    return app
+
+
+def _percentil(valores, p):
+    if not valores:
+        return float('nan')
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a vazão e a latência de fan-out do chat: N clientes WebSocket "
+        "simulados enviam mensagens para a mesma sala em cada camada de canais."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=20)
+        parser.add_argument('--mensagens', type=int, default=50, help="Mensagens enviadas por cliente")
+        parser.add_argument('--backends', default=','.join(settings.CHANNEL_LAYERS_DISPONIVEIS),
+                            help="Camadas a testar, separadas por vírgula (chaves de CHANNEL_LAYERS_DISPONIVEIS)")
+        parser.add_argument('--intervalo', type=float, default=0.0,
+                            help="Pausa (s) entre as mensagens de cada cliente; 0 envia em rajada")
+        parser.add_argument('--sala', default='bench')
+        parser.add_argument('--timeout', type=float, default=5.0,
+                            help="Segundos sem receber nada até considerar as mensagens restantes perdidas")
+
+    def handle(self, *args, **options):
+        backends = [nome.strip() for nome in options['backends'].split(',') if nome.strip()]
+        desconhecidos = set(backends) - set(settings.CHANNEL_LAYERS_DISPONIVEIS)
+        if desconhecidos:
+            raise CommandError(f"Camadas desconhecidas: {', '.join(sorted(desconhecidos))}")
+        if options['clientes'] < 1 or options['mensagens'] < 1:
+            raise CommandError("--clientes e --mensagens devem ser positivos.")
+
+        self.stdout.write(
+            f"{'camada':<8} {'clientes':>8} {'enviadas':>9} {'entregas':>9} {'msg/s':>9} "
+            f"{'entregas/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'perdidas':>9}"
+        )
+        for nome in backends:
+            camada = settings.CHANNEL_LAYERS_DISPONIVEIS[nome]
+            try:
+                with override_settings(CHANNEL_LAYERS={'default': camada}):
+                    resultado = async_to_sync(self._rodar)(
+                        options['clientes'], options['mensagens'], options['sala'],
+                        options['timeout'], options['intervalo'],
+                    )
+            except Exception as erro:
+                self.stdout.write(self.style.WARNING(f"{nome:<8} indisponível: {erro!r}"))
+                continue
+
+            duracao, enviadas, latencias = resultado
+            esperadas = enviadas * options['clientes']
+            self.stdout.write(
+                f"{nome:<8} {options['clientes']:>8} {enviadas:>9} {len(latencias):>9} "
+                f"{enviadas / duracao:>9.0f} {len(latencias) / duracao:>11.0f} "
+                f"{_percentil(latencias, 50) * 1000:>8.2f} {_percentil(latencias, 99) * 1000:>8.2f} "
+                f"{esperadas - len(latencias):>9}"
+            )
+
+    async def _rodar(self, clientes, mensagens, sala, timeout, intervalo):
+        usar_fila(FilaDescartavel())
+        router = URLRouter(websocket_urlpatterns)
+        User = get_user_model()
+
+        comunicadores = []
+        try:
+            for i in range(clientes):
+                usuario = User(pk=-(i + 1), username=f'bench{i}')
+                comunicador = WebsocketCommunicator(_com_usuario(router, usuario), f'/ws/chat/{sala}/')
+                conectado, _ = await comunicador.connect(timeout=timeout)
+                if not conectado:
+                    raise CommandError(f"Cliente {i} não conseguiu conectar.")
+                comunicadores.append(comunicador)
+
+            total = clientes * mensagens
+            enviadas_em = {}
+            latencias = []
+            ultima_entrega = [time.perf_counter()]
+
+            async def enviar(i, comunicador):
+                for j in range(mensagens):
+                    texto = f'{i}:{j}'
+                    enviadas_em[texto] = time.perf_counter()
+                    await comunicador.send_json_to({'message': texto})
+                    if intervalo:
+                        await asyncio.sleep(intervalo)
+
+            async def receber(comunicador):
+                # Cada cliente recebe todas as mensagens da sala, inclusive as suas
+                for _ in range(total):
+                    try:
+                        dados = await comunicador.receive_json_from(timeout=timeout)
+                    except asyncio.TimeoutError:
+                        return
+                    agora = time.perf_counter()
+                    latencias.append(agora - enviadas_em[dados['message']])
+                    ultima_entrega[0] = max(ultima_entrega[0], agora)
+
+            inicio = time.perf_counter()
+            await asyncio.gather(
+                *(receber(c) for c in comunicadores),
+                *(enviar(i, c) for i, c in enumerate(comunicadores)),
+            )
+            # A duração vai até a última entrega (não inclui a espera do timeout)
+            return ultima_entrega[0] - inicio, total, latencias
+        finally:
+            for comunicador in comunicadores:
+                # Se um receive estourou o timeout, a aplicação daquele cliente já foi cancelada
+                if not comunicador.future.done():
+                    await comunicador.disconnect()
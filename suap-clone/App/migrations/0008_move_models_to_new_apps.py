@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App', '0007_remove_chamado_chat_room_name_alter_chamado_setor_and_more'),
+        ('Chamados', '0001_initial'),
+        ('Mural', '0001_initial'),
+    ]
+
+    # Card, Chamado e AtualizacaoChamado agora pertencem aos apps Mural e
+    # Chamados. As tabelas continuam no banco; só o estado do App é limpo.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='atualizacaochamado',
+                    name='chamado',
+                ),
+                migrations.RemoveField(
+                    model_name='atualizacaochamado',
+                    name='responsavel',
+                ),
+                migrations.RemoveField(
+                    model_name='chamado',
+                    name='criado_por',
+                ),
+                migrations.DeleteModel(
+                    name='AtualizacaoChamado',
+                ),
+                migrations.DeleteModel(
+                    name='Chamado',
+                ),
+                migrations.DeleteModel(
+                    name='Card',
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# App/models.py
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class ChatMessage(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    room_name = models.CharField(max_length=255)
+    message = models.TextField()
+    # Preenchido pelo consumer no momento do broadcast (a gravação sai depois, em lote)
+    timestamp = models.DateTimeField(default=timezone.now)
+    # Legado: a leitura agora é controlada por LeituraSala (marca d'água por sala)
+    is_read = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.user} em {self.room_name}: {self.message[:30]}"
+
+    class Meta:
+        ordering = ['timestamp']
+        indexes = [
+            # Histórico de uma sala: WHERE room_name = ? AND timestamp < ? ORDER BY timestamp DESC
+            models.Index(fields=['room_name', 'timestamp'], name='chat_sala_timestamp_idx'),
+        ]
+
+
+class LeituraSala(models.Model):
+    """
+    Marca d'água de leitura de um usuário numa sala: tudo o que chegou até
+    `ultima_leitura` está lido. Marcar a sala como lida é uma escrita numa
+    única linha, não importa quantas mensagens chegaram.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    room_name = models.CharField(max_length=255)
+    ultima_leitura = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.user} leu {self.room_name} até {self.ultima_leitura}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'room_name'], name='leitura_usuario_sala_unica'),
+        ]
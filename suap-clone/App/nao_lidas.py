@@ -0,0 +1,44 @@
+# App/nao_lidas.py
+"""
+Contagem de mensagens não lidas do chat a partir das marcas d'água de
+LeituraSala, sem atualizar ChatMessage.is_read mensagem a mensagem.
+"""
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ChatMessage, LeituraSala
+
+
+def nao_lidas_por_sala(user):
+    """
+    {sala: quantidade} para todas as salas acompanhadas pelo usuário, numa
+    única consulta (uma subconsulta correlacionada por sala, pelo índice
+    room_name + timestamp). Mensagens do próprio usuário não contam.
+    """
+    novas = (
+        ChatMessage.objects
+        .filter(room_name=OuterRef('room_name'), timestamp__gt=OuterRef('ultima_leitura'))
+        .exclude(user_id=user.pk)
+        .order_by()
+        .values('room_name')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    salas = (
+        LeituraSala.objects
+        .filter(user=user)
+        .annotate(nao_lidas=Coalesce(Subquery(novas), 0))
+        .values_list('room_name', 'nao_lidas')
+    )
+    return dict(salas)
+
+
+def marcar_como_lida(user, room_name, instante=None):
+    """Move a marca d'água da sala para `instante` (agora) com um único upsert."""
+    LeituraSala.objects.bulk_create(
+        [LeituraSala(user=user, room_name=room_name, ultima_leitura=instante or timezone.now())],
+        update_conflicts=True,
+        unique_fields=['user', 'room_name'],
+        update_fields=['ultima_leitura'],
+    )
@@ -0,0 +1,9 @@
+# App/routing.py
+from django.urls import re_path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    # Nomes de grupo do Channels só aceitam ASCII, '-', '_' e '.'
+    re_path(r'^ws/chat/(?P<room_name>[A-Za-z0-9_-]{1,80})/$', consumers.ChatConsumer.as_asgi()),
+]
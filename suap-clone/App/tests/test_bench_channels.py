@@ -0,0 +1,26 @@
+# App/tests/test_bench_channels.py
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+
+class BenchChannelsCommandTestCase(SimpleTestCase):
+    """ manage.py bench_channels na camada em memória (não precisa de Redis nem de banco) """
+
+    def test_reports_throughput_and_latency(self):
+        saida = StringIO()
+        call_command('bench_channels', clientes=3, mensagens=4, backends='memory', stdout=saida)
+        linhas = saida.getvalue().splitlines()
+        self.assertIn('p99 ms', linhas[0])
+        colunas = linhas[1].split()
+        self.assertEqual(colunas[0], 'memory')
+        # 3 clientes x 4 mensagens, cada uma entregue aos 3 clientes, nada perdido
+        self.assertEqual(colunas[2:4], ['12', '36'])
+        self.assertEqual(colunas[-1], '0')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(CommandError):
+            call_command('bench_channels', backends='rabbit', stdout=StringIO())
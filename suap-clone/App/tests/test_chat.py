@@ -1,18 +1,32 @@
 # App/tests/test_chat.py
 
+from datetime import timedelta
+from unittest import mock
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
 from django.test import TransactionTestCase
-from django.contrib.sessions.models import Session
-from django.contrib.auth import SESSION_KEY
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from asgiref.testing import ApplicationCommunicator
 from channels.testing import WebsocketCommunicator
 from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
 
 from core.asgi import application
-from ..models import ChatMessage
+from ..fila_mensagens import FilaDeMensagens, obter_fila, usar_fila
+from ..historico import TAMANHO_BUFFER, buffer
+from ..models import ChatMessage, LeituraSala
+from ..nao_lidas import marcar_como_lida, nao_lidas_por_sala
 
 User = get_user_model()
 
+# Os sockets só aceitam conexões vindas das páginas do próprio site (ALLOWED_HOSTS)
+ORIGEM = (b"origin", b"http://localhost")
+
 pytestmark = pytest.mark.django_db(transaction=True)
 
 
@@ -22,38 +36,32 @@ class ChatConsumerTestCase(TransactionTestCase):
     """
     room_name = "geral"
 
-    @classmethod
-    def setUpClass(cls):
+    def setUp(self):
         """
-        Cria os usuários e suas sessões uma vez para toda a classe de teste.
-        Isso garante que a transação seja confirmada e os dados estejam
-        visíveis para o processo do consumer.
+        Cria os usuários e suas sessões antes de cada teste. O
+        TransactionTestCase esvazia o banco ao fim de cada teste, então dados
+        criados uma vez só (em setUpClass) sumiriam depois do primeiro teste.
         """
-        super().setUpClass()
-        cls.user1 = User.objects.create_user(username='user1', password='password123')
-        cls.user2 = User.objects.create_user(username='user2', password='password123')
+        super().setUp()
+        self.user1 = User.objects.create_user(username='user1', password='password123')
+        self.user2 = User.objects.create_user(username='user2', password='password123')
 
-        # Cria as sessões de forma síncrona, pois setUpClass não é async
+        # Cria as sessões de forma síncrona, pois setUp não é async
         from django.contrib.sessions.backends.db import SessionStore
         
         session1 = SessionStore()
-        session1[SESSION_KEY] = cls.user1.pk
+        session1[SESSION_KEY] = self.user1.pk
+        session1[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session1[HASH_SESSION_KEY] = self.user1.get_session_auth_hash()
         session1.create()
-        cls.session_key1 = session1.session_key
+        self.session_key1 = session1.session_key
 
         session2 = SessionStore()
-        session2[SESSION_KEY] = cls.user2.pk
+        session2[SESSION_KEY] = self.user2.pk
+        session2[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session2[HASH_SESSION_KEY] = self.user2.get_session_auth_hash()
         session2.create()
-        cls.session_key2 = session2.session_key
-
-    @classmethod
-    def tearDownClass(cls):
-        """
-        Limpa os dados criados para a classe.
-        """
-        Session.objects.all().delete()
-        User.objects.all().delete()
-        super().tearDownClass()
+        self.session_key2 = session2.session_key
 
 
     async def test_authenticated_user_can_connect(self):
@@ -63,7 +71,7 @@ class ChatConsumerTestCase(TransactionTestCase):
         communicator = WebsocketCommunicator(
             application,
             f"/ws/chat/{self.room_name}/",
-            headers=[(b"cookie", f"sessionid={self.session_key1}".encode("ascii"))]
+            headers=[(b"cookie", f"sessionid={self.session_key1}".encode("ascii")), ORIGEM]
         )
         
         connected, subprotocol = await communicator.connect(timeout=5)
@@ -78,14 +86,14 @@ class ChatConsumerTestCase(TransactionTestCase):
         communicator1 = WebsocketCommunicator(
             application,
             f"/ws/chat/{self.room_name}/",
-            headers=[(b"cookie", f"sessionid={self.session_key1}".encode("ascii"))]
+            headers=[(b"cookie", f"sessionid={self.session_key1}".encode("ascii")), ORIGEM]
         )
         await communicator1.connect(timeout=5)
 
         communicator2 = WebsocketCommunicator(
             application,
             f"/ws/chat/{self.room_name}/",
-            headers=[(b"cookie", f"sessionid={self.session_key2}".encode("ascii"))]
+            headers=[(b"cookie", f"sessionid={self.session_key2}".encode("ascii")), ORIGEM]
         )
         await communicator2.connect(timeout=5)
 
@@ -101,7 +109,8 @@ class ChatConsumerTestCase(TransactionTestCase):
         self.assertEqual(response1['username'], self.user1.username)
         self.assertEqual(response2, response1, "Usuário 2 deveria receber a mesma mensagem que o Usuário 1.")
 
-        # A verificação no banco de dados agora deve funcionar corretamente
+        # A gravação é feita em lote pela fila; espera o lote pendente ser gravado
+        await obter_fila().descarregar()
         message_exists = await database_sync_to_async(ChatMessage.objects.filter(
             user_id=self.user1.pk,
             message=test_message,
@@ -112,3 +121,271 @@ class ChatConsumerTestCase(TransactionTestCase):
 
         await communicator1.disconnect()
         await communicator2.disconnect()
+
+    async def test_anonymous_user_is_rejected(self):
+        communicator = WebsocketCommunicator(application, f"/ws/chat/{self.room_name}/", headers=[ORIGEM])
+        connected, _ = await communicator.connect(timeout=5)
+        self.assertFalse(connected)
+
+    async def test_foreign_origin_is_rejected(self):
+        """
+        Página de outro site abrindo o socket com o cookie de sessão do
+        usuário (cross-site WebSocket hijacking).
+        """
+        for origem in ([(b"origin", b"https://site-malicioso.example")], []):
+            communicator = WebsocketCommunicator(
+                application,
+                f"/ws/chat/{self.room_name}/",
+                headers=[(b"cookie", f"sessionid={self.session_key1}".encode("ascii"))] + origem,
+            )
+            connected, _ = await communicator.connect(timeout=5)
+            self.assertFalse(connected)
+
+    async def test_burst_of_messages_is_saved_in_batches(self):
+        """
+        Uma rajada de mensagens é transmitida na ordem e gravada em lotes,
+        não com um INSERT por mensagem.
+        """
+        communicator = WebsocketCommunicator(
+            application,
+            f"/ws/chat/{self.room_name}/",
+            headers=[(b"cookie", f"sessionid={self.session_key1}".encode("ascii")), ORIGEM]
+        )
+        await communicator.connect(timeout=5)
+
+        total = 100
+        for i in range(total):
+            await communicator.send_json_to({"message": f"mensagem {i}"})
+        recebidas = [(await communicator.receive_json_from(timeout=5))['message'] for _ in range(total)]
+        self.assertEqual(recebidas, [f"mensagem {i}" for i in range(total)])
+
+        await obter_fila().descarregar()
+        salvas = await database_sync_to_async(ChatMessage.objects.filter(
+            room_name=self.room_name, message__startswith="mensagem "
+        ).count)()
+        self.assertEqual(salvas, total)
+
+        await communicator.disconnect()
+
+    async def test_history_replay_and_before_cursor(self):
+        """
+        O replay ao entrar vem do buffer em memória; páginas mais antigas
+        vêm do banco pelo cursor `before`.
+        """
+        buffer.limpar()
+        sala = "historico"
+        # Mensagens antigas, já gravadas, e a sala ainda fria neste processo
+        await database_sync_to_async(ChatMessage.objects.bulk_create)([
+            ChatMessage(user=self.user1, room_name=sala, message=f"antiga {i}",
+                        timestamp=timezone.now() - timedelta(minutes=100 - i))
+            for i in range(TAMANHO_BUFFER + 10)
+        ])
+        communicator = WebsocketCommunicator(
+            application,
+            f"/ws/chat/{sala}/",
+            headers=[(b"cookie", f"sessionid={self.session_key2}".encode("ascii")), ORIGEM]
+        )
+        await communicator.connect(timeout=5)
+        await communicator.send_json_to({"message": "nova"})
+        await communicator.receive_json_from(timeout=5)
+
+        await communicator.send_json_to({"type": "history", "limit": 20})
+        pagina = await communicator.receive_json_from(timeout=5)
+        self.assertEqual(pagina['type'], 'history')
+        self.assertEqual([m['message'] for m in pagina['messages']],
+                         [f"antiga {i}" for i in range(TAMANHO_BUFFER - 9, TAMANHO_BUFFER + 10)] + ["nova"])
+
+        # Com o buffer quente, o replay não consulta o banco
+        with mock.patch('App.consumers.pagina_de_historico') as leitura_do_banco:
+            await communicator.send_json_to({"type": "history", "limit": 20})
+            replay = await communicator.receive_json_from(timeout=5)
+        leitura_do_banco.assert_not_called()
+        self.assertEqual(replay, pagina)
+
+        await communicator.send_json_to({"type": "history", "before": pagina['before'], "limit": 20})
+        anterior = await communicator.receive_json_from(timeout=5)
+        self.assertEqual([m['message'] for m in anterior['messages']],
+                         [f"antiga {i}" for i in range(TAMANHO_BUFFER - 29, TAMANHO_BUFFER - 9)])
+
+        await communicator.disconnect()
+        await obter_fila().descarregar()
+
+    async def test_replay_includes_messages_sent_by_other_processes(self):
+        buffer.limpar()
+        sala = "outros-processos"
+        communicators = [
+            WebsocketCommunicator(application, f"/ws/chat/{sala}/",
+                                  headers=[(b"cookie", f"sessionid={chave}".encode("ascii")), ORIGEM])
+            for chave in (self.session_key1, self.session_key2)
+        ]
+        for communicator in communicators:
+            await communicator.connect(timeout=5)
+        await communicators[0].send_json_to({"type": "history"})
+        await communicators[0].receive_json_from(timeout=5)
+
+        # Enviada por um consumer de outro processo: chega só pelo channel layer
+        await get_channel_layer().group_send(f"chat_{sala}", {
+            "type": "chat.message", "id": None, "message": "de fora",
+            "username": "user1", "timestamp": timezone.now().isoformat(),
+        })
+        for communicator in communicators:
+            await communicator.receive_json_from(timeout=5)
+
+        # Os dois consumers receberam a mensagem, mas ela entra uma vez só no buffer
+        with mock.patch('App.consumers.pagina_de_historico') as leitura_do_banco:
+            await communicators[1].send_json_to({"type": "history"})
+            replay = await communicators[1].receive_json_from(timeout=5)
+        leitura_do_banco.assert_not_called()
+        self.assertEqual([m['message'] for m in replay['messages']], ["de fora"])
+
+        for communicator in communicators:
+            await communicator.disconnect()
+        # Sem ninguém na sala o buffer esfria: as próximas mensagens não chegariam a ele
+        self.assertIsNone(buffer.recentes(sala))
+
+    def test_history_http_endpoint(self):
+        buffer.limpar()
+        ChatMessage.objects.bulk_create([
+            ChatMessage(user=self.user1, room_name="http", message=f"m{i}",
+                        timestamp=timezone.now() - timedelta(seconds=10 - i))
+            for i in range(5)
+        ])
+        self.client.force_login(self.user2)
+        url = reverse('App:historico_chat', args=["http"])
+        pagina = self.client.get(url, {'limit': 3}).json()
+        self.assertEqual([m['message'] for m in pagina['messages']], ["m2", "m3", "m4"])
+        self.assertEqual(pagina['messages'][0]['username'], 'user1')
+        anterior = self.client.get(url, {'limit': 3, 'before': pagina['before']}).json()
+        self.assertEqual([m['message'] for m in anterior['messages']], ["m0", "m1"])
+        self.assertIsNone(anterior['before'])
+
+    def test_history_cursor_keeps_messages_with_the_same_timestamp(self):
+        buffer.limpar()
+        instante = timezone.now() - timedelta(seconds=10)
+        # Gravadas no mesmo lote, com o mesmo timestamp
+        ChatMessage.objects.bulk_create([
+            ChatMessage(user=self.user1, room_name="empate", message=f"m{i}", timestamp=instante)
+            for i in range(5)
+        ])
+        self.client.force_login(self.user2)
+        url = reverse('App:historico_chat', args=["empate"])
+        pagina = self.client.get(url, {'limit': 2}).json()
+        recebidas = [m['message'] for m in pagina['messages']]
+        while pagina['before']:
+            pagina = self.client.get(url, {'limit': 2, 'before': pagina['before']}).json()
+            recebidas = [m['message'] for m in pagina['messages']] + recebidas
+        self.assertEqual(recebidas, [f"m{i}" for i in range(5)])
+
+    def test_unread_counts_use_read_watermarks(self):
+        agora = timezone.now()
+        ChatMessage.objects.bulk_create(
+            [ChatMessage(user=self.user1, room_name="sala-a", message=f"a{i}", timestamp=agora - timedelta(minutes=i))
+             for i in range(5)]
+            + [ChatMessage(user=self.user1, room_name="sala-b", message="b", timestamp=agora)]
+            + [ChatMessage(user=self.user2, room_name="sala-b", message="minha", timestamp=agora)]
+        )
+        marcar_como_lida(self.user2, "sala-a", agora - timedelta(minutes=2, seconds=30))
+        marcar_como_lida(self.user2, "sala-b", agora - timedelta(hours=1))
+
+        with self.assertNumQueries(1):
+            contagem = nao_lidas_por_sala(self.user2)
+        # As próprias mensagens não contam como não lidas
+        self.assertEqual(contagem, {"sala-a": 3, "sala-b": 1})
+
+        self.client.force_login(self.user2)
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.post(reverse('App:marcar_chat_lido', args=["sala-a"]))
+        # Um único upsert na marca d'água, nenhuma escrita em ChatMessage
+        escritas = [q['sql'] for q in consultas.captured_queries
+                    if q['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(len(escritas), 1)
+        self.assertIn('App_leiturasala', escritas[0])
+        response = self.client.get(reverse('App:chat_nao_lidas'))
+        self.assertEqual(response.json()['rooms'], {"sala-a": 0, "sala-b": 1})
+        self.assertEqual(LeituraSala.objects.filter(user=self.user2).count(), 2)
+
+    async def test_read_message_over_websocket_moves_watermark(self):
+        communicator = WebsocketCommunicator(
+            application,
+            f"/ws/chat/{self.room_name}/",
+            headers=[(b"cookie", f"sessionid={self.session_key2}".encode("ascii")), ORIGEM]
+        )
+        await communicator.connect(timeout=5)
+        await communicator.send_json_to({"type": "read"})
+        await communicator.disconnect()
+        lida = await database_sync_to_async(LeituraSala.objects.filter(
+            user=self.user2, room_name=self.room_name
+        ).exists)()
+        self.assertTrue(lida)
+
+
+class FilaDeMensagensTestCase(TransactionTestCase):
+    """Gravação em lote das mensagens: falhas, limite da fila e descarga final."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='user1', password='password123')
+        self.client.force_login(self.user)
+        self.cookie = f"sessionid={self.client.cookies['sessionid'].value}".encode("ascii")
+
+    def mensagem(self, texto):
+        return ChatMessage(user_id=self.user.pk, room_name="fila", message=texto, timestamp=timezone.now())
+
+    async def salvas(self):
+        return await database_sync_to_async(lambda: list(
+            ChatMessage.objects.filter(room_name="fila").order_by('id').values_list('message', flat=True)
+        ))()
+
+    async def test_failed_batch_is_retried(self):
+        fila = FilaDeMensagens(intervalo=60)
+        await fila.adicionar(self.mensagem("a"))
+        gravar = ChatMessage.objects.bulk_create
+        with mock.patch.object(ChatMessage.objects, 'bulk_create', side_effect=OperationalError), \
+                self.assertLogs('App.fila_mensagens', 'WARNING'):
+            await fila.descarregar()
+        await fila.adicionar(self.mensagem("b"))
+        with mock.patch.object(ChatMessage.objects, 'bulk_create', side_effect=gravar) as bulk_create:
+            await fila.descarregar()
+        self.assertEqual(await self.salvas(), ["a", "b"])
+        self.assertEqual(len(bulk_create.call_args.args[0]), 2)
+
+    async def test_batch_is_dropped_after_the_retry_limit(self):
+        fila = FilaDeMensagens(intervalo=60, maximo_tentativas=2)
+        await fila.adicionar(self.mensagem("a"))
+        with mock.patch.object(ChatMessage.objects, 'bulk_create', side_effect=OperationalError), \
+                self.assertLogs('App.fila_mensagens', 'WARNING') as logs:
+            await fila.descarregar()
+            await fila.descarregar()
+        self.assertEqual([registro.levelname for registro in logs.records], ['WARNING', 'ERROR'])
+        await fila.adicionar(self.mensagem("b"))
+        await fila.descarregar()
+        self.assertEqual(await self.salvas(), ["b"])
+
+    async def test_full_queue_makes_the_sender_wait_for_a_write(self):
+        fila = FilaDeMensagens(intervalo=60, maximo_pendentes=3)
+        for i in range(3):
+            await fila.adicionar(self.mensagem(f"m{i}"))
+        self.assertEqual(await self.salvas(), [])
+        await fila.adicionar(self.mensagem("m3"))
+        self.assertEqual(await self.salvas(), ["m0", "m1", "m2"])
+        await fila.descarregar()
+
+    async def test_pending_messages_are_saved_on_disconnect(self):
+        communicator = WebsocketCommunicator(application, "/ws/chat/fila/", headers=[(b"cookie", self.cookie), ORIGEM])
+        await communicator.connect(timeout=5)
+        usar_fila(FilaDeMensagens(intervalo=60))
+        await communicator.send_json_to({"message": "ultima"})
+        await communicator.receive_json_from(timeout=5)
+        await communicator.disconnect()
+        self.assertEqual(await self.salvas(), ["ultima"])
+
+    async def test_pending_messages_are_saved_on_shutdown(self):
+        fila = FilaDeMensagens(intervalo=60)
+        usar_fila(fila)
+        await fila.adicionar(self.mensagem("pendente"))
+        servidor = ApplicationCommunicator(application, {'type': 'lifespan'})
+        await servidor.send_input({'type': 'lifespan.startup'})
+        self.assertEqual(await servidor.receive_output(), {'type': 'lifespan.startup.complete'})
+        await servidor.send_input({'type': 'lifespan.shutdown'})
+        self.assertEqual(await servidor.receive_output(), {'type': 'lifespan.shutdown.complete'})
+        self.assertEqual(await self.salvas(), ["pendente"])
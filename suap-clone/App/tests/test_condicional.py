@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from Calendario.models import Evento
+from Chamados.models import Chamado
+from Mural.models import Card
+
+
+class GetCondicionalTestCase(TestCase):
+    """ ETag nas páginas mais acessadas: 304 sem renderizar quando nada mudou """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        Card.objects.create(titulo='Aviso geral', descricao='...')
+        self.client.login(username='testuser', password='password123')
+
+    def _revalidar(self, url):
+        # A primeira visita cria o cookie do CSRF, que faz parte da ETag
+        self.client.get(url)
+        primeira = self.client.get(url)
+        self.assertEqual(primeira.status_code, 200)
+        self.assertIn('no-cache', primeira['Cache-Control'])
+        self.assertIn('private', primeira['Cache-Control'])
+        return primeira['ETag']
+
+    def assertNaoModificado(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertTemplateNotUsed(response, 'base.html')
+
+    def test_home(self):
+        url = reverse('App:home')
+        etag = self._revalidar(url)
+        self.assertNaoModificado(url, etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Card.objects.create(titulo='Aviso novo', descricao='...')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_home_differs_between_users(self):
+        url = reverse('App:home')
+        etag = self._revalidar(url)
+        User.objects.create_user(username='outro', password='password123')
+        self.client.login(username='outro', password='password123')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_ticket_list(self):
+        url = reverse('Chamados:ver_chamados')
+        etag = self._revalidar(url)
+        self.assertNaoModificado(url, etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Chamado.objects.create(criado_por=self.user, assunto='Sem rede')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Sem rede')
+
+    def test_calendar(self):
+        url = reverse('Calendario:calendario')
+        etag = self._revalidar(url)
+        self.assertNaoModificado(url, etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Evento.objects.create(titulo='Conselho de classe', data_evento=timezone.localdate())
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_anonymous_is_redirected_before_etag(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('App:home')).status_code, 302)
@@ -1,9 +1,12 @@
 
 from django.test import TestCase, Client
+from django.core.cache import cache
 from django.urls import reverse
 from django.contrib.auth.models import User
-from ..models import Card, Chamado 
-from ..forms import CardForm, ChamadoForm      
+from Mural.models import Card
+from Mural.forms import CardForm
+from Chamados.models import Chamado
+from Chamados.busca import indice
 
 
 class BaseTestCase(TestCase):
@@ -11,6 +14,7 @@ class BaseTestCase(TestCase):
     Configuração base para os testes, criando usuários e o cliente de teste.
     """
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(username='testuser', password='password123')
         self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
@@ -22,27 +26,27 @@ class CardViewsTestCase(BaseTestCase):
     def test_home_view(self):
         self.client.login(username='testuser', password='password123')
 
-        response = self.client.get(reverse('home'))
+        response = self.client.get(reverse('App:home'))
         self.assertEqual(response.status_code, 200) 
         self.assertTemplateUsed(response, 'App/home.html')
-        self.assertIn(self.card, response.context['cards'])
+        self.assertContains(response, f'data-card-id="{self.card.id}"')
 
     def test_criar_card_get_request_as_staff(self):
         self.client.login(username='staffuser', password='password123')
-        response = self.client.get(reverse('criar_card'))
+        response = self.client.get(reverse('Mural:criar_card'))
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.context['form'], CardForm)
 
     def test_criar_card_redirects_if_not_staff(self):
         self.client.login(username='testuser', password='password123')
-        response = self.client.get(reverse('criar_card'))
+        response = self.client.get(reverse('Mural:criar_card'))
         self.assertEqual(response.status_code, 302) # Redireciona para a página de login
         self.assertIn('/admin/login/', response.url) 
 
     def test_criar_card_post_request_success(self):
         self.client.login(username='staffuser', password='password123')
         card_count_before = Card.objects.count()
-        response = self.client.post(reverse('criar_card'), {'titulo': 'Novo Card', 'descricao': 'Nova Descricao'})
+        response = self.client.post(reverse('Mural:criar_card'), {'titulo': 'Novo Card', 'descricao': 'Nova Descricao'})
         self.assertEqual(response.status_code, 302) # Redireciona para 'home'
         self.assertEqual(Card.objects.count(), card_count_before + 1)
         self.assertTrue(Card.objects.filter(titulo='Novo Card').exists())
@@ -50,7 +54,7 @@ class CardViewsTestCase(BaseTestCase):
     def test_criar_card_post_ajax_success(self):
         self.client.login(username='staffuser', password='password123')
         response = self.client.post(
-            reverse('criar_card'),
+            reverse('Mural:criar_card'),
             {'titulo': 'Card via AJAX', 'descricao': 'Descricao'},
             HTTP_X_REQUESTED_WITH='XMLHttpRequest'
         )
@@ -64,13 +68,13 @@ class CardViewsTestCase(BaseTestCase):
         card_to_delete = Card.objects.create(titulo='Para Deletar', descricao='...')
         card_count_before = Card.objects.count()
         
-        response = self.client.post(reverse('deletar_card', args=[card_to_delete.id]))
+        response = self.client.post(reverse('Mural:deletar_card', args=[card_to_delete.id]))
         self.assertEqual(response.status_code, 302)
         self.assertEqual(Card.objects.count(), card_count_before - 1)
         
     def test_deletar_card_get_not_allowed(self):
         self.client.login(username='staffuser', password='password123')
-        response = self.client.get(reverse('deletar_card', args=[self.card.id]))
+        response = self.client.get(reverse('Mural:deletar_card', args=[self.card.id]))
         self.assertEqual(response.status_code, 405) # Method Not Allowed
 
 
@@ -94,7 +98,7 @@ class ChamadoViewsTestCase(BaseTestCase):
         )
 
     def test_criar_chamado_redirects_if_not_logged_in(self):
-        response = self.client.get(reverse('criar_chamado'))
+        response = self.client.get(reverse('Chamados:criar_chamado'))
         self.assertEqual(response.status_code, 302)
         self.assertIn('/usuarios/login/', response.url)
 
@@ -110,7 +114,7 @@ class ChamadoViewsTestCase(BaseTestCase):
         }
 
         response = self.client.post(
-            reverse('criar_chamado'),
+            reverse('Chamados:criar_chamado'),
             form_data,
             HTTP_X_REQUESTED_WITH='XMLHttpRequest'
         )
@@ -128,7 +132,7 @@ class ChamadoViewsTestCase(BaseTestCase):
     def test_criar_chamado_post_ajax_invalid_form(self):
         self.client.login(username='testuser', password='password123')
         response = self.client.post(
-            reverse('criar_chamado'),
+            reverse('Chamados:criar_chamado'),
             {'assunto': '', 'descricao': ''}, # Dados inválidos
             HTTP_X_REQUESTED_WITH='XMLHttpRequest'
         )
@@ -139,7 +143,7 @@ class ChamadoViewsTestCase(BaseTestCase):
 
     def test_ver_chamados_shows_only_own_chamados(self):
         self.client.login(username='testuser', password='password123')
-        response = self.client.get(reverse('ver_chamados'))
+        response = self.client.get(reverse('Chamados:ver_chamados'))
         
         self.assertEqual(response.status_code, 200)
         self.assertIn(self.chamado_user1, response.context['chamados'])
@@ -150,41 +154,75 @@ class AdminViewsTestCase(BaseTestCase):
 
     def setUp(self):
         super().setUp()
+        cache.clear()
+        indice.limpar()
         Chamado.objects.create(criado_por=self.user, assunto='Aberto 1', status='aberto')
         Chamado.objects.create(criado_por=self.user, assunto='Resolvido 1', status='resolvido')
+        Chamado.objects.create(criado_por=self.user, assunto='Aberto 2', status='aberto')
 
     def test_dashboard_admin_access_by_staff(self):
         self.client.login(username='staffuser', password='password123')
-        response = self.client.get(reverse('dashboard_admin'))
+        response = self.client.get(reverse('App:dashboard_admin'))
         self.assertEqual(response.status_code, 200)
-        self.assertTemplateUsed(response, 'App/pages/dashboard_admin.html')
+        self.assertTemplateUsed(response, 'App/dashboard_admin.html')
         
         # Testa o contexto
         self.assertEqual(response.context['total_chamados'], 3)
         self.assertEqual(response.context['chamados_abertos'], 2)
         self.assertEqual(response.context['chamados_resolvidos'], 1)
 
+    def test_dashboard_admin_query_count(self):
+        self.client.login(username='staffuser', password='password123')
+        # sessão + usuário + agregação dos contadores + chamados recentes (com o autor)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('App:dashboard_admin'))
+        # Com os contadores em cache, a agregação não é refeita
+        with self.assertNumQueries(3):
+            self.client.get(reverse('App:dashboard_admin'))
+
+    def test_dashboard_admin_counters_follow_save_and_delete(self):
+        self.client.login(username='staffuser', password='password123')
+        self.client.get(reverse('App:dashboard_admin'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            chamado = Chamado.objects.create(criado_por=self.user, assunto='Aberto 3', status='aberto')
+        with self.captureOnCommitCallbacks(execute=True):
+            chamado.status = 'em_analise'
+            chamado.save()
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('App:dashboard_admin'))
+        self.assertEqual(response.context['total_chamados'], 4)
+        self.assertEqual(response.context['chamados_abertos'], 2)
+        self.assertEqual(response.context['chamados_em_analise'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            chamado.delete()
+        response = self.client.get(reverse('App:dashboard_admin'))
+        self.assertEqual(response.context['total_chamados'], 3)
+        self.assertEqual(response.context['chamados_em_analise'], 0)
+
     def test_dashboard_admin_redirects_non_staff(self):
         self.client.login(username='testuser', password='password123')
-        response = self.client.get(reverse('dashboard_admin'))
+        response = self.client.get(reverse('App:dashboard_admin'))
         self.assertEqual(response.status_code, 302)
 
     def test_ver_chamados_admin_view(self):
         self.client.login(username='staffuser', password='password123')
-        response = self.client.get(reverse('ver_chamados_admin'))
+        response = self.client.get(reverse('Chamados:ver_chamados_admin'))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context['chamados']), 3)
 
     def test_ver_chamados_admin_filter_by_status(self):
         self.client.login(username='staffuser', password='password123')
-        response = self.client.get(reverse('ver_chamados_admin'), {'status': 'resolvido'})
+        response = self.client.get(reverse('Chamados:ver_chamados_admin'), {'status': 'resolvido'})
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context['chamados']), 1)
         self.assertEqual(response.context['chamados'][0].status, 'resolvido')
         
     def test_ver_chamados_admin_filter_by_search(self):
         self.client.login(username='staffuser', password='password123')
-        response = self.client.get(reverse('ver_chamados_admin'), {'search': 'Aberto 1'})
+        response = self.client.get(reverse('Chamados:ver_chamados_admin'), {'search': 'Aberto 1'})
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context['chamados']), 1)
         self.assertEqual(response.context['chamados'][0].assunto, 'Aberto 1')
\ No newline at end of file
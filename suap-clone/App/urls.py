@@ -1,6 +1,6 @@
 # App/urls.py
 
-from django.urls import path
+from django.urls import path, re_path
 from django.contrib.auth.decorators import login_required
 from . import views
 
@@ -9,4 +9,7 @@ app_name = 'App'
 urlpatterns = [
     path('', login_required(views.home), name='home'),
     path('dashboard-admin/', views.dashboard_admin, name='dashboard_admin'),
+    path('chat/nao-lidas/', views.chat_nao_lidas, name='chat_nao_lidas'),
+    re_path(r'^chat/(?P<room_name>[A-Za-z0-9_-]{1,80})/historico/$', views.historico_chat, name='historico_chat'),
+    re_path(r'^chat/(?P<room_name>[A-Za-z0-9_-]{1,80})/lido/$', views.marcar_chat_lido, name='marcar_chat_lido'),
 ]
\ No newline at end of file
@@ -0,0 +1,24 @@
+# App/versoes.py
+"""
+Versões que compõem as chaves de cache: invalidar de uma vez tudo o que foi
+gravado com uma versão é só trocá-la (usado pelas listas de chamados, cargas
+do roteamento, mural e grades do calendário).
+
+Uma versão ausente (nunca criada ou despejada do cache) nasce com
+time.time_ns(), e não do zero: assim nunca repete um valor já usado, e as
+entradas gravadas com uma versão anterior não voltam a valer.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def versao(chave):
+    return cache.get_or_set(chave, time.time_ns, None)
+
+
+def trocar_versao(chave):
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.set(chave, time.time_ns(), None)
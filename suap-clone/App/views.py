@@ -1,30 +1,56 @@
 # App/views.py
 from django.shortcuts import render
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import require_POST
 
 # Importações corrigidas dos novos apps
-from Mural.models import Card
+from Mural.listagem import grupos_do_publico, marca_do_mural, trecho_do_mural
 from Chamados.models import Chamado
+from Chamados.contadores import obter_contadores
+from .condicional import get_condicional
+from .historico import POR_PAGINA, pagina_de_historico
+from .nao_lidas import marcar_como_lida, nao_lidas_por_sala
+
+def _marcas_da_home(request):
+    return marca_do_mural(), grupos_do_publico(request.user)
 
 @login_required
+@get_condicional(_marcas_da_home)
 def home(request):
-    cards = Card.objects.all().order_by('-id')
-    return render(request, 'App/home.html', {'cards': cards})
+    # Primeira página do mural, já renderizada e compartilhada em cache
+    return render(request, 'App/home.html', {'mural': trecho_do_mural(request.user)})
 
 @staff_member_required
 def dashboard_admin(request):
-    total_chamados = Chamado.objects.count()
-    chamados_abertos = Chamado.objects.filter(status='aberto').count()
-    chamados_em_analise = Chamado.objects.filter(status='em_analise').count()
-    chamados_resolvidos = Chamado.objects.filter(status='resolvido').count()
-    chamados_recentes = Chamado.objects.order_by('-data_criacao')[:5]
+    # Contadores vêm do cache (recalculados com uma única agregação quando ausentes)
+    contadores = obter_contadores()
+    chamados_recentes = Chamado.objects.select_related('criado_por').order_by('-data_criacao')[:5]
 
     context = {
-        'total_chamados': total_chamados,
-        'chamados_abertos': chamados_abertos,
-        'chamados_em_analise': chamados_em_analise,
-        'chamados_resolvidos': chamados_resolvidos,
+        'total_chamados': contadores['total'],
+        'chamados_abertos': contadores['aberto'],
+        'chamados_em_analise': contadores['em_analise'],
+        'chamados_resolvidos': contadores['resolvido'],
         'chamados_recentes': chamados_recentes,
     }
-    return render(request, 'App/dashboard_admin.html', context)
\ No newline at end of file
+    return render(request, 'App/dashboard_admin.html', context)
+
+@login_required
+def historico_chat(request, room_name):
+    try:
+        limite = int(request.GET.get('limit', POR_PAGINA))
+    except ValueError:
+        limite = POR_PAGINA
+    return JsonResponse(pagina_de_historico(room_name, request.GET.get('before'), limite))
+
+@login_required
+def chat_nao_lidas(request):
+    return JsonResponse({'rooms': nao_lidas_por_sala(request.user)})
+
+@login_required
+@require_POST
+def marcar_chat_lido(request, room_name):
+    marcar_como_lida(request.user, room_name)
+    return JsonResponse({'success': True})
@@ -1,9 +1,23 @@
 # suap-clone/Calendario/admin.py
 from django.contrib import admin
-from .models import Evento
+from .models import Evento, ExcecaoEvento
+
+
+class ExcecaoEventoInline(admin.TabularInline):
+    model = ExcecaoEvento
+    extra = 0
+    verbose_name = "Ocorrência cancelada"
+    verbose_name_plural = "Ocorrências canceladas"
+
 
 @admin.register(Evento)
 class EventoAdmin(admin.ModelAdmin):
-    list_display = ('titulo', 'data_evento', 'cor')
-    list_filter = ('data_evento',)
-    search_fields = ('titulo', 'descricao')
\ No newline at end of file
+    list_display = ('titulo', 'data_evento', 'data_fim', 'recorrencia', 'repetir_ate', 'cor')
+    list_filter = ('recorrencia', 'data_evento')
+    search_fields = ('titulo', 'descricao')
+    fieldsets = (
+        (None, {'fields': ('titulo', 'descricao', 'cor')}),
+        ("Datas", {'fields': ('data_evento', 'data_fim')}),
+        ("Repetição", {'fields': ('recorrencia', 'intervalo', 'repetir_ate')}),
+    )
+    inlines = [ExcecaoEventoInline]
@@ -0,0 +1,190 @@
+# Calendario/agenda.py
+"""
+Grade mensal do calendário (semanas com os eventos de cada dia).
+
+A grade de um mês cobre as semanas inteiras, incluindo os dias do mês
+anterior e do seguinte que completam a primeira e a última semana.
+
+Eventos de vários dias e recorrentes (semanais ou mensais, com exceções)
+são guardados como uma linha só; as ocorrências nunca são gravadas. Uma
+consulta por intervalo (data_evento <= fim da grade e ultimo_dia >= início,
+índice evento_janela_idx) traz as regras que tocam a grade, e o gerador
+ocorrencias() expande cada uma apenas dentro dessa janela, saltando direto
+para a primeira ocorrência em vez de percorrer a série desde o começo.
+
+A grade pronta fica em cache com uma versão por mês mais uma versão geral.
+Salvar ou excluir um evento troca a versão dos meses cujas grades mostram
+algum dia dele; regras longas demais (ex.: recorrência sem fim) trocam a
+versão geral (ver signals.py). As versões servem de marca para o GET
+condicional da página.
+"""
+import calendar
+from collections import defaultdict, namedtuple
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+from App.versoes import trocar_versao, versao
+
+from .models import Evento, ExcecaoEvento
+
+PREFIXO = 'calendario:'
+CHAVE_VERSAO_GERAL = f'{PREFIXO}versao'
+# Rede de segurança para mudanças que não disparem sinais (ex.: queryset.update())
+TIMEOUT_GRADE = 60 * 60 * 24
+ANO_MINIMO = 1900
+ANO_MAXIMO = 2100
+# Semanas começando no domingo, como no cabeçalho da página
+CALENDARIO = calendar.Calendar(firstweekday=calendar.SUNDAY)
+# Mudanças que alcançam mais meses que isso invalidam todas as grades de uma vez
+MAXIMO_MESES_INVALIDADOS = 12
+
+# Uma ocorrência de um evento: primeiro e último dia (iguais nos eventos de um dia)
+Ocorrencia = namedtuple('Ocorrencia', ['evento', 'inicio', 'fim'])
+
+
+def mes_anterior(ano, mes):
+    return (ano - 1, 12) if mes == 1 else (ano, mes - 1)
+
+
+def mes_seguinte(ano, mes):
+    return (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+
+def semanas_do_mes(ano, mes):
+    return CALENDARIO.monthdatescalendar(ano, mes)
+
+
+def _chave_versao(ano, mes):
+    return f'{PREFIXO}versao:{ano}-{mes:02d}'
+
+
+def versao_do_mes(ano, mes):
+    return f'{versao(CHAVE_VERSAO_GERAL)}.{versao(_chave_versao(ano, mes))}'
+
+
+def meses_que_mostram(dia):
+    """(ano, mês) de cada grade que inclui o dia: o próprio mês e, nas bordas, o vizinho."""
+    meses = []
+    for ano, mes in (mes_anterior(dia.year, dia.month), (dia.year, dia.month), mes_seguinte(dia.year, dia.month)):
+        semanas = semanas_do_mes(ano, mes)
+        if semanas[0][0] <= dia <= semanas[-1][-1]:
+            meses.append((ano, mes))
+    return meses
+
+
+def invalidar_tudo():
+    trocar_versao(CHAVE_VERSAO_GERAL)
+
+
+def invalidar_periodo(inicio, fim):
+    """Refaz as grades de todos os meses que mostram algum dia entre inicio e fim."""
+    if (fim.year - inicio.year) * 12 + fim.month - inicio.month >= MAXIMO_MESES_INVALIDADOS:
+        invalidar_tudo()
+        return
+    ano, mes = meses_que_mostram(inicio)[0]
+    ultimo = meses_que_mostram(fim)[-1]
+    while True:
+        trocar_versao(_chave_versao(ano, mes))
+        if (ano, mes) == ultimo:
+            return
+        ano, mes = mes_seguinte(ano, mes)
+
+
+def _inicios_semanais(evento, de, ate):
+    passo = 7 * evento.intervalo
+    atraso = (de - evento.data_evento).days
+    # Arredonda para cima: primeira ocorrência que começa em `de` ou depois
+    dia = evento.data_evento + timedelta(days=max(0, -(-atraso // passo)) * passo)
+    passo = timedelta(days=passo)
+    while dia <= ate:
+        yield dia
+        dia += passo
+
+
+def _inicios_mensais(evento, de, ate):
+    primeiro = evento.data_evento
+    # Meses contados desde o ano 0, para a aritmética não depender de anos
+    base = primeiro.year * 12 + primeiro.month - 1
+    atraso = de.year * 12 + de.month - 1 - base
+    indice = base + max(0, -(-atraso // evento.intervalo)) * evento.intervalo
+    while True:
+        ano, mes = divmod(indice, 12)
+        if date(ano, mes + 1, 1) > ate:
+            return
+        # Meses sem o dia (ex.: 31) ficam sem ocorrência
+        if primeiro.day <= calendar.monthrange(ano, mes + 1)[1]:
+            dia = date(ano, mes + 1, primeiro.day)
+            if de <= dia <= ate:
+                yield dia
+        indice += evento.intervalo
+
+
+_INICIOS = {'semanal': _inicios_semanais, 'mensal': _inicios_mensais}
+
+
+def ocorrencias(eventos, inicio, fim, canceladas=frozenset()):
+    """
+    Gera as ocorrências dos eventos que tocam algum dia entre inicio e fim.
+    `canceladas` tem pares (evento_id, dia de início) das exceções.
+    """
+    for evento in eventos:
+        duracao = timedelta(days=evento.duracao)
+        if not evento.recorrencia:
+            yield Ocorrencia(evento, evento.data_evento, evento.data_evento + duracao)
+            continue
+        # Ocorrências que começaram antes da janela, mas ainda estão em andamento
+        de = max(inicio - duracao, evento.data_evento)
+        ate = min(fim, evento.repetir_ate) if evento.repetir_ate else fim
+        for dia in _INICIOS[evento.recorrencia](evento, de, ate):
+            if (evento.id, dia) not in canceladas:
+                yield Ocorrencia(evento, dia, dia + duracao)
+
+
+def eventos_da_janela(inicio, fim):
+    """Eventos (regras) com alguma ocorrência entre inicio e fim, mais as exceções deles na janela."""
+    eventos = list(Evento.objects.filter(data_evento__lte=fim, ultimo_dia__gte=inicio))
+    recorrentes = [evento.id for evento in eventos if evento.recorrencia]
+    canceladas = frozenset()
+    if recorrentes:
+        # Uma ocorrência de vários dias pode ter começado antes da janela
+        maior_duracao = max(evento.duracao for evento in eventos if evento.recorrencia)
+        canceladas = frozenset(ExcecaoEvento.objects.filter(
+            evento_id__in=recorrentes, data__range=(inicio - timedelta(days=maior_duracao), fim),
+        ).values_list('evento_id', 'data'))
+    return eventos, canceladas
+
+
+def calcular_grade(ano, mes):
+    semanas = semanas_do_mes(ano, mes)
+    inicio, fim = semanas[0][0], semanas[-1][-1]
+    eventos, canceladas = eventos_da_janela(inicio, fim)
+    primeiro_do_mes = date(ano, mes, 1)
+    ultimo_do_mes = date(ano, mes, calendar.monthrange(ano, mes)[1])
+
+    eventos_por_dia = defaultdict(list)
+    do_mes = []
+    um_dia = timedelta(days=1)
+    for ocorrencia in ocorrencias(eventos, inicio, fim, canceladas):
+        dia, ultimo = max(ocorrencia.inicio, inicio), min(ocorrencia.fim, fim)
+        while dia <= ultimo:
+            eventos_por_dia[dia].append(ocorrencia.evento)
+            dia += um_dia
+        if ocorrencia.inicio <= ultimo_do_mes and ocorrencia.fim >= primeiro_do_mes:
+            do_mes.append(ocorrencia)
+    do_mes.sort(key=lambda ocorrencia: ocorrencia.inicio)
+    return {
+        # Para cada dia, uma tupla: (objeto_date, lista_de_eventos)
+        'semanas': [[(dia, eventos_por_dia.get(dia, [])) for dia in semana] for semana in semanas],
+        # Ocorrências que tocam o mês, na ordem em que começam
+        'eventos': do_mes,
+    }
+
+
+def grade_do_mes(ano, mes):
+    chave = f'{PREFIXO}grade:{ano}-{mes:02d}:{versao_do_mes(ano, mes)}'
+    grade = cache.get(chave)
+    if grade is None:
+        grade = calcular_grade(ano, mes)
+        cache.set(chave, grade, TIMEOUT_GRADE)
+    return grade
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Evento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(max_length=200)),
+                ('descricao', models.TextField(blank=True, null=True)),
+                ('data_evento', models.DateField()),
+                ('cor', models.CharField(default='#7a9a5a', help_text='Cor em formato hexadecimal, ex: #7a9a5a', max_length=20)),
+            ],
+            options={
+                'ordering': ['data_evento'],
+            },
+        ),
+    ]
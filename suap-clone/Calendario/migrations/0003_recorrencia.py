@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:24
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def preencher_ultimo_dia(apps, schema_editor):
+    # Os eventos existentes são todos de um dia só
+    Evento = apps.get_model('Calendario', 'Evento')
+    Evento.objects.update(ultimo_dia=models.F('data_evento'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calendario', '0002_evento_data_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExcecaoEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+            ],
+            options={
+                'ordering': ['data'],
+            },
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='data_fim',
+            field=models.DateField(blank=True, help_text='Último dia, para eventos de vários dias. Vazio: um dia só.', null=True),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='intervalo',
+            field=models.PositiveSmallIntegerField(default=1, help_text='A cada quantas semanas/meses o evento se repete.'),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='recorrencia',
+            field=models.CharField(blank=True, choices=[('', 'Não se repete'), ('semanal', 'Semanal'), ('mensal', 'Mensal')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='repetir_ate',
+            field=models.DateField(blank=True, help_text='Última data em que uma ocorrência pode começar. Vazio: sem fim.', null=True),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='ultimo_dia',
+            field=models.DateField(default=datetime.date(9999, 12, 31), editable=False),
+        ),
+        migrations.RunPython(preencher_ultimo_dia, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['ultimo_dia', 'data_evento'], name='evento_janela_idx'),
+        ),
+        migrations.AddField(
+            model_name='excecaoevento',
+            name='evento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='excecoes', to='Calendario.evento'),
+        ),
+        migrations.AddConstraint(
+            model_name='excecaoevento',
+            constraint=models.UniqueConstraint(fields=('evento', 'data'), name='excecao_evento_data_unica'),
+        ),
+    ]
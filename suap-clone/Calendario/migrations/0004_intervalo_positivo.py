@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:42
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def corrigir_intervalos(apps, schema_editor):
+    # Gravados antes da restrição: 0 vira "toda semana/todo mês"
+    Evento = apps.get_model('Calendario', 'Evento')
+    Evento.objects.filter(intervalo__lt=1).update(intervalo=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calendario', '0003_recorrencia'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='evento',
+            name='intervalo',
+            field=models.PositiveSmallIntegerField(default=1, help_text='A cada quantas semanas/meses o evento se repete.', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.RunPython(corrigir_intervalos, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='evento',
+            constraint=models.CheckConstraint(condition=models.Q(('intervalo__gte', 1)), name='evento_intervalo_positivo'),
+        ),
+    ]
@@ -1,17 +1,85 @@
+import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils import timezone
 
+RECORRENCIA_CHOICES = [
+    ('', 'Não se repete'),
+    ('semanal', 'Semanal'),
+    ('mensal', 'Mensal'),
+]
+
 class Evento(models.Model):
     titulo =models.CharField(max_length=200)
     descricao = models.TextField(blank=True, null=True)
+    # Primeiro dia do evento (e da primeira ocorrência, se ele se repete)
     data_evento= models.DateField()
+    data_fim = models.DateField(blank=True, null=True, help_text="Último dia, para eventos de vários dias. Vazio: um dia só.")
     cor = models.CharField(max_length=20, default='#7a9a5a', help_text="Cor em formato hexadecimal, ex: #7a9a5a")
+    recorrencia = models.CharField(max_length=10, choices=RECORRENCIA_CHOICES, default='', blank=True)
+    intervalo = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)], help_text="A cada quantas semanas/meses o evento se repete.")
+    repetir_ate = models.DateField(blank=True, null=True, help_text="Última data em que uma ocorrência pode começar. Vazio: sem fim.")
+    # Último dia ocupado por qualquer ocorrência (date.max se a recorrência não tem fim).
+    # Calculado no save(); permite achar os eventos de uma janela só por intervalo de datas.
+    ultimo_dia = models.DateField(default=datetime.date.max, editable=False)
 
 
     def __str__(self):
         return self.titulo
 
+    @property
+    def duracao(self):
+        """Dias além do primeiro (0 para eventos de um dia)."""
+        return (self.data_fim - self.data_evento).days if self.data_fim else 0
+
+    def clean(self):
+        if self.data_evento and self.data_fim and self.data_fim < self.data_evento:
+            raise ValidationError({'data_fim': "O último dia não pode ser antes do primeiro."})
+        if self.recorrencia and self.repetir_ate and self.data_evento and self.repetir_ate < self.data_evento:
+            raise ValidationError({'repetir_ate': "A repetição não pode terminar antes do primeiro dia."})
+        if not self.recorrencia:
+            self.repetir_ate = None
+
+    def save(self, *args, **kwargs):
+        # Aceita também as datas ainda como texto (ex.: Evento(data_evento='2025-05-17'))
+        for campo in ('data_evento', 'data_fim', 'repetir_ate'):
+            setattr(self, campo, self._meta.get_field(campo).to_python(getattr(self, campo)))
+        if not self.recorrencia:
+            self.ultimo_dia = self.data_fim or self.data_evento
+        elif self.repetir_ate:
+            self.ultimo_dia = self.repetir_ate + datetime.timedelta(days=self.duracao)
+        else:
+            self.ultimo_dia = datetime.date.max
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'ultimo_dia'}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['data_evento']
+        indexes = [
+            models.Index(fields=['data_evento'], name='evento_data_idx'),
+            models.Index(fields=['ultimo_dia', 'data_evento'], name='evento_janela_idx'),
+        ]
+        constraints = [
+            # Intervalo 0 faria a expansão das ocorrências dividir por zero
+            models.CheckConstraint(condition=models.Q(intervalo__gte=1), name='evento_intervalo_positivo'),
+        ]
 
 
+class ExcecaoEvento(models.Model):
+    """Ocorrência cancelada de um evento recorrente (ex.: aula que cai num feriado)."""
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='excecoes')
+    # Dia em que a ocorrência começaria
+    data = models.DateField()
+
+    def __str__(self):
+        return f"{self.evento} - {self.data:%d/%m/%Y}"
+
+    class Meta:
+        ordering = ['data']
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'data'], name='excecao_evento_data_unica'),
+        ]
@@ -0,0 +1,39 @@
+# Calendario/signals.py
+from datetime import timedelta
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .agenda import invalidar_periodo
+from .models import Evento, ExcecaoEvento
+
+
+@receiver(post_init, sender=Evento)
+def guardar_periodo_original(sender, instance, **kwargs):
+    # Se as datas mudarem, as grades do período antigo também precisam ser refeitas
+    dados = instance.__dict__
+    instance._periodo_original = (dados.get('data_evento'), dados.get('ultimo_dia')) if instance.pk else None
+
+
+@receiver(post_save, sender=Evento)
+def invalidar_grade_ao_salvar(sender, instance, **kwargs):
+    # save() já converteu as datas e calculou o ultimo_dia
+    periodos = {(instance.data_evento, instance.ultimo_dia), instance._periodo_original} - {None}
+    instance._periodo_original = (instance.data_evento, instance.ultimo_dia)
+    for inicio, fim in periodos:
+        transaction.on_commit(partial(invalidar_periodo, inicio, fim))
+
+
+@receiver(post_delete, sender=Evento)
+def invalidar_grade_ao_excluir(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidar_periodo, instance.data_evento, instance.ultimo_dia))
+
+
+@receiver(post_save, sender=ExcecaoEvento)
+@receiver(post_delete, sender=ExcecaoEvento)
+def invalidar_grade_da_excecao(sender, instance, **kwargs):
+    # Só a ocorrência cancelada (ou restaurada) muda
+    fim = instance.data + timedelta(days=instance.evento.duracao)
+    transaction.on_commit(partial(invalidar_periodo, instance.data, fim))
@@ -1,3 +1,163 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .agenda import eventos_da_janela, grade_do_mes, meses_que_mostram, ocorrencias
+from .models import Evento, ExcecaoEvento
+
+
+class CalendarioTestCase(TestCase):
+    """ Navegação por mês, consulta por intervalo e grade mensal em cache """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        self.reuniao = Evento.objects.create(titulo='Reunião Pedagógica', data_evento=date(2025, 10, 25))
+        Evento.objects.create(titulo='Entrega de TCC', data_evento=date(2025, 11, 30))
+
+    def _mes(self, ano, mes):
+        return self.client.get(reverse('Calendario:calendario_mes', args=[ano, mes]))
+
+    def test_month_navigation(self):
+        response = self._mes(2025, 10)
+        self.assertContains(response, 'Reunião Pedagógica')
+        self.assertNotContains(response, 'Entrega de TCC')
+        self.assertContains(response, reverse('Calendario:calendario_mes', args=[2025, 9]))
+        self.assertContains(response, reverse('Calendario:calendario_mes', args=[2025, 11]))
+
+        response = self._mes(2025, 12)
+        self.assertContains(response, reverse('Calendario:calendario_mes', args=[2026, 1]))
+        self.assertEqual(self._mes(2025, 13).status_code, 404)
+        self.assertEqual(self.client.get(reverse('Calendario:calendario')).status_code, 200)
+
+    def test_weeks_start_on_sunday(self):
+        semanas = grade_do_mes(2025, 10)['semanas']
+        self.assertEqual(semanas[0][0][0], date(2025, 9, 28))
+        self.assertEqual(semanas[0][0][0].weekday(), 6)
+
+    def test_event_query_is_a_date_range(self):
+        with CaptureQueriesContext(connection) as consultas:
+            grade_do_mes(2025, 10)
+        sql = consultas.captured_queries[-1]['sql']
+        self.assertIn('"data_evento" <= ', sql)
+        self.assertIn('"ultimo_dia" >= ', sql)
+        self.assertNotIn('strftime', sql.lower())
+        self.assertNotIn('extract', sql.lower())
+
+    def test_grid_is_cached_until_an_event_of_that_month_changes(self):
+        grade_do_mes(2025, 10)
+        grade_do_mes(2025, 11)
+        with self.assertNumQueries(0):
+            grade_do_mes(2025, 10)
+
+        # Evento de outro mês não afeta outubro
+        with self.captureOnCommitCallbacks(execute=True):
+            Evento.objects.create(titulo='Feriado', data_evento=date(2025, 12, 25))
+        with self.assertNumQueries(0):
+            grade_do_mes(2025, 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reuniao.data_evento = date(2025, 11, 10)
+            self.reuniao.save()
+        # Saiu de outubro e entrou em novembro: as duas grades são refeitas
+        self.assertEqual(grade_do_mes(2025, 10)['eventos'], [])
+        self.assertIn(self.reuniao, [ocorrencia.evento for ocorrencia in grade_do_mes(2025, 11)['eventos']])
+
+    def test_evicted_version_does_not_bring_back_stale_grids(self):
+        grade_do_mes(2025, 10)
+        # O cache despeja a versão do mês, mas a grade gravada com ela continua lá
+        cache.delete('calendario:versao:2025-10')
+        with self.captureOnCommitCallbacks(execute=True):
+            Evento.objects.create(titulo='Feriado', data_evento=date(2025, 10, 12))
+        self.assertIn('Feriado', [o.evento.titulo for o in grade_do_mes(2025, 10)['eventos']])
+
+    def test_days_shown_in_neighbouring_grids(self):
+        # 28/09/2025 aparece na primeira semana de outubro
+        self.assertEqual(meses_que_mostram(date(2025, 9, 28)), [(2025, 9), (2025, 10)])
+        self.assertEqual(meses_que_mostram(date(2025, 10, 15)), [(2025, 10)])
+
+
+class RecorrenciaTestCase(TestCase):
+    """ Eventos de vários dias e recorrentes, expandidos só na janela exibida """
+
+    def setUp(self):
+        cache.clear()
+
+    def _dias(self, ano, mes, titulo):
+        return [dia for semana in grade_do_mes(ano, mes)['semanas'] for dia, eventos in semana
+                if any(evento.titulo == titulo for evento in eventos)]
+
+    def test_multi_day_event_fills_every_day(self):
+        Evento.objects.create(titulo='Semana de Provas', data_evento=date(2025, 10, 29), data_fim=date(2025, 11, 4))
+        # A grade de outubro termina no sábado, 01/11
+        self.assertEqual(self._dias(2025, 10, 'Semana de Provas'), [date(2025, 10, 29) + timedelta(days=i) for i in range(4)])
+        # Novembro também mostra o evento, que começou em outubro
+        ocorrencia, = grade_do_mes(2025, 11)['eventos']
+        self.assertEqual((ocorrencia.inicio, ocorrencia.fim), (date(2025, 10, 29), date(2025, 11, 4)))
+
+    def test_weekly_rule_with_interval_and_exceptions(self):
+        aula = Evento.objects.create(
+            titulo='Aula de Física', data_evento=date(2020, 3, 2), recorrencia='semanal', intervalo=2,
+        )
+        ExcecaoEvento.objects.create(evento=aula, data=date(2025, 10, 20))
+        # Segundas-feiras, de duas em duas semanas desde 02/03/2020, menos a cancelada
+        self.assertEqual(self._dias(2025, 10, 'Aula de Física'), [date(2025, 10, 6)])
+        self.assertContains(self._pagina(2025, 10), 'Aula de Física')
+
+    def test_monthly_rule_skips_short_months_and_stops(self):
+        Evento.objects.create(
+            titulo='Fechamento', data_evento=date(2025, 1, 31), recorrencia='mensal', repetir_ate=date(2025, 5, 31),
+        )
+        ano = (date(2025, 1, 1), date(2025, 12, 31))
+        eventos, canceladas = eventos_da_janela(*ano)
+        self.assertEqual([ocorrencia.inicio for ocorrencia in ocorrencias(eventos, *ano, canceladas)], [date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31)])
+        # Depois do fim da repetição o evento nem é consultado
+        self.assertEqual(eventos_da_janela(date(2025, 6, 1), date(2025, 6, 30))[0], [])
+
+    def test_recurring_change_invalidates_every_month(self):
+        grade_do_mes(2025, 10)
+        grade_do_mes(2031, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            evento = Evento.objects.create(titulo='Plantão', data_evento=date(2025, 1, 5), recorrencia='semanal')
+        self.assertEqual(len(self._dias(2031, 2, 'Plantão')), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExcecaoEvento.objects.create(evento=evento, data=date(2025, 10, 12))
+        self.assertNotIn(date(2025, 10, 12), self._dias(2025, 10, 'Plantão'))
+        # A exceção só afeta os meses que mostram aquele dia
+        with self.assertNumQueries(0):
+            grade_do_mes(2031, 2)
+
+    def test_zero_interval_is_rejected(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Evento.objects.create(titulo='Sem intervalo', data_evento=date(2025, 10, 6), recorrencia='semanal', intervalo=0)
+        with self.assertRaises(ValidationError):
+            Evento(titulo='Sem intervalo', data_evento=date(2025, 10, 6), recorrencia='semanal', intervalo=0).full_clean()
+        self.assertEqual(grade_do_mes(2025, 10)['eventos'], [])
+
+    def test_expansion_only_walks_the_displayed_window(self):
+        Evento.objects.bulk_create([
+            Evento(titulo=f'Regra {i}', data_evento=date(1950, 1, 1) + timedelta(days=i), recorrencia='semanal',
+                   ultimo_dia=date.max)
+            for i in range(2000)
+        ])
+        eventos, canceladas = eventos_da_janela(date(2025, 9, 28), date(2025, 11, 1))
+        inicio = time.perf_counter()
+        total = sum(1 for _ in ocorrencias(eventos, date(2025, 9, 28), date(2025, 11, 1), canceladas))
+        decorrido = time.perf_counter() - inicio
+        # 75 anos de série por regra: percorrer desde o começo levaria segundos
+        self.assertEqual(total, 2000 * 5)
+        self.assertLess(decorrido, 0.5)
 
-# Create your tests here.
+    def _pagina(self, ano, mes):
+        User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        return self.client.get(reverse('Calendario:calendario_mes', args=[ano, mes]))
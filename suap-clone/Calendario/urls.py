@@ -6,4 +6,5 @@ app_name = 'Calendario'
 
 urlpatterns = [
     path('', views.calendario_view, name='calendario'),
-]
\ No newline at end of file
+    path('<int:ano>/<int:mes>/', views.calendario_view, name='calendario_mes'),
+]
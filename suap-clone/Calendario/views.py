@@ -1,41 +1,35 @@
-import calendar
+from django.http import Http404
 from django.shortcuts import render
 from django.utils import timezone
-from collections import defaultdict
-from .models import Evento
+from datetime import date
+from App.condicional import get_condicional
+from .agenda import ANO_MAXIMO, ANO_MINIMO, grade_do_mes, mes_anterior, mes_seguinte, versao_do_mes
 
-def calendario_view(request):
-    agora = timezone.now()
-    ano = agora.year
-    mes = agora.month
+def _mes_pedido(ano=None, mes=None):
+    if ano is None:
+        hoje = timezone.localdate()
+        return hoje.year, hoje.month
+    if not (ANO_MINIMO <= ano <= ANO_MAXIMO and 1 <= mes <= 12):
+        raise Http404("Mês fora do calendário.")
+    return ano, mes
 
-    cal = calendar.Calendar()
-    # Pega uma lista de semanas, onde cada semana é uma lista de objetos 'date'
-    dias_do_mes_datas = cal.monthdatescalendar(ano, mes)
-    
-    eventos = Evento.objects.filter(data_evento__year=ano, data_evento__month=mes)
-    
-    # Agrupa os eventos por dia em um dicionário
-    eventos_por_dia = defaultdict(list)
-    for evento in eventos:
-        eventos_por_dia[evento.data_evento].append(evento)
+def _marcas_do_calendario(request, ano=None, mes=None):
+    # O destaque de "hoje" depende da data
+    return versao_do_mes(*_mes_pedido(ano, mes)), timezone.localdate()
 
-    # CORREÇÃO PRINCIPAL: Cria uma nova estrutura de dados
-    # que combina a data com sua lista de eventos correspondente.
-    calendario_com_eventos = []
-    for semana in dias_do_mes_datas:
-        semana_com_eventos = []
-        for dia in semana:
-            # Para cada dia, adicionamos uma tupla: (objeto_date, lista_de_eventos)
-            semana_com_eventos.append((dia, eventos_por_dia[dia]))
-        calendario_com_eventos.append(semana_com_eventos)
+@get_condicional(_marcas_do_calendario)
+def calendario_view(request, ano=None, mes=None):
+    ano, mes = _mes_pedido(ano, mes)
+    # Semanas e eventos vêm prontos do cache (ver Calendario/agenda.py)
+    grade = grade_do_mes(ano, mes)
 
     context = {
-        # Passa a nova estrutura para o template
-        'calendario_semanas': calendario_com_eventos, 
-        'mes_atual': timezone.datetime(ano, mes, 1),
-        'eventos_lista': eventos,
-        'today': agora.date(),
+        'calendario_semanas': grade['semanas'],
+        'mes_atual': date(ano, mes, 1),
+        'mes_anterior': date(*mes_anterior(ano, mes), 1) if ano > ANO_MINIMO or mes > 1 else None,
+        'mes_seguinte': date(*mes_seguinte(ano, mes), 1) if ano < ANO_MAXIMO or mes < 12 else None,
+        'eventos_lista': grade['eventos'],
+        'today': timezone.localdate(),
         'week_days': ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sab"],
     }
-    return render(request, 'Calendario/calendario.html', context)
\ No newline at end of file
+    return render(request, 'Calendario/calendario.html', context)
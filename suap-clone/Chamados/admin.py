@@ -1,5 +1,7 @@
-from django.contrib import admin
-from .models import Chamado, AtualizacaoChamado
+from django.contrib import admin, messages
+from .models import Anexo, ArquivoAnexo, AtendenteSetor, Chamado, AtualizacaoChamado
+from .busca import buscar_ids
+from .operacoes import ALTERADO, OperacaoGrandeDemais, alterar_status_em_massa
 
 class AtualizacaoInline(admin.TabularInline):
     model = AtualizacaoChamado
@@ -9,13 +11,37 @@ class AtualizacaoInline(admin.TabularInline):
     def has_add_permission(self, request, obj=None):
         return False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).linha_do_tempo()
+
+def acao_alterar_status(status, rotulo):
+    """ Ação do admin que move os chamados selecionados para `status` numa operação só """
+    def acao(modeladmin, request, queryset):
+        try:
+            resultados = alterar_status_em_massa(queryset, status, request.user)
+        except OperacaoGrandeDemais as erro:
+            modeladmin.message_user(request, str(erro), messages.ERROR)
+            return
+        alterados = sum(r['resultado'] == ALTERADO for r in resultados)
+        modeladmin.message_user(
+            request,
+            f"{alterados} chamado(s) marcado(s) como {rotulo}; "
+            f"{len(resultados) - alterados} já estava(m) nesse status.",
+            messages.SUCCESS,
+        )
+    acao.__name__ = f'marcar_como_{status}'
+    acao.short_description = f"Marcar selecionados como {rotulo}"
+    return acao
+
 @admin.register(Chamado)
 class ChamadoAdmin(admin.ModelAdmin):
-    list_display = ('id', 'assunto', 'criado_por', 'setor', 'status', 'urgencia', 'data_criacao')
+    list_display = ('id', 'assunto', 'criado_por', 'responsavel', 'setor', 'status', 'urgencia', 'data_criacao', 'prazo_sla')
     list_filter = ('status', 'urgencia', 'setor')
+    # A busca usa o índice textual (ver get_search_results); os campos aqui só habilitam a caixa de busca
     search_fields = ('assunto', 'descricao', 'criado_por__username') 
-    readonly_fields = ('data_criacao',)
+    readonly_fields = ('data_criacao', 'prazo_sla', 'sla_estourado_em')
     inlines = [AtualizacaoInline]
+    actions = [acao_alterar_status(status, rotulo) for status, rotulo in Chamado.STATUS_CHOICES]
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -23,6 +49,12 @@ class ChamadoAdmin(admin.ModelAdmin):
             return qs
         return qs.filter(criado_por=request.user)
     
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        ids = buscar_ids(search_term, queryset)
+        return queryset.filter(id__in=ids), False
+
     def save_model(self, request, obj, form, change):
         if change and 'status' in form.changed_data:
             AtualizacaoChamado.objects.create(
@@ -39,4 +71,28 @@ class AtualizacaoChamadoAdmin(admin.ModelAdmin):
     list_display = ('chamado', 'status_anterior', 'status_novo', 'responsavel', 'data_atualizacao')
     list_filter = ('status_novo',)
     search_fields = ('chamado__assunto', 'mensagem')
-    readonly_fields = ('chamado', 'responsavel', 'status_anterior', 'status_novo', 'data_atualizacao')
\ No newline at end of file
+    readonly_fields = ('chamado', 'responsavel', 'status_anterior', 'status_novo', 'data_atualizacao')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).com_responsavel().select_related('chamado')
+
+@admin.register(AtendenteSetor)
+class AtendenteSetorAdmin(admin.ModelAdmin):
+    list_display = ('atendente', 'setor', 'ativo')
+    list_filter = ('setor', 'ativo')
+    list_select_related = ('atendente',)
+
+@admin.register(Anexo)
+class AnexoAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'chamado', 'enviado_por', 'data_envio', 'arquivo__previa_status')
+    list_select_related = ('chamado', 'enviado_por', 'arquivo')
+    list_filter = ('arquivo__previa_status',)
+    search_fields = ('nome', 'chamado__assunto')
+    readonly_fields = ('chamado', 'enviado_por', 'arquivo', 'nome', 'data_envio')
+    actions = ['refazer_previas']
+
+    @admin.action(description="Gerar a prévia novamente")
+    def refazer_previas(self, request, queryset):
+        # O comando gerar_previas pega os arquivos pendentes na próxima execução
+        total = ArquivoAnexo.objects.filter(id__in=queryset.values('arquivo_id')).update(previa_status='pendente')
+        self.message_user(request, f"{total} arquivo(s) voltaram para a fila de prévias.", messages.SUCCESS)
@@ -0,0 +1,181 @@
+# Chamados/analiticos.py
+"""
+Indicadores dos chamados (abertos por setor, mudanças de status, tempo até
+a resolução) a partir da tabela consolidada ResumoDiario.
+
+atualizar_resumos() recalcula por inteiro os dias informados, lendo as
+tabelas de chamados e atualizações só no intervalo de cada dia; o comando
+atualizar_resumos chama a função de forma incremental. A página de
+indicadores lê apenas os resumos, algumas centenas de linhas por período.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import AtualizacaoChamado, Chamado, ResumoDiario
+
+# Faixas do histograma de resolução: limites superiores em horas
+LIMITES_HISTOGRAMA_HORAS = (1, 4, 24, 72, 168)
+FAIXAS_HISTOGRAMA = ('< 1h', '1h a 4h', '4h a 24h', '1 a 3 dias', '3 a 7 dias', '7 dias ou mais')
+
+AGRUPAMENTOS = ('dia', 'semana', 'mes')
+SETORES = dict(Chamado.SETOR_CHOICES)
+STATUS = dict(Chamado.STATUS_CHOICES)
+
+
+def _intervalo_do_dia(dia):
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    return inicio, timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+
+
+def faixa_do_histograma(segundos):
+    horas = segundos / 3600
+    for indice, limite in enumerate(LIMITES_HISTOGRAMA_HORAS):
+        if horas < limite:
+            return indice
+    return len(LIMITES_HISTOGRAMA_HORAS)
+
+
+def calcular_resumos_do_dia(dia):
+    """ResumoDiario (não salvos) de um dia, com duas consultas às tabelas brutas."""
+    inicio, fim = _intervalo_do_dia(dia)
+    resumos = {}
+
+    def resumo(setor, urgencia, status):
+        chave = (setor, urgencia, status)
+        if chave not in resumos:
+            resumos[chave] = ResumoDiario(
+                dia=dia, setor=setor, urgencia=urgencia, status=status,
+                histograma_resolucao=[0] * len(FAIXAS_HISTOGRAMA),
+            )
+        return resumos[chave]
+
+    # Status inicial: o anterior da primeira atualização ou, sem atualizações, o atual
+    primeiro_status = AtualizacaoChamado.objects.filter(chamado=OuterRef('pk')).order_by(
+        'data_atualizacao', 'id'
+    ).values('status_anterior')[:1]
+    criados = (
+        Chamado.objects.filter(data_criacao__gte=inicio, data_criacao__lt=fim)
+        .annotate(status_inicial=Coalesce(Subquery(primeiro_status), F('status')))
+        .values('setor', 'urgencia', 'status_inicial')
+        .annotate(quantidade=Count('id'))
+        .order_by()
+    )
+    for linha in criados:
+        resumo(linha['setor'], linha['urgencia'], linha['status_inicial']).criados = linha['quantidade']
+
+    # Atualizações sem troca de status (ex.: estouro de SLA) não são entradas
+    mudancas = AtualizacaoChamado.objects.filter(
+        data_atualizacao__gte=inicio, data_atualizacao__lt=fim
+    ).exclude(status_anterior=F('status_novo')).values_list('chamado__setor', 'chamado__urgencia', 'status_novo', 'data_atualizacao', 'chamado__data_criacao')
+    for setor, urgencia, status, data_atualizacao, data_criacao in mudancas:
+        atual = resumo(setor, urgencia, status)
+        atual.entradas += 1
+        if status == 'resolvido':
+            segundos = max(int((data_atualizacao - data_criacao).total_seconds()), 0)
+            atual.segundos_resolucao += segundos
+            atual.histograma_resolucao[faixa_do_histograma(segundos)] += 1
+
+    return list(resumos.values())
+
+
+def atualizar_resumos(desde, ate):
+    """Recalcula os resumos de cada dia entre `desde` e `ate`, inclusive."""
+    dia = desde
+    total = 0
+    while dia <= ate:
+        resumos = calcular_resumos_do_dia(dia)
+        with transaction.atomic():
+            ResumoDiario.objects.filter(dia=dia).delete()
+            ResumoDiario.objects.bulk_create(resumos)
+        total += len(resumos)
+        dia += timedelta(days=1)
+    return total
+
+
+def dias_pendentes(hoje=None):
+    """
+    Intervalo a recalcular numa atualização incremental: do dia da última
+    atualização até hoje ou, sem resumos ainda, desde o primeiro chamado.
+    Dias anteriores não mudam, pois as mudanças de status entram no dia
+    em que acontecem.
+    """
+    hoje = hoje or timezone.localdate()
+    ultima = ResumoDiario.objects.aggregate(ultima=Max('atualizado_em'))['ultima']
+    if ultima:
+        return timezone.localdate(ultima), hoje
+    primeiro = Chamado.objects.aggregate(primeiro=Min('data_criacao'))['primeiro']
+    if primeiro is None:
+        return None
+    return timezone.localdate(primeiro), hoje
+
+
+def inicio_do_periodo(dia, agrupamento):
+    if agrupamento == 'semana':
+        return dia - timedelta(days=dia.weekday())
+    if agrupamento == 'mes':
+        return dia.replace(day=1)
+    return dia
+
+
+def _media_horas(segundos, quantidade):
+    return round(segundos / quantidade / 3600, 1) if quantidade else None
+
+
+def consultar_indicadores(desde, ate, agrupamento='semana'):
+    """Agrega os resumos do intervalo por período (dia, semana ou mês)."""
+    periodos = defaultdict(lambda: {
+        'criados': 0,
+        'criados_por_setor': defaultdict(int),
+        'entradas_por_status': defaultdict(int),
+    })
+    resolucao_por_setor = defaultdict(lambda: [0, 0])
+    histograma = [0] * len(FAIXAS_HISTOGRAMA)
+    atualizado_em = None
+
+    resumos = ResumoDiario.objects.filter(dia__gte=desde, dia__lte=ate).order_by('dia')
+    for resumo in resumos.iterator():
+        periodo = periodos[inicio_do_periodo(resumo.dia, agrupamento)]
+        periodo['criados'] += resumo.criados
+        periodo['criados_por_setor'][resumo.setor] += resumo.criados
+        periodo['entradas_por_status'][resumo.status] += resumo.entradas
+        if resumo.status == 'resolvido' and resumo.entradas:
+            resolucao_por_setor[resumo.setor][0] += resumo.entradas
+            resolucao_por_setor[resumo.setor][1] += resumo.segundos_resolucao
+            histograma = [a + b for a, b in zip(histograma, resumo.histograma_resolucao)]
+        if atualizado_em is None or resumo.atualizado_em > atualizado_em:
+            atualizado_em = resumo.atualizado_em
+
+    resolvidos = sum(quantidade for quantidade, _ in resolucao_por_setor.values())
+    segundos = sum(soma for _, soma in resolucao_por_setor.values())
+    return {
+        'desde': desde.isoformat(),
+        'ate': ate.isoformat(),
+        'agrupamento': agrupamento,
+        'atualizado_em': atualizado_em.isoformat() if atualizado_em else None,
+        'periodos': [
+            {
+                'inicio': inicio.isoformat(),
+                'criados': dados['criados'],
+                'criados_por_setor': {setor: dados['criados_por_setor'].get(setor, 0) for setor in SETORES},
+                'entradas_por_status': {status: dados['entradas_por_status'].get(status, 0) for status in STATUS},
+            }
+            for inicio, dados in sorted(periodos.items())
+        ],
+        'resolucao': {
+            'quantidade': resolvidos,
+            'media_horas': _media_horas(segundos, resolvidos),
+            'por_setor': {
+                setor: {'quantidade': quantidade, 'media_horas': _media_horas(soma, quantidade)}
+                for setor, (quantidade, soma) in sorted(resolucao_por_setor.items())
+            },
+            'histograma': [
+                {'faixa': faixa, 'quantidade': quantidade}
+                for faixa, quantidade in zip(FAIXAS_HISTOGRAMA, histograma)
+            ],
+        },
+    }
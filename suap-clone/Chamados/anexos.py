@@ -0,0 +1,247 @@
+# Chamados/anexos.py
+"""
+Anexos dos chamados (capturas de tela e PDFs).
+
+O envio é feito em partes retomáveis: iniciar_envio() cria um EnvioAnexo
+e cada PUT grava a parte recebida direto no arquivo parcial, lendo a
+requisição em blocos (nada do arquivo fica inteiro na memória). Ao receber
+o último byte, o conteúdo é conferido, identificado pelo SHA-256 e, se um
+arquivo idêntico já existir, reaproveitado em vez de gravado de novo.
+
+O download aceita Range (um intervalo por requisição) e lê o trecho pedido
+em blocos; com ANEXOS_X_ACCEL_REDIRECT configurado, o envio dos bytes fica
+com o nginx.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Anexo, ArquivoAnexo, EnvioAnexo, armazenamento_anexos
+
+TAMANHO_BLOCO = 64 * 1024
+TAMANHO_MAXIMO = 20 * 1024 * 1024
+TAMANHO_MAXIMO_PARTE = 5 * 1024 * 1024
+COTA_POR_USUARIO = 200 * 1024 * 1024
+VALIDADE_ENVIO = timedelta(hours=24)
+
+# Tipos aceitos e a assinatura com que o conteúdo deve começar
+ASSINATURAS = {
+    'image/png': (b'\x89PNG\r\n\x1a\n',),
+    'image/jpeg': (b'\xff\xd8\xff',),
+    'image/gif': (b'GIF87a', b'GIF89a'),
+    'image/webp': (b'RIFF',),
+    'application/pdf': (b'%PDF-',),
+}
+
+
+class AnexoInvalido(Exception):
+    pass
+
+
+class ConflitoDeEnvio(Exception):
+    """A parte não começa onde o envio parou; `recebido` diz onde continuar."""
+
+    def __init__(self, recebido):
+        super().__init__(f"O envio está em {recebido} bytes.")
+        self.recebido = recebido
+
+
+def tipo_do_arquivo(nome):
+    tipo, _ = mimetypes.guess_type(nome)
+    if tipo not in ASSINATURAS:
+        raise AnexoInvalido("Só são aceitos imagens (PNG, JPEG, GIF, WebP) e PDF.")
+    return tipo
+
+
+def espaco_usado(user):
+    """Bytes dos anexos do usuário mais os dos envios ainda em andamento."""
+    enviados = Anexo.objects.filter(enviado_por=user).aggregate(total=Sum('arquivo__tamanho'))['total'] or 0
+    pendentes = EnvioAnexo.objects.filter(enviado_por=user).aggregate(total=Sum('tamanho'))['total'] or 0
+    return enviados + pendentes
+
+
+def iniciar_envio(chamado, user, nome, tamanho):
+    nome = os.path.basename(nome or '').strip()[:255]
+    if not nome:
+        raise AnexoInvalido("Informe o nome do arquivo.")
+    tipo = tipo_do_arquivo(nome)
+    if tamanho <= 0 or tamanho > TAMANHO_MAXIMO:
+        raise AnexoInvalido(f"O arquivo deve ter até {TAMANHO_MAXIMO // (1024 * 1024)} MB.")
+    if espaco_usado(user) + tamanho > COTA_POR_USUARIO:
+        raise AnexoInvalido("Cota de anexos esgotada.")
+
+    envio = EnvioAnexo.objects.create(chamado=chamado, enviado_por=user, nome=nome, tipo=tipo, tamanho=tamanho)
+    os.makedirs(os.path.dirname(envio.caminho_parcial), exist_ok=True)
+    open(envio.caminho_parcial, 'wb').close()
+    return envio
+
+
+def interpretar_content_range(cabecalho, tamanho):
+    """'bytes 0-99/1000' -> (0, 99). Levanta AnexoInvalido se não bater com o envio."""
+    m = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)', (cabecalho or '').strip())
+    if not m:
+        raise AnexoInvalido("Cabeçalho Content-Range ausente ou inválido.")
+    inicio, fim, total = (int(valor) for valor in m.groups())
+    if total != tamanho or fim < inicio or fim >= total:
+        raise AnexoInvalido("Content-Range não corresponde ao arquivo.")
+    if fim - inicio + 1 > TAMANHO_MAXIMO_PARTE:
+        raise AnexoInvalido("Parte grande demais.")
+    return inicio, fim
+
+
+def _gravar_parte(envio, stream, content_range):
+    inicio, fim = interpretar_content_range(content_range, envio.tamanho)
+    if inicio != envio.recebido:
+        raise ConflitoDeEnvio(envio.recebido)
+
+    restante = fim - inicio + 1
+    with open(envio.caminho_parcial, 'r+b') as parcial:
+        parcial.seek(inicio)
+        while restante:
+            bloco = stream.read(min(TAMANHO_BLOCO, restante))
+            if not bloco:
+                break
+            parcial.write(bloco)
+            restante -= len(bloco)
+        parcial.truncate()
+    # Conexão caiu no meio: guarda o que chegou e o cliente retoma dali
+    envio.recebido = fim + 1 - restante
+    envio.save(update_fields=['recebido'])
+
+
+def receber_parte(envio_id, user, stream, content_range):
+    """
+    Grava uma parte do envio lendo `stream` em blocos. Retorna (envio,
+    anexo); `anexo` só vem preenchido quando a parte completou o arquivo.
+    Um PUT num envio que já recebeu tudo só tenta concluí-lo de novo.
+    """
+    with transaction.atomic():
+        # Uma parte por vez para o mesmo envio
+        envio = EnvioAnexo.objects.select_for_update().get(id=envio_id, enviado_por=user)
+        if envio.recebido < envio.tamanho:
+            _gravar_parte(envio, stream, content_range)
+        # Já completo: a conclusão falhou numa tentativa anterior e é refeita abaixo
+
+    if envio.recebido < envio.tamanho:
+        return envio, None
+    return envio, concluir_envio(envio)
+
+
+def _calcular_hash(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _conferir_assinatura(caminho, tipo):
+    with open(caminho, 'rb') as arquivo:
+        inicio = arquivo.read(16)
+    # RIFF é só o contêiner (também de WAV e AVI): o formato vem no byte 8
+    if not inicio.startswith(ASSINATURAS[tipo]) or (tipo == 'image/webp' and inicio[8:12] != b'WEBP'):
+        raise AnexoInvalido("O conteúdo do arquivo não corresponde à extensão.")
+
+
+def concluir_envio(envio):
+    """Transforma o envio completo em Anexo, reaproveitando conteúdo idêntico."""
+    caminho = envio.caminho_parcial
+    try:
+        _conferir_assinatura(caminho, envio.tipo)
+    except AnexoInvalido:
+        descartar_envio(envio)
+        raise
+    sha256 = _calcular_hash(caminho)
+
+    arquivo = ArquivoAnexo.objects.filter(sha256=sha256).first()
+    if arquivo is None:
+        nome = f'anexos/{sha256[:2]}/{sha256}'
+        destino = armazenamento_anexos.path(nome)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Link em vez de mover: se algo falhar daqui em diante, o arquivo
+        # parcial continua no lugar e o envio pode ser concluído de novo
+        try:
+            os.link(caminho, destino)
+        except FileExistsError:
+            # Sobra de uma tentativa anterior; o nome é o hash, então o conteúdo é o mesmo
+            pass
+        try:
+            with transaction.atomic():
+                arquivo = ArquivoAnexo.objects.create(sha256=sha256, arquivo=nome, tamanho=envio.tamanho, tipo=envio.tipo)
+        except IntegrityError:
+            # Outro envio idêntico terminou ao mesmo tempo: o destino é o mesmo
+            arquivo = ArquivoAnexo.objects.get(sha256=sha256)
+
+    with transaction.atomic():
+        anexo = Anexo.objects.create(chamado_id=envio.chamado_id, enviado_por_id=envio.enviado_por_id,
+                                     arquivo=arquivo, nome=envio.nome)
+        envio.delete()
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    return anexo
+
+
+def descartar_envio(envio):
+    if os.path.exists(envio.caminho_parcial):
+        os.remove(envio.caminho_parcial)
+    envio.delete()
+
+
+def limpar_anexos(agora=None):
+    """Remove envios abandonados e conteúdos que nenhum anexo usa mais."""
+    agora = agora or timezone.now()
+    limite = agora - VALIDADE_ENVIO
+    envios = 0
+    for envio in EnvioAnexo.objects.filter(criado_em__lt=limite).iterator():
+        descartar_envio(envio)
+        envios += 1
+    arquivos = 0
+    # Só os antigos: um conteúdo recém-gravado fica sem anexo até concluir_envio criar o Anexo
+    for arquivo in ArquivoAnexo.objects.filter(anexos__isnull=True, criado_em__lt=limite).iterator():
+        arquivo.arquivo.delete(save=False)
+        if arquivo.previa:
+            arquivo.previa.delete(save=False)
+        arquivo.delete()
+        arquivos += 1
+    return envios, arquivos
+
+
+def interpretar_range(cabecalho, tamanho):
+    """
+    Intervalo (inicio, fim) pedido em 'Range: bytes=...', None para o
+    arquivo inteiro (sem Range ou com vários intervalos) ou False se o
+    intervalo não é satisfazível.
+    """
+    m = re.fullmatch(r'bytes=(\d*)-(\d*)', (cabecalho or '').strip())
+    if not m or m.groups() == ('', ''):
+        return None
+    inicio, fim = m.groups()
+    if inicio == '':
+        # Sufixo: os últimos N bytes
+        quantidade = int(fim)
+        if quantidade == 0:
+            return False
+        return max(tamanho - quantidade, 0), tamanho - 1
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or fim < inicio:
+        return False
+    return inicio, fim
+
+
+def ler_intervalo(caminho, inicio, fim):
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        restante = fim - inicio + 1
+        while restante:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, restante))
+            if not bloco:
+                return
+            restante -= len(bloco)
+            yield bloco
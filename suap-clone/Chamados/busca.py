@@ -0,0 +1,179 @@
+# Chamados/busca.py
+"""
+Busca textual de chamados (assunto + descrição) ordenada por relevância.
+
+No MySQL usa o índice FULLTEXT criado pela migração 0003. Nos demais bancos
+(SQLite em desenvolvimento e nos testes) usa um índice invertido em memória,
+montado na primeira busca e mantido pelos sinais de Chamado.
+"""
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Chamado
+
+# Limite de resultados ranqueados devolvidos por uma busca
+LIMITE_RESULTADOS = 500
+# Mesmo tamanho mínimo de palavra do FULLTEXT do InnoDB (innodb_ft_min_token_size)
+TAMANHO_MINIMO_TERMO = 3
+PALAVRAS_VAZIAS = {
+    'que', 'com', 'para', 'por', 'uma', 'dos', 'das', 'nos', 'nas', 'não', 'nao',
+    'mais', 'como', 'mas', 'foi', 'ele', 'ela', 'seu', 'sua', 'são', 'sao', 'ser',
+    'está', 'esta', 'estão', 'estao', 'tem', 'the', 'and',
+}
+
+
+def tokenizar(texto):
+    """Minúsculas, sem acentos, só palavras com pelo menos 3 letras."""
+    if not texto:
+        return []
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return [t for t in re.findall(r'\w+', texto)
+            if len(t) >= TAMANHO_MINIMO_TERMO and t not in PALAVRAS_VAZIAS]
+
+
+class IndiceInvertido:
+    """Índice invertido termo -> {id do chamado: frequência} com ranking TF-IDF."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(dict)
+        self._termos_por_chamado = {}
+        self._construido = False
+
+    def limpar(self):
+        with self._lock:
+            self._postings.clear()
+            self._termos_por_chamado.clear()
+            self._construido = False
+
+    def _construir(self):
+        linhas = Chamado.objects.values_list('id', 'assunto', 'descricao').iterator(chunk_size=2000)
+        for chamado_id, assunto, descricao in linhas:
+            self._indexar(chamado_id, assunto, descricao)
+        self._construido = True
+
+    def _remover(self, chamado_id):
+        for termo in self._termos_por_chamado.pop(chamado_id, ()):
+            postings = self._postings[termo]
+            postings.pop(chamado_id, None)
+            if not postings:
+                del self._postings[termo]
+
+    def _indexar(self, chamado_id, assunto, descricao):
+        self._remover(chamado_id)
+        # O assunto pesa mais que a descrição
+        frequencias = Counter(tokenizar(assunto) * 2 + tokenizar(descricao))
+        for termo, freq in frequencias.items():
+            self._postings[termo][chamado_id] = freq
+        self._termos_por_chamado[chamado_id] = tuple(frequencias)
+
+    def atualizar(self, chamado):
+        with self._lock:
+            if self._construido:
+                self._indexar(chamado.pk, chamado.assunto, chamado.descricao)
+
+    def remover(self, chamado_id):
+        with self._lock:
+            if self._construido:
+                self._remover(chamado_id)
+
+    def buscar(self, consulta, limite=LIMITE_RESULTADOS):
+        """Devolve os ids dos chamados mais relevantes, do mais para o menos."""
+        termos = set(tokenizar(consulta))
+        if not termos:
+            return []
+        with self._lock:
+            if not self._construido:
+                self._construir()
+            total = len(self._termos_por_chamado) or 1
+            pontuacao = defaultdict(float)
+            for termo in termos:
+                postings = self._postings.get(termo)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for chamado_id, freq in postings.items():
+                    pontuacao[chamado_id] += (1 + math.log(freq)) * idf
+        ranking = sorted(pontuacao.items(), key=lambda item: (-item[1], -item[0]))
+        return [chamado_id for chamado_id, _ in ranking[:limite]]
+
+
+indice = IndiceInvertido()
+
+
+def usa_fulltext():
+    return connection.vendor == 'mysql'
+
+
+def termos_curtos(consulta):
+    """
+    Palavras que o índice ignora por serem curtas demais (ex.: o "1" de
+    "Aberto 1"), como foram digitadas.
+    """
+    return [t for t in re.findall(r'\w+', (consulta or '').lower()) if len(t) < TAMANHO_MINIMO_TERMO]
+
+
+def _filtro_por_trechos(termos):
+    # Como na busca antiga (icontains): cada termo no assunto ou na descrição
+    filtro = Q()
+    for termo in termos:
+        filtro &= Q(assunto__icontains=termo) | Q(descricao__icontains=termo)
+    return filtro
+
+
+def _ids_por_autor(consulta, queryset, limite):
+    """Chamados cujo autor tem `consulta` no nome de usuário (do mais novo ao mais antigo)."""
+    # A tabela de usuários é pequena; dos autores encontrados, os chamados vêm pelo índice da FK
+    autores = get_user_model().objects.filter(username__icontains=consulta.strip()).values('id')
+    return list(queryset.filter(criado_por__in=autores).order_by('-id').values_list('id', flat=True)[:limite])
+
+
+def buscar_ids(consulta, queryset=None, limite=LIMITE_RESULTADOS):
+    """
+    Ids dos chamados de `queryset` que casam com `consulta`, ordenados por
+    relevância (mais relevante primeiro). Termos curtos demais para o índice
+    (termos_curtos) precisam aparecer no assunto ou na descrição. Depois dos
+    que casam pelo texto vêm os chamados de autores com `consulta` no nome de
+    usuário.
+    """
+    if queryset is None:
+        queryset = Chamado.objects.all()
+
+    if usa_fulltext():
+        tabela = connection.ops.quote_name(Chamado._meta.db_table)
+        relevancia = RawSQL(
+            f'MATCH ({tabela}.assunto, {tabela}.descricao) AGAINST (%s IN NATURAL LANGUAGE MODE)',
+            (consulta,),
+        )
+        ids = list(
+            queryset.annotate(relevancia=relevancia)
+            .filter(relevancia__gt=0)
+            .order_by('-relevancia', '-id')
+            .values_list('id', flat=True)[:limite]
+        )
+    else:
+        ids = indice.buscar(consulta, limite)
+
+    curtos = termos_curtos(consulta)
+    if ids and (curtos or not usa_fulltext()):
+        # Aplica os demais filtros do queryset (status, dono...) e exige os
+        # termos curtos, que o índice não vê, preservando o ranking
+        permitidos = set(queryset.filter(_filtro_por_trechos(curtos), id__in=ids).values_list('id', flat=True))
+        ids = [chamado_id for chamado_id in ids if chamado_id in permitidos]
+    elif not ids and any(termo.isdigit() for termo in curtos):
+        # Só números curtos (ex.: "12"): o índice não ajuda, vale a busca por trecho
+        ids = list(queryset.filter(_filtro_por_trechos(curtos)).order_by('-id').values_list('id', flat=True)[:limite])
+
+    if len(ids) < limite and consulta.strip():
+        encontrados = set(ids)
+        ids += [chamado_id for chamado_id in _ids_por_autor(consulta, queryset, limite) if chamado_id not in encontrados]
+    return ids[:limite]
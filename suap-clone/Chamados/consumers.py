@@ -0,0 +1,35 @@
+# Chamados/consumers.py
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .notificacoes import grupo_do_usuario
+
+
+class StatusChamadosConsumer(AsyncJsonWebsocketConsumer):
+    """Canal por usuário com as mudanças de status dos seus chamados."""
+
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated:
+            await self.close()
+            return
+        self.grupo = grupo_do_usuario(user.pk)
+        await self.channel_layer.group_add(self.grupo, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'grupo'):
+            await self.channel_layer.group_discard(self.grupo, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Canal só de saída
+        pass
+
+    async def chamado_status(self, event):
+        await self.send_json({
+            'chamado_id': event['chamado_id'],
+            'status': event['status'],
+            'status_display': event['status_display'],
+            'status_anterior': event['status_anterior'],
+            'mensagem': event['mensagem'],
+            'data_atualizacao': event['data_atualizacao'],
+        })
@@ -0,0 +1,78 @@
+# Chamados/contadores.py
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Chamado
+
+# Cada contador fica numa chave própria para poder ser incrementado de forma
+# atômica com cache.incr/decr quando um chamado é salvo ou excluído.
+PREFIXO_CHAVE = 'chamados:contador:'
+CHAVE_TOTAL = PREFIXO_CHAVE + 'total'
+# Rede de segurança: mesmo que algum contador se perca (ex.: queryset.update()
+# não dispara sinais), ele é recalculado depois deste tempo.
+TIMEOUT_CONTADORES = 60 * 5
+
+
+def _chave_status(status):
+    return PREFIXO_CHAVE + status
+
+
+def _todas_as_chaves():
+    return [CHAVE_TOTAL] + [_chave_status(valor) for valor, _ in Chamado.STATUS_CHOICES]
+
+
+def contar_por_status():
+    """Conta os chamados por status em uma única consulta (agregação condicional)."""
+    agregacoes = {'total': Count('id')}
+    for valor, _ in Chamado.STATUS_CHOICES:
+        agregacoes[valor] = Count('id', filter=Q(status=valor))
+    return Chamado.objects.aggregate(**agregacoes)
+
+
+def obter_contadores():
+    """
+    Devolve {'total': n, '<status>': n, ...} lendo do cache. Só consulta o
+    banco (uma vez) se algum contador estiver ausente.
+    """
+    chaves = _todas_as_chaves()
+    em_cache = cache.get_many(chaves)
+    if len(em_cache) == len(chaves):
+        return {chave[len(PREFIXO_CHAVE):]: valor for chave, valor in em_cache.items()}
+
+    contadores = contar_por_status()
+    cache.set_many(
+        {PREFIXO_CHAVE + nome: valor for nome, valor in contadores.items()},
+        TIMEOUT_CONTADORES,
+    )
+    return contadores
+
+
+def invalidar_contadores():
+    cache.delete_many(_todas_as_chaves())
+
+
+def ajustar_contadores(status_anterior=None, status_novo=None, delta_total=0, quantidade=1):
+    """
+    Atualiza os contadores em cache sem tocar no banco. Se alguma chave
+    estiver ausente, todas são descartadas para forçar um recálculo completo.
+    `quantidade` é o número de chamados que passaram de um status ao outro.
+    """
+    ajustes = []
+    if delta_total:
+        ajustes.append((CHAVE_TOTAL, delta_total))
+    if status_anterior:
+        ajustes.append((_chave_status(status_anterior), -quantidade))
+    if status_novo:
+        ajustes.append((_chave_status(status_novo), quantidade))
+
+    try:
+        for chave, delta in ajustes:
+            cache.incr(chave, delta)
+    except ValueError:
+        invalidar_contadores()
+
+
+
+def total_por_status(status=None):
+    """Total exibido na fila da equipe, vindo dos contadores em cache."""
+    return obter_contadores().get(status or 'total', 0)
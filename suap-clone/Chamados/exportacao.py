@@ -0,0 +1,116 @@
+# Chamados/exportacao.py
+"""
+Exportação dos chamados com o histórico de status, em CSV ou JSON Lines.
+
+Tudo é gerado linha a linha: os chamados são lidos em lotes pela chave
+(data_criacao, id) e o histórico é pré-carregado a cada lote, então a
+memória usada não cresce com o período exportado e o primeiro byte sai logo
+(usado pelo comando export_chamados e pela view exportar_chamados).
+"""
+import csv
+import json
+from datetime import datetime, time
+
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+from .models import AtualizacaoChamado, Chamado
+
+FORMATOS = ('csv', 'jsonl')
+TAMANHO_LOTE = 500
+
+COLUNAS = (
+    'id', 'assunto', 'descricao', 'criado_por', 'setor', 'urgencia', 'status',
+    'data_criacao', 'data_atualizacao', 'historico',
+)
+
+
+class _Eco:
+    """Pseudo-arquivo para o csv.writer: devolve a linha em vez de guardá-la."""
+
+    def write(self, valor):
+        return valor
+
+
+def chamados_para_exportar(status=None, desde=None, ate=None):
+    """Chamados (com o histórico) criados entre as datas `desde` e `ate`, inclusive."""
+    chamados = Chamado.objects.select_related('criado_por').prefetch_related(
+        Prefetch('atualizacaochamado_set', queryset=AtualizacaoChamado.objects.linha_do_tempo(), to_attr='atualizacoes')
+    ).order_by('data_criacao', 'id')
+    if status:
+        chamados = chamados.filter(status=status)
+    # Limites como datetimes para o filtro continuar usando o índice de data_criacao
+    if desde:
+        chamados = chamados.filter(data_criacao__gte=timezone.make_aware(datetime.combine(desde, time.min)))
+    if ate:
+        chamados = chamados.filter(data_criacao__lte=timezone.make_aware(datetime.combine(ate, time.max)))
+    return chamados
+
+
+def _historico(chamado):
+    return [
+        {
+            'data': atualizacao.data_atualizacao.isoformat(),
+            'responsavel': atualizacao.responsavel.username if atualizacao.responsavel else None,
+            'status_anterior': atualizacao.status_anterior,
+            'status_novo': atualizacao.status_novo,
+            'mensagem': atualizacao.mensagem,
+        }
+        for atualizacao in chamado.atualizacoes
+    ]
+
+
+def serializar(chamado):
+    return {
+        'id': chamado.id,
+        'assunto': chamado.assunto,
+        'descricao': chamado.descricao,
+        'criado_por': chamado.criado_por.username,
+        'setor': chamado.setor,
+        'urgencia': chamado.urgencia,
+        'status': chamado.status,
+        'data_criacao': chamado.data_criacao.isoformat(),
+        'data_atualizacao': chamado.data_atualizacao.isoformat(),
+        'historico': _historico(chamado),
+    }
+
+
+def _iterar(chamados, tamanho_lote):
+    # Uma consulta com LIMIT por lote, continuando do último chamado lido: no
+    # MySQL o .iterator() não usa cursor no servidor e traria tudo de uma vez
+    chamados = chamados.order_by('data_criacao', 'id')
+    ultimo = None
+    while True:
+        lote = chamados
+        if ultimo is not None:
+            lote = lote.filter(
+                Q(data_criacao__gt=ultimo.data_criacao) | Q(data_criacao=ultimo.data_criacao, id__gt=ultimo.id)
+            )
+        lote = list(lote[:tamanho_lote])
+        for chamado in lote:
+            yield serializar(chamado)
+        if len(lote) < tamanho_lote:
+            return
+        ultimo = lote[-1]
+
+
+def linhas_csv(chamados, tamanho_lote=TAMANHO_LOTE):
+    """Uma linha por chamado; o histórico vai como JSON na última coluna."""
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUNAS)
+    for dados in _iterar(chamados, tamanho_lote):
+        dados['historico'] = json.dumps(dados['historico'], ensure_ascii=False)
+        yield escritor.writerow([dados[coluna] for coluna in COLUNAS])
+
+
+def linhas_jsonl(chamados, tamanho_lote=TAMANHO_LOTE):
+    for dados in _iterar(chamados, tamanho_lote):
+        yield json.dumps(dados, ensure_ascii=False) + '\n'
+
+
+def exportar(chamados, formato, tamanho_lote=TAMANHO_LOTE):
+    if formato == 'csv':
+        return linhas_csv(chamados, tamanho_lote)
+    if formato == 'jsonl':
+        return linhas_jsonl(chamados, tamanho_lote)
+    raise ValueError(f"Formato desconhecido: {formato}")
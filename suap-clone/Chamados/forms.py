@@ -1,6 +1,23 @@
+import argparse
+
 from django import forms
+from django.utils.dateparse import parse_date
+
+from .analiticos import AGRUPAMENTOS
+from .exportacao import FORMATOS
 from .models import Chamado
 
+def data_iso(valor):
+    """Data AAAA-MM-DD vinda da linha de comando (type= dos argumentos dos comandos)."""
+    try:
+        data = parse_date(valor)
+    except ValueError:
+        data = None
+    if data is None:
+        raise argparse.ArgumentTypeError(f"Data inválida: {valor!r} (use AAAA-MM-DD)")
+    return data
+
+
 class ChamadoForm(forms.ModelForm):
     class Meta:
         model = Chamado
@@ -38,3 +55,59 @@ class ChamadoForm(forms.ModelForm):
             raise forms.ValidationError("A descrição deve ter pelo menos 20 caracteres.")
         return descricao
     
+
+
+class AlteracaoStatusEmMassaForm(forms.Form):
+    """ Alteração de status em massa: por lista de ids e/ou por filtro """
+    status = forms.ChoiceField(choices=Chamado.STATUS_CHOICES)
+    mensagem = forms.CharField(required=False, max_length=1000)
+    ids = forms.CharField(required=False, help_text="Ids separados por vírgula")
+    filtro_status = forms.ChoiceField(choices=Chamado.STATUS_CHOICES, required=False)
+    filtro_setor = forms.ChoiceField(choices=Chamado.SETOR_CHOICES, required=False)
+    filtro_urgencia = forms.ChoiceField(choices=Chamado.URGENCIA_CHOICES, required=False)
+
+    def clean_ids(self):
+        ids = self.cleaned_data.get('ids', '')
+        if not ids.strip():
+            return None
+        try:
+            return [int(id_) for id_ in ids.split(',') if id_.strip()]
+        except ValueError:
+            raise forms.ValidationError("Informe os ids separados por vírgula.")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        filtros = self.filtros()
+        if cleaned_data.get('ids') is None and not filtros:
+            # Sem ids nem filtro a operação atingiria todos os chamados
+            raise forms.ValidationError("Informe os ids ou ao menos um filtro.")
+        return cleaned_data
+
+    def filtros(self):
+        campos = {'filtro_status': 'status', 'filtro_setor': 'setor', 'filtro_urgencia': 'urgencia'}
+        return {
+            campo: self.cleaned_data[nome]
+            for nome, campo in campos.items()
+            if self.cleaned_data.get(nome)
+        }
+
+
+class ExportacaoForm(forms.Form):
+    formato = forms.ChoiceField(choices=[(f, f) for f in FORMATOS], required=False)
+    status = forms.ChoiceField(choices=Chamado.STATUS_CHOICES, required=False)
+    desde = forms.DateField(required=False)
+    ate = forms.DateField(required=False)
+
+
+class IndicadoresForm(forms.Form):
+    desde = forms.DateField(required=False)
+    ate = forms.DateField(required=False)
+    agrupamento = forms.ChoiceField(choices=[(a, a) for a in AGRUPAMENTOS], required=False)
+    formato = forms.ChoiceField(choices=[('html', 'html'), ('json', 'json')], required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        desde, ate = cleaned_data.get('desde'), cleaned_data.get('ate')
+        if desde and ate and desde > ate:
+            raise forms.ValidationError("A data inicial deve ser anterior à final.")
+        return cleaned_data
@@ -0,0 +1,41 @@
+# Chamados/idempotencia.py
+"""
+Deduplicação de envios pelo cabeçalho Idempotency-Key.
+
+A primeira requisição com uma chave reserva a chave no cache (cache.add é
+atômico) e, ao terminar, grava ali a resposta. Repetições com a mesma
+chave recebem a resposta gravada, ou 409 enquanto a primeira ainda está em
+andamento, sem chegar ao banco.
+
+A reserva só protege entre processos com um cache compartilhado
+(CACHE=redis, ver core/settings.py), onde o add vira um SET NX no Redis.
+Com o cache em memória cada processo tem as suas chaves, e uma repetição
+atendida por outro processo cria o chamado de novo.
+"""
+from django.core.cache import cache
+
+PREFIXO_CHAVE = 'chamados:idempotencia:'
+TIMEOUT_CHAVES = 60 * 10
+TAMANHO_MAXIMO_CHAVE = 200
+
+EM_ANDAMENTO = 'em_andamento'
+
+
+def chave_de(user_id, idempotency_key):
+    # A chave é por usuário: a de outro usuário nunca devolve esta resposta
+    return f'{PREFIXO_CHAVE}{user_id}:{idempotency_key}'
+
+
+async def reservar(chave):
+    """True se a chave era nova; senão, o que está gravado nela."""
+    if await cache.aadd(chave, EM_ANDAMENTO, TIMEOUT_CHAVES):
+        return True, None
+    return False, await cache.aget(chave)
+
+
+async def gravar_resposta(chave, status, corpo):
+    await cache.aset(chave, {'status': status, 'corpo': corpo}, TIMEOUT_CHAVES)
+
+
+async def liberar(chave):
+    await cache.adelete(chave)
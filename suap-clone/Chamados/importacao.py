@@ -0,0 +1,136 @@
+# Chamados/importacao.py
+"""
+Importação em massa de chamados legados (comando import_chamados).
+
+O arquivo (CSV ou JSON Lines) é lido em lotes: cada linha passa pelas
+mesmas regras do ChamadoForm, os autores do lote são resolvidos numa
+consulta só e os chamados válidos entram com um bulk_create por lote. A
+coluna opcional data_criacao (data ou data e hora ISO 8601) preserva a
+abertura original do chamado, e o prazo de SLA é contado a partir dela.
+"""
+import csv
+import json
+from datetime import datetime, time
+from functools import partial
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .busca import indice
+from .contadores import invalidar_contadores
+from .forms import ChamadoForm
+from .meus_chamados import invalidar as invalidar_listas
+from .models import Chamado
+from .sla import aplicar_prazo
+
+FORMATOS = ('csv', 'jsonl')
+TAMANHO_LOTE = 1000
+
+STATUS_VALIDOS = {valor for valor, _ in Chamado.STATUS_CHOICES}
+
+
+def ler_linhas(arquivo, formato):
+    """Gera (número da linha, dados) sem carregar o arquivo inteiro."""
+    if formato == 'csv':
+        for numero, dados in enumerate(csv.DictReader(arquivo), start=2):
+            yield numero, dados
+    elif formato == 'jsonl':
+        for numero, linha in enumerate(arquivo, start=1):
+            if not linha.strip():
+                continue
+            try:
+                dados = json.loads(linha)
+            except ValueError:
+                dados = None
+            yield numero, dados if isinstance(dados, dict) else {'__invalido__': linha.rstrip('\n')}
+    else:
+        raise ValueError(f"Formato desconhecido: {formato}")
+
+
+def em_lotes(linhas, tamanho):
+    while True:
+        lote = list(islice(linhas, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def _data_criacao(valor):
+    """Data de abertura informada na linha; None se vazia. ValueError se inválida."""
+    valor = str(valor or '').strip()
+    if not valor:
+        return None
+    instante = parse_datetime(valor)
+    if instante is None:
+        dia = parse_date(valor)
+        if dia is None:
+            raise ValueError(valor)
+        instante = datetime.combine(dia, time.min)
+    if timezone.is_naive(instante):
+        instante = timezone.make_aware(instante)
+    return instante
+
+
+def _erros_do_form(form):
+    return '; '.join(
+        f"{campo}: {' '.join(mensagens)}" if campo != '__all__' else ' '.join(mensagens)
+        for campo, mensagens in form.errors.items()
+    )
+
+
+def validar_lote(lote):
+    """
+    Valida um lote de (número, dados). Retorna (chamados válidos ainda não
+    salvos, rejeitados como (número, dados, erro)). Faz uma consulta só,
+    para buscar os autores de todo o lote.
+    """
+    nomes = {str(dados.get('criado_por', '')).strip() for _, dados in lote if '__invalido__' not in dados}
+    autores = get_user_model().objects.filter(username__in=nomes).in_bulk(field_name='username')
+
+    validos, rejeitados = [], []
+    for numero, dados in lote:
+        if '__invalido__' in dados:
+            rejeitados.append((numero, dados, "Linha não é um objeto JSON válido."))
+            continue
+        form = ChamadoForm(data={campo: dados.get(campo) or '' for campo in ChamadoForm.Meta.fields})
+        erros = [] if form.is_valid() else [_erros_do_form(form)]
+
+        autor = autores.get(str(dados.get('criado_por', '')).strip())
+        if autor is None:
+            erros.append(f"criado_por: usuário {dados.get('criado_por')!r} não existe.")
+        status = dados.get('status') or 'aberto'
+        if status not in STATUS_VALIDOS:
+            erros.append(f"status: {status!r} não é um status válido.")
+        try:
+            data_criacao = _data_criacao(dados.get('data_criacao'))
+        except ValueError:
+            erros.append(f"data_criacao: {dados.get('data_criacao')!r} não é uma data válida.")
+
+        if erros:
+            rejeitados.append((numero, dados, '; '.join(erros)))
+            continue
+        chamado = form.save(commit=False)
+        chamado.criado_por = autor
+        chamado.status = status
+        if data_criacao is not None:
+            chamado.data_criacao = data_criacao
+        validos.append(aplicar_prazo(chamado))
+    return validos, rejeitados
+
+
+def importar_lote(lote):
+    """Valida e grava um lote; devolve (quantidade importada, rejeitados)."""
+    validos, rejeitados = validar_lote(lote)
+    if validos:
+        with transaction.atomic():
+            Chamado.objects.bulk_create(validos)
+            # bulk_create não dispara os sinais: o prazo de SLA é aplicado na
+            # validação, e os contadores, o índice de busca e as listas dos
+            # autores são recalculados sob demanda depois do commit
+            transaction.on_commit(invalidar_contadores)
+            transaction.on_commit(indice.limpar)
+            transaction.on_commit(partial(invalidar_listas, *{c.criado_por_id for c in validos}))
+    return len(validos), rejeitados
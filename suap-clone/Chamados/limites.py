@@ -0,0 +1,47 @@
+# Chamados/limites.py
+"""
+Limite de criação de chamados por usuário (token bucket) guardado só no
+cache, para que envios abusivos sejam barrados antes de qualquer acesso ao
+banco. Cada usuário tem um balde de RAJADA fichas, reposto à taxa de
+FICHAS_POR_MINUTO; cada chamado criado consome uma ficha.
+
+O balde só é o mesmo para todos os processos com um cache compartilhado
+(CACHE=redis, ver core/settings.py). Com o cache em memória cada processo
+tem o seu balde, e o limite real vira RAJADA vezes o número de processos.
+"""
+import math
+import time
+
+from django.core.cache import cache
+
+PREFIXO_BALDE = 'chamados:limite:'
+RAJADA = 10
+FICHAS_POR_MINUTO = 6
+
+
+def _taxa_por_segundo():
+    return FICHAS_POR_MINUTO / 60
+
+
+async def consumir_ficha(user_id, agora=None):
+    """
+    Tenta consumir uma ficha do balde do usuário. Retorna (permitido,
+    segundos até a próxima ficha). A leitura e a escrita não são atômicas:
+    requisições simultâneas do mesmo usuário que leem o mesmo estado podem
+    gastar a mesma ficha, então o excesso é de no máximo uma ficha por
+    requisição em andamento ao mesmo tempo. Isso é aceitável aqui.
+    """
+    agora = time.time() if agora is None else agora
+    chave = f'{PREFIXO_BALDE}{user_id}'
+    taxa = _taxa_por_segundo()
+    estado = await cache.aget(chave)
+    if estado is None:
+        fichas = RAJADA
+    else:
+        fichas_salvas, instante = estado
+        fichas = min(RAJADA, fichas_salvas + max(agora - instante, 0) * taxa)
+    if fichas < 1:
+        return False, math.ceil((1 - fichas) / taxa)
+    # Depois de encher o balde de novo a chave não faz mais diferença
+    await cache.aset(chave, (fichas - 1, agora), math.ceil(RAJADA / taxa))
+    return True, 0
@@ -0,0 +1,34 @@
+# Chamados/management/commands/atualizar_resumos.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Chamados.analiticos import atualizar_resumos, dias_pendentes
+from Chamados.forms import data_iso
+
+
+class Command(BaseCommand):
+    help = (
+        "Atualiza a tabela de indicadores (ResumoDiario). Sem datas, recalcula "
+        "só os dias desde a última atualização; com --desde/--ate, o intervalo informado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=data_iso, help="Primeiro dia a recalcular (AAAA-MM-DD)")
+        parser.add_argument('--ate', type=data_iso, help="Último dia a recalcular (AAAA-MM-DD)")
+
+    def handle(self, *args, **options):
+        pendentes = dias_pendentes()
+        if pendentes is None:
+            self.stdout.write("Nenhum chamado cadastrado; nada a consolidar.")
+            return
+        desde = options['desde'] or pendentes[0]
+        ate = options['ate'] or pendentes[1]
+        if desde > ate:
+            raise CommandError("--desde deve ser anterior a --ate.")
+
+        inicio = time.perf_counter()
+        total = atualizar_resumos(desde, ate)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} resumo(s) gravado(s) de {desde} a {ate} em {time.perf_counter() - inicio:.2f}s."
+        ))
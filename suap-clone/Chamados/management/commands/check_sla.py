@@ -0,0 +1,29 @@
+# Chamados/management/commands/check_sla.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Chamados.sla import TAMANHO_LOTE, verificar_sla
+
+
+class Command(BaseCommand):
+    help = (
+        "Registra o estouro de SLA dos chamados com prazo vencido. Roda uma vez "
+        "(para o cron) ou, com --intervalo, continuamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Chamados escalados por transação")
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos entre as verificações; 0 verifica uma vez e sai")
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError("--lote deve ser positivo.")
+        while True:
+            inicio = time.perf_counter()
+            escalados = verificar_sla(tamanho_lote=options['lote'])
+            self.stdout.write(f"{escalados} chamado(s) com SLA estourado em {time.perf_counter() - inicio:.2f}s")
+            if not options['intervalo']:
+                return
+            time.sleep(options['intervalo'])
@@ -0,0 +1,41 @@
+# Chamados/management/commands/export_chamados.py
+from django.core.management.base import BaseCommand, CommandError
+
+from Chamados.exportacao import FORMATOS, TAMANHO_LOTE, chamados_para_exportar, exportar
+from Chamados.forms import data_iso
+from Chamados.models import Chamado
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta os chamados com o histórico de status em CSV ou JSON Lines, "
+        "gravando à medida que lê (memória constante)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=FORMATOS, default='csv')
+        parser.add_argument('--saida', help="Arquivo de destino; sem ele, escreve na saída padrão")
+        parser.add_argument('--status', choices=[valor for valor, _ in Chamado.STATUS_CHOICES])
+        parser.add_argument('--desde', type=data_iso, help="Criados a partir desta data (AAAA-MM-DD)")
+        parser.add_argument('--ate', type=data_iso, help="Criados até esta data, inclusive (AAAA-MM-DD)")
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Chamados lidos do banco por vez")
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError("--lote deve ser positivo.")
+        chamados = chamados_para_exportar(options['status'], options['desde'], options['ate'])
+        linhas = exportar(chamados, options['formato'], options['lote'])
+
+        if not options['saida']:
+            for linha in linhas:
+                self.stdout.write(linha, ending='')
+            return
+
+        with open(options['saida'], 'w', encoding='utf-8', newline='') as arquivo:
+            total = 0
+            for linha in linhas:
+                arquivo.write(linha)
+                total += 1
+        if options['formato'] == 'csv':
+            total -= 1  # cabeçalho
+        self.stderr.write(f"{total} chamado(s) exportado(s) para {options['saida']}")
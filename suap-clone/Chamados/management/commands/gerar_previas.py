@@ -0,0 +1,30 @@
+# Chamados/management/commands/gerar_previas.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Chamados.previas import TAMANHO_LOTE, gerar_previas
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera as miniaturas dos anexos ainda sem prévia. Roda uma vez (para o "
+        "cron) ou, com --intervalo, continuamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Arquivos reservados por vez")
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos entre as verificações; 0 processa os pendentes e sai")
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError("--lote deve ser positivo.")
+        while True:
+            inicio = time.perf_counter()
+            resultado = gerar_previas(tamanho_lote=options['lote'])
+            resumo = ', '.join(f"{quantidade} {status}" for status, quantidade in sorted(resultado.items())) or 'nenhuma pendente'
+            self.stdout.write(f"Prévias: {resumo} em {time.perf_counter() - inicio:.2f}s")
+            if not options['intervalo']:
+                return
+            time.sleep(options['intervalo'])
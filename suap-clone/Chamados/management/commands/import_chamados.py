@@ -0,0 +1,63 @@
+# Chamados/management/commands/import_chamados.py
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Chamados.importacao import FORMATOS, TAMANHO_LOTE, em_lotes, importar_lote, ler_linhas
+
+COLUNAS_RELATORIO = (
+    'linha', 'erro', 'criado_por', 'assunto', 'descricao', 'setor', 'urgencia', 'status', 'data_criacao',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa chamados legados de um CSV ou JSON Lines, validando com as "
+        "regras do ChamadoForm e gravando em lotes com bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--formato', choices=FORMATOS,
+                            help="Padrão: deduzido da extensão do arquivo")
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Linhas validadas e gravadas por vez")
+        parser.add_argument('--rejeitados',
+                            help="Relatório CSV das linhas rejeitadas (padrão: <arquivo>.rejeitados.csv)")
+
+    def handle(self, *args, **options):
+        arquivo = options['arquivo']
+        formato = options['formato'] or ('jsonl' if arquivo.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if options['lote'] < 1:
+            raise CommandError("--lote deve ser positivo.")
+        caminho_rejeitados = options['rejeitados'] or f'{arquivo}.rejeitados.csv'
+
+        try:
+            entrada = open(arquivo, encoding='utf-8', newline='')
+        except OSError as erro:
+            raise CommandError(f"Não foi possível abrir {arquivo}: {erro}")
+
+        inicio = time.perf_counter()
+        lidas = importadas = rejeitadas = 0
+        with entrada, open(caminho_rejeitados, 'w', encoding='utf-8', newline='') as saida:
+            relatorio = csv.writer(saida)
+            relatorio.writerow(COLUNAS_RELATORIO)
+            for lote in em_lotes(ler_linhas(entrada, formato), options['lote']):
+                quantidade, rejeitados = importar_lote(lote)
+                lidas += len(lote)
+                importadas += quantidade
+                rejeitadas += len(rejeitados)
+                for numero, dados, erro in rejeitados:
+                    relatorio.writerow([numero, erro] + [dados.get(coluna, '') for coluna in COLUNAS_RELATORIO[2:]])
+                self.stderr.write(f"{lidas} linha(s) lida(s), {self._vazao(lidas, inicio):.0f} linhas/s")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{importadas} chamado(s) importado(s), {rejeitadas} rejeitado(s) de {lidas} linha(s) "
+            f"em {time.perf_counter() - inicio:.2f}s ({self._vazao(lidas, inicio):.0f} linhas/s)."
+        ))
+        if rejeitadas:
+            self.stdout.write(f"Linhas rejeitadas em {caminho_rejeitados}")
+
+    @staticmethod
+    def _vazao(linhas, inicio):
+        return linhas / max(time.perf_counter() - inicio, 1e-9)
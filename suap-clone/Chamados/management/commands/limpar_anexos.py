@@ -0,0 +1,12 @@
+# Chamados/management/commands/limpar_anexos.py
+from django.core.management.base import BaseCommand
+
+from Chamados.anexos import limpar_anexos
+
+
+class Command(BaseCommand):
+    help = "Remove envios de anexos abandonados (mais de 24h) e arquivos que nenhum anexo usa mais."
+
+    def handle(self, *args, **options):
+        envios, arquivos = limpar_anexos()
+        self.stdout.write(f"{envios} envio(s) abandonado(s) e {arquivos} arquivo(s) sem uso removidos.")
@@ -0,0 +1,60 @@
+# Chamados/meus_chamados.py
+"""
+Lista "Meus chamados" de cada usuário.
+
+A consulta traz só as colunas exibidas na lista. Da descrição vem apenas um
+trecho cortado pelo próprio banco (Left), nunca o TextField inteiro. O HTML
+de cada página da lista fica em cache por usuário. As chaves levam uma
+versão por usuário: mudar qualquer chamado dele troca a versão e todas as
+páginas guardadas deixam de valer de uma vez (ver signals.py e operacoes.py).
+"""
+import hashlib
+
+from django.db.models.functions import Left
+
+from App.versoes import trocar_versao, versao
+
+from .models import Chamado
+
+POR_PAGINA = 12
+TAMANHO_RESUMO = 200
+COLUNAS = ('id', 'assunto', 'setor', 'urgencia', 'status', 'data_criacao')
+PREFIXO = 'chamados:meus:'
+# Rede de segurança para mudanças que não passem pela invalidação
+TIMEOUT_LISTA = 60 * 10
+
+
+def chamados_do_usuario(user_id, status=None):
+    chamados = (
+        Chamado.objects.filter(criado_por_id=user_id)
+        .only(*COLUNAS)
+        # Um caractere a mais para o template saber se o texto foi cortado
+        .annotate(resumo=Left('descricao', TAMANHO_RESUMO + 1))
+    )
+    if status:
+        chamados = chamados.filter(status=status)
+    return chamados
+
+
+def _chave_versao(user_id):
+    return f'{PREFIXO}versao:{user_id}'
+
+
+def versao_da_lista(user_id):
+    return versao(_chave_versao(user_id))
+
+
+def chave_da_pagina(user_id, **parametros):
+    """Chave do HTML de uma página da lista (filtros e cursor incluídos)."""
+    versao = versao_da_lista(user_id)
+    resumo = hashlib.sha256(repr(sorted(parametros.items())).encode()).hexdigest()
+    return f'{PREFIXO}{user_id}:{versao}:{resumo}'
+
+
+def invalidar_donos(chamados):
+    invalidar(*chamados.order_by().values_list('criado_por_id', flat=True).distinct())
+
+
+def invalidar(*usuarios_ids):
+    for user_id in set(usuarios_ids):
+        trocar_versao(_chave_versao(user_id))
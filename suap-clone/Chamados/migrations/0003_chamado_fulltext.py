@@ -0,0 +1,29 @@
+from django.db import migrations
+
+NOME_INDICE = 'chamado_assunto_descricao_ft'
+
+
+def criar_indice_fulltext(apps, schema_editor):
+    # FULLTEXT só existe no MySQL; nos outros bancos a busca usa o índice em memória
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE `App_chamado` ADD FULLTEXT INDEX `{NOME_INDICE}` (`assunto`, `descricao`)'
+    )
+
+
+def remover_indice_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(f'ALTER TABLE `App_chamado` DROP INDEX `{NOME_INDICE}`')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0002_alter_atualizacaochamado_table'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_fulltext, remover_indice_fulltext),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0003_chamado_fulltext'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='atualizacaochamado',
+            index=models.Index(fields=['chamado', 'data_atualizacao'], name='atualizacao_chamado_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['criado_por', 'data_criacao'], name='chamado_autor_criacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['status', 'data_criacao'], name='chamado_status_criacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['data_criacao'], name='chamado_criacao_idx'),
+        ),
+    ]
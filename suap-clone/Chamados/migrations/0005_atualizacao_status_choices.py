@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0004_indices_compostos'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='atualizacaochamado',
+            name='status_anterior',
+            field=models.CharField(choices=[('aberto', 'Aberto'), ('em_analise', 'Em Análise'), ('resolvido', 'Resolvido'), ('fechado', 'Fechado')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='atualizacaochamado',
+            name='status_novo',
+            field=models.CharField(choices=[('aberto', 'Aberto'), ('em_analise', 'Em Análise'), ('resolvido', 'Resolvido'), ('fechado', 'Fechado')], max_length=20),
+        ),
+    ]
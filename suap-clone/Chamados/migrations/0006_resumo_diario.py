@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0005_atualizacao_status_choices'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('setor', models.CharField(choices=[('ti', 'TI'), ('rh', 'RH'), ('financeiro', 'Financeiro'), ('manutencao', 'Manutenção'), ('limpeza', 'Limpeza'), ('outros', 'Outros')], max_length=20)),
+                ('urgencia', models.CharField(choices=[('baixa', 'Baixa'), ('media', 'Média'), ('alta', 'Alta')], max_length=10)),
+                ('status', models.CharField(choices=[('aberto', 'Aberto'), ('em_analise', 'Em Análise'), ('resolvido', 'Resolvido'), ('fechado', 'Fechado')], max_length=20)),
+                ('criados', models.PositiveIntegerField(default=0)),
+                ('entradas', models.PositiveIntegerField(default=0)),
+                ('segundos_resolucao', models.BigIntegerField(default=0)),
+                ('histograma_resolucao', models.JSONField(default=list)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='atualizacaochamado',
+            index=models.Index(fields=['data_atualizacao'], name='atualizacao_data_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumodiario',
+            constraint=models.UniqueConstraint(fields=('dia', 'setor', 'urgencia', 'status'), name='resumo_diario_unico'),
+        ),
+    ]
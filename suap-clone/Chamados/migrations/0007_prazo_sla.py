@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:57
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Cópia das tabelas de Chamados/sla.py na época desta migração: mudanças
+# futuras nos prazos não devem alterar o que a migração grava.
+PRAZOS_POR_URGENCIA = {
+    'alta': timedelta(hours=4),
+    'media': timedelta(hours=24),
+    'baixa': timedelta(hours=72),
+}
+
+PRAZOS_POR_SETOR = {
+    'manutencao': {'media': timedelta(hours=48), 'baixa': timedelta(days=7)},
+    'financeiro': {'baixa': timedelta(days=5)},
+}
+
+
+def prazo_para(setor, urgencia, inicio):
+    prazo = PRAZOS_POR_SETOR.get(setor, {}).get(urgencia) or PRAZOS_POR_URGENCIA.get(urgencia)
+    return inicio + prazo if prazo else None
+
+
+def preencher_prazos(apps, schema_editor):
+    # Chamados existentes: prazo contado a partir da abertura
+    Chamado = apps.get_model('Chamados', 'Chamado')
+    lote = []
+    for chamado in Chamado.objects.filter(prazo_sla__isnull=True).only('setor', 'urgencia', 'data_criacao').iterator(chunk_size=1000):
+        chamado.prazo_sla = prazo_para(chamado.setor, chamado.urgencia, chamado.data_criacao)
+        lote.append(chamado)
+        if len(lote) == 1000:
+            Chamado.objects.bulk_update(lote, ['prazo_sla'])
+            lote = []
+    Chamado.objects.bulk_update(lote, ['prazo_sla'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0006_resumo_diario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chamado',
+            name='prazo_sla',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chamado',
+            name='sla_estourado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['status', 'sla_estourado_em', 'prazo_sla'], name='chamado_sla_idx'),
+        ),
+        migrations.RunPython(preencher_prazos, migrations.RunPython.noop),
+    ]
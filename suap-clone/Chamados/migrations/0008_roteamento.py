@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0007_prazo_sla'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AtendenteSetor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('setor', models.CharField(choices=[('ti', 'TI'), ('rh', 'RH'), ('financeiro', 'Financeiro'), ('manutencao', 'Manutenção'), ('limpeza', 'Limpeza'), ('outros', 'Outros')], max_length=20)),
+                ('ativo', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='chamado',
+            name='responsavel',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chamados_atribuidos', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['responsavel', 'data_criacao'], name='chamado_fila_idx'),
+        ),
+        migrations.AddField(
+            model_name='atendentesetor',
+            name='atendente',
+            field=models.ForeignKey(limit_choices_to={'is_staff': True}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='atendentesetor',
+            constraint=models.UniqueConstraint(fields=('atendente', 'setor'), name='atendente_setor_unico'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:02
+
+import django.core.files.storage
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0008_roteamento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArquivoAnexo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('arquivo', models.FileField(max_length=200, storage=django.core.files.storage.FileSystemStorage(), upload_to='')),
+                ('tamanho', models.BigIntegerField()),
+                ('tipo', models.CharField(max_length=100)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EnvioAnexo',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nome', models.CharField(max_length=255)),
+                ('tipo', models.CharField(max_length=100)),
+                ('tamanho', models.BigIntegerField()),
+                ('recebido', models.BigIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('chamado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Chamados.chamado')),
+                ('enviado_por', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Anexo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=255)),
+                ('data_envio', models.DateTimeField(auto_now_add=True)),
+                ('chamado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anexos', to='Chamados.chamado')),
+                ('enviado_por', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anexos_enviados', to=settings.AUTH_USER_MODEL)),
+                ('arquivo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='anexos', to='Chamados.arquivoanexo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['chamado', 'data_envio'], name='anexo_chamado_data_idx')],
+            },
+        ),
+    ]
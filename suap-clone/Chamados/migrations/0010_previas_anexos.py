@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:11
+
+import django.core.files.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0009_anexos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arquivoanexo',
+            name='previa',
+            field=models.FileField(blank=True, max_length=200, storage=django.core.files.storage.FileSystemStorage(), upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='arquivoanexo',
+            name='previa_atualizada_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='arquivoanexo',
+            name='previa_status',
+            field=models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('pronta', 'Pronta'), ('falhou', 'Falhou'), ('indisponivel', 'Indisponível')], default='pendente', max_length=15),
+        ),
+        migrations.AddIndex(
+            model_name='arquivoanexo',
+            index=models.Index(fields=['previa_status', 'previa_atualizada_em'], name='arquivo_previa_idx'),
+        ),
+    ]
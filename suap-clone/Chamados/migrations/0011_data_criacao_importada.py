@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chamados', '0010_previas_anexos'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chamado',
+            name='data_criacao',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
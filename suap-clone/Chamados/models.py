@@ -1,6 +1,10 @@
 # App/models.py
+import uuid
+
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -33,21 +37,189 @@ class Chamado(models.Model):
     setor = models.CharField(max_length=20, choices=SETOR_CHOICES)
     urgencia = models.CharField(max_length=10, choices=URGENCIA_CHOICES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='aberto')
-    data_criacao = models.DateTimeField(auto_now_add=True)
+    # default em vez de auto_now_add: a importação de chamados legados grava a data original
+    data_criacao = models.DateTimeField(default=timezone.now, editable=False)
     data_atualizacao = models.DateTimeField(auto_now=True)
+    # Atendente da equipe escolhido pelo roteamento (ver Chamados/roteamento.py)
+    responsavel = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='chamados_atribuidos'
+    )
+    # Prazo de atendimento (ver Chamados/sla.py) e quando o check_sla registrou o estouro
+    prazo_sla = models.DateTimeField(null=True, blank=True)
+    sla_estourado_em = models.DateTimeField(null=True, blank=True)
+
+    # Status em que o prazo de SLA ainda está correndo
+    STATUS_EM_ANDAMENTO = ('aberto', 'em_analise')
 
     def __str__(self):
         return f"Chamado #{self.id} - {self.assunto}"
+
+    @property
+    def situacao_sla(self):
+        """ 'estourado', 'em_risco' (último quarto do prazo), 'no_prazo' ou None """
+        if self.sla_estourado_em:
+            return 'estourado'
+        if self.status not in self.STATUS_EM_ANDAMENTO or self.prazo_sla is None:
+            return None
+        agora = timezone.now()
+        if agora >= self.prazo_sla:
+            return 'estourado'
+        if self.data_criacao and self.prazo_sla - agora <= (self.prazo_sla - self.data_criacao) / 4:
+            return 'em_risco'
+        return 'no_prazo'
     
     class Meta:
         db_table = 'App_chamado'
+        indexes = [
+            # ver_chamados: WHERE criado_por = ? ORDER BY data_criacao DESC
+            models.Index(fields=['criado_por', 'data_criacao'], name='chamado_autor_criacao_idx'),
+            # ver_chamados_admin / dashboard: WHERE status = ? ORDER BY data_criacao DESC
+            models.Index(fields=['status', 'data_criacao'], name='chamado_status_criacao_idx'),
+            # fila sem filtro e chamados recentes: ORDER BY data_criacao DESC, id DESC
+            models.Index(fields=['data_criacao'], name='chamado_criacao_idx'),
+            # check_sla: WHERE status IN (...) AND sla_estourado_em IS NULL AND prazo_sla < agora
+            models.Index(fields=['status', 'sla_estourado_em', 'prazo_sla'], name='chamado_sla_idx'),
+            # minha_fila: WHERE responsavel = ? ORDER BY data_criacao DESC (o status
+            # é filtrado nas linhas do atendente, em geral todas em andamento)
+            models.Index(fields=['responsavel', 'data_criacao'], name='chamado_fila_idx'),
+        ]
+
+class AtendenteSetor(models.Model):
+    """ Membro da equipe que atende os chamados de um setor """
+    atendente = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'is_staff': True})
+    setor = models.CharField(max_length=20, choices=Chamado.SETOR_CHOICES)
+    ativo = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.atendente} ({self.get_setor_display()})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['atendente', 'setor'], name='atendente_setor_unico'),
+        ]
+
+
+class AtualizacaoChamadoQuerySet(models.QuerySet):
+    def com_responsavel(self):
+        # Evita uma consulta ao usuário por linha ao exibir o responsável
+        return self.select_related('responsavel')
+
+    def linha_do_tempo(self):
+        return self.com_responsavel().order_by('data_atualizacao', 'id')
+
+
 class AtualizacaoChamado(models.Model):
     chamado = models.ForeignKey(Chamado, on_delete=models.CASCADE)
     responsavel = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
-    status_anterior = models.CharField(max_length=20)
-    status_novo = models.CharField(max_length=20)
+    status_anterior = models.CharField(max_length=20, choices=Chamado.STATUS_CHOICES)
+    status_novo = models.CharField(max_length=20, choices=Chamado.STATUS_CHOICES)
     mensagem = models.TextField(blank=True)
     data_atualizacao = models.DateTimeField(auto_now_add=True)
 
+    objects = AtualizacaoChamadoQuerySet.as_manager()
+
     def __str__(self):
         return f"Atualização #{self.id}"
+
+    class Meta:
+        indexes = [
+            # Histórico de um chamado em ordem cronológica
+            models.Index(fields=['chamado', 'data_atualizacao'], name='atualizacao_chamado_data_idx'),
+            # Consolidação diária dos indicadores: WHERE data_atualizacao no intervalo do dia
+            models.Index(fields=['data_atualizacao'], name='atualizacao_data_idx'),
+        ]
+
+class ResumoDiario(models.Model):
+    """
+    Indicadores consolidados por dia, setor, urgência e status (ver
+    Chamados/analiticos.py). `criados` conta os chamados abertos no dia com
+    esse status inicial; `entradas`, as mudanças para esse status no dia.
+    Nas linhas de 'resolvido' ficam também a soma e o histograma dos tempos
+    entre a abertura e a resolução.
+    """
+    dia = models.DateField()
+    setor = models.CharField(max_length=20, choices=Chamado.SETOR_CHOICES)
+    urgencia = models.CharField(max_length=10, choices=Chamado.URGENCIA_CHOICES)
+    status = models.CharField(max_length=20, choices=Chamado.STATUS_CHOICES)
+    criados = models.PositiveIntegerField(default=0)
+    entradas = models.PositiveIntegerField(default=0)
+    segundos_resolucao = models.BigIntegerField(default=0)
+    histograma_resolucao = models.JSONField(default=list)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.dia} {self.setor}/{self.urgencia}/{self.status}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'setor', 'urgencia', 'status'], name='resumo_diario_unico'),
+        ]
+
+
+# Anexos ficam em MEDIA_ROOT/anexos, sempre no disco local: o envio em
+# partes e o download com Range trabalham direto com os arquivos
+armazenamento_anexos = FileSystemStorage()
+
+
+class ArquivoAnexo(models.Model):
+    """ Conteúdo de um anexo, guardado uma vez só por hash (ver Chamados/anexos.py) """
+    PREVIA_STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('pronta', 'Pronta'),
+        ('falhou', 'Falhou'),
+        ('indisponivel', 'Indisponível'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    arquivo = models.FileField(storage=armazenamento_anexos, max_length=200)
+    tamanho = models.BigIntegerField()
+    tipo = models.CharField(max_length=100)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    # Miniatura gerada pelo comando gerar_previas (ver Chamados/previas.py)
+    previa = models.FileField(storage=armazenamento_anexos, max_length=200, blank=True)
+    previa_status = models.CharField(max_length=15, choices=PREVIA_STATUS_CHOICES, default='pendente')
+    previa_atualizada_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.sha256
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['previa_status', 'previa_atualizada_em'], name='arquivo_previa_idx'),
+        ]
+
+
+class Anexo(models.Model):
+    chamado = models.ForeignKey(Chamado, on_delete=models.CASCADE, related_name='anexos')
+    enviado_por = models.ForeignKey(User, on_delete=models.CASCADE, related_name='anexos_enviados')
+    arquivo = models.ForeignKey(ArquivoAnexo, on_delete=models.PROTECT, related_name='anexos')
+    nome = models.CharField(max_length=255)
+    data_envio = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.nome
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['chamado', 'data_envio'], name='anexo_chamado_data_idx'),
+        ]
+
+
+class EnvioAnexo(models.Model):
+    """ Envio em partes ainda não concluído; `recebido` é quantos bytes já estão no disco """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    chamado = models.ForeignKey(Chamado, on_delete=models.CASCADE)
+    enviado_por = models.ForeignKey(User, on_delete=models.CASCADE)
+    nome = models.CharField(max_length=255)
+    tipo = models.CharField(max_length=100)
+    tamanho = models.BigIntegerField()
+    recebido = models.BigIntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def caminho_parcial(self):
+        return armazenamento_anexos.path(f'anexos/envios/{self.id}.part')
+
+    def __str__(self):
+        return f"{self.nome} ({self.recebido}/{self.tamanho})"
@@ -0,0 +1,46 @@
+# Chamados/notificacoes.py
+"""
+Envio das mudanças de status dos chamados para o dono do chamado via
+WebSocket (StatusChamadosConsumer), para que as páginas de chamados se
+atualizem sem recarregar.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from .models import Chamado
+
+logger = logging.getLogger(__name__)
+
+STATUS_LABELS = dict(Chamado.STATUS_CHOICES)
+
+
+def grupo_do_usuario(user_id):
+    return f'chamados_usuario_{user_id}'
+
+
+def evento_de_status(atualizacao, dono_id):
+    return {
+        'type': 'chamado.status',
+        'chamado_id': atualizacao.chamado_id,
+        'status': atualizacao.status_novo,
+        'status_display': STATUS_LABELS.get(atualizacao.status_novo, atualizacao.status_novo),
+        'status_anterior': atualizacao.status_anterior,
+        'mensagem': atualizacao.mensagem,
+        'data_atualizacao': atualizacao.data_atualizacao.isoformat() if atualizacao.data_atualizacao else None,
+        'dono_id': dono_id,
+    }
+
+
+def notificar_status(eventos):
+    """Publica os eventos (de evento_de_status) no grupo do dono de cada chamado."""
+    camada = get_channel_layer()
+    if camada is None:
+        return
+    try:
+        for evento in eventos:
+            async_to_sync(camada.group_send)(grupo_do_usuario(evento['dono_id']), evento)
+    except Exception:
+        # Falha na camada de canais não pode impedir a alteração do chamado
+        logger.exception("Falha ao publicar mudança de status de chamado")
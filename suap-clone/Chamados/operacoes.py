@@ -0,0 +1,102 @@
+# Chamados/operacoes.py
+"""
+Operações em massa sobre chamados, usadas na triagem da equipe (endpoint
+alterar_status_em_massa e ação do admin).
+
+Um UPDATE só altera o status de todos os chamados e as AtualizacaoChamado
+correspondentes são gravadas com bulk_create, na mesma transação. Como
+nenhum dos dois dispara post_save, os contadores em cache, a carga dos
+atendentes, as listas em cache e as notificações para os donos são tratados
+aqui, após o commit.
+"""
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+from .contadores import ajustar_contadores
+from .meus_chamados import invalidar as invalidar_listas
+from .models import AtualizacaoChamado, Chamado
+from .notificacoes import evento_de_status, notificar_status
+from .roteamento import invalidar_cargas
+
+# Limite de chamados por operação, para não segurar locks por tempo demais
+MAXIMO_POR_OPERACAO = 2000
+
+ALTERADO = 'alterado'
+INALTERADO = 'inalterado'
+NAO_ENCONTRADO = 'nao_encontrado'
+
+
+class OperacaoGrandeDemais(Exception):
+    pass
+
+
+def alterar_status_em_massa(chamados, status_novo, responsavel, mensagem='', ids=None):
+    """
+    Move os chamados do queryset `chamados` (opcionalmente restritos a `ids`)
+    para `status_novo`. Retorna uma lista com o resultado de cada chamado:
+    {'id', 'status_anterior', 'resultado'}, na ordem dos ids.
+    """
+    if ids is not None:
+        chamados = chamados.filter(id__in=ids)
+    mensagem = mensagem or "Status alterado em massa pela equipe"
+
+    with transaction.atomic():
+        # Trava as linhas para que o status anterior gravado na auditoria
+        # seja o mesmo que o UPDATE substitui
+        encontrados = list(
+            chamados.select_for_update()
+            .order_by('id')
+            .values_list('id', 'status', 'criado_por_id')[:MAXIMO_POR_OPERACAO + 1]
+        )
+        if len(encontrados) > MAXIMO_POR_OPERACAO:
+            raise OperacaoGrandeDemais(
+                f"A operação afeta mais de {MAXIMO_POR_OPERACAO} chamados; refine o filtro."
+            )
+
+        a_alterar = [(id_, status, dono_id) for id_, status, dono_id in encontrados if status != status_novo]
+        atualizacoes = []
+        if a_alterar:
+            Chamado.objects.filter(id__in=[id_ for id_, _, _ in a_alterar]).update(
+                status=status_novo, data_atualizacao=timezone.now()
+            )
+            atualizacoes = AtualizacaoChamado.objects.bulk_create([
+                AtualizacaoChamado(
+                    chamado_id=id_,
+                    responsavel=responsavel,
+                    status_anterior=status,
+                    status_novo=status_novo,
+                    mensagem=mensagem,
+                )
+                for id_, status, _ in a_alterar
+            ])
+
+            for status_anterior, quantidade in Counter(status for _, status, _ in a_alterar).items():
+                transaction.on_commit(partial(
+                    ajustar_contadores, status_anterior, status_novo, quantidade=quantidade
+                ))
+            # A carga dos atendentes depende do status: recontada na próxima leitura
+            transaction.on_commit(invalidar_cargas)
+            donos = {id_: dono_id for id_, _, dono_id in a_alterar}
+            transaction.on_commit(partial(invalidar_listas, *donos.values()))
+            eventos = [evento_de_status(a, donos[a.chamado_id]) for a in atualizacoes]
+            transaction.on_commit(partial(notificar_status, eventos))
+
+    alterados = {id_ for id_, _, _ in a_alterar}
+    resultados = [
+        {
+            'id': id_,
+            'status_anterior': status,
+            'resultado': ALTERADO if id_ in alterados else INALTERADO,
+        }
+        for id_, status, _ in encontrados
+    ]
+    if ids is not None:
+        vistos = {id_ for id_, _, _ in encontrados}
+        resultados += [
+            {'id': id_, 'status_anterior': None, 'resultado': NAO_ENCONTRADO}
+            for id_ in dict.fromkeys(ids) if id_ not in vistos
+        ]
+    return resultados
@@ -0,0 +1,130 @@
+# Chamados/paginacao.py
+from django.core import signing
+from django.db.models import Q
+
+SALT_CURSOR = 'Chamados.paginacao.cursor'
+PROXIMA = 'proxima'
+ANTERIOR = 'anterior'
+
+
+class PaginaCursor:
+    """
+    Página de uma paginação por cursor (keyset). Não conhece o total nem o
+    número da página: só sabe se há itens antes/depois e os tokens opacos
+    para chegar até eles.
+    """
+
+    def __init__(self, object_list, cursor_proxima=None, cursor_anterior=None):
+        self.object_list = object_list
+        self.cursor_proxima = cursor_proxima
+        self.cursor_anterior = cursor_anterior
+
+    def has_next(self):
+        return self.cursor_proxima is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+def _valores_chave(obj, campos):
+    return [getattr(obj, campo) for campo in campos]
+
+
+def codificar_cursor(obj, campos, direcao):
+    valores = [valor.isoformat() if hasattr(valor, 'isoformat') else valor
+               for valor in _valores_chave(obj, campos)]
+    return signing.dumps({'v': valores, 'd': direcao}, salt=SALT_CURSOR, compress=True)
+
+
+def decodificar_cursor(token, model, campos):
+    """Devolve (valores, direcao) ou (None, PROXIMA) se o token for inválido."""
+    try:
+        dados = signing.loads(token, salt=SALT_CURSOR)
+        valores = [model._meta.get_field(campo).to_python(valor)
+                   for campo, valor in zip(campos, dados['v'], strict=True)]
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None, PROXIMA
+    direcao = ANTERIOR if dados.get('d') == ANTERIOR else PROXIMA
+    return valores, direcao
+
+
+def _filtro_keyset(campos, valores, operador):
+    # (a, b) < (va, vb)  ==>  a < va OR (a = va AND b < vb)
+    filtro = Q()
+    for i, campo in enumerate(campos):
+        iguais = dict(zip(campos[:i], valores[:i]))
+        filtro |= Q(**iguais, **{f'{campo}__{operador}': valores[i]})
+    return filtro
+
+
+def paginar_por_cursor(queryset, cursor=None, por_pagina=10, campos=('data_criacao', 'id')):
+    """
+    Pagina `queryset` em ordem decrescente de `campos` sem COUNT(*) nem OFFSET:
+    cada página é um WHERE sobre a chave do último item visto + LIMIT.
+    """
+    valores, direcao = (None, PROXIMA)
+    if cursor:
+        valores, direcao = decodificar_cursor(cursor, queryset.model, campos)
+
+    if direcao == ANTERIOR and valores is not None:
+        ordem = list(campos)
+        queryset = queryset.filter(_filtro_keyset(campos, valores, 'gt'))
+    else:
+        ordem = [f'-{campo}' for campo in campos]
+        if valores is not None:
+            queryset = queryset.filter(_filtro_keyset(campos, valores, 'lt'))
+
+    # Busca um item a mais para saber se existe outra página na mesma direção
+    itens = list(queryset.order_by(*ordem)[:por_pagina + 1])
+    tem_mais = len(itens) > por_pagina
+    itens = itens[:por_pagina]
+
+    if direcao == ANTERIOR and valores is not None:
+        itens.reverse()
+        tem_proxima, tem_anterior = True, tem_mais
+    else:
+        tem_proxima, tem_anterior = tem_mais, valores is not None
+
+    if not itens:
+        return PaginaCursor(itens)
+    return PaginaCursor(
+        itens,
+        cursor_proxima=codificar_cursor(itens[-1], campos, PROXIMA) if tem_proxima else None,
+        cursor_anterior=codificar_cursor(itens[0], campos, ANTERIOR) if tem_anterior else None,
+    )
+
+
+def paginar_ids_ranqueados(queryset, ids, cursor=None, por_pagina=10):
+    """
+    Pagina uma lista de ids já ordenada por relevância (resultado da busca).
+    O cursor guarda a posição na lista; só os ids da página são buscados.
+    """
+    inicio = 0
+    if cursor:
+        try:
+            inicio = max(int(signing.loads(cursor, salt=SALT_CURSOR)['o']), 0)
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            inicio = 0
+
+    ids_pagina = ids[inicio:inicio + por_pagina]
+    por_id = queryset.in_bulk(ids_pagina)
+    itens = [por_id[i] for i in ids_pagina if i in por_id]
+
+    fim = inicio + por_pagina
+    return PaginaCursor(
+        itens,
+        cursor_proxima=signing.dumps({'o': fim}, salt=SALT_CURSOR) if fim < len(ids) else None,
+        cursor_anterior=signing.dumps({'o': max(inicio - por_pagina, 0)}, salt=SALT_CURSOR) if inicio > 0 else None,
+    )
@@ -0,0 +1,144 @@
+# Chamados/previas.py
+"""
+Miniaturas (prévias) dos anexos.
+
+Decodificar a imagem original a cada listagem sai caro, então as prévias
+são geradas uma vez só, fora das requisições: o comando gerar_previas pega
+os arquivos pendentes em lotes, grava uma miniatura JPEG ao lado do
+original (anexos/ab/<sha256>.previa.jpg) e registra o resultado em
+ArquivoAnexo.previa_status. As páginas só leem as miniaturas prontas.
+
+Imagens são reduzidas com o Pillow. A primeira página dos PDFs é
+renderizada pelo pdftoppm (poppler-utils); sem ele instalado, os PDFs
+ficam como "indisponível" e as páginas mostram só o ícone.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import ArquivoAnexo, armazenamento_anexos
+
+TAMANHO_PREVIA = (320, 320)
+QUALIDADE_JPEG = 80
+TAMANHO_LOTE = 20
+# Acima disso a imagem nem é decodificada (proteção contra "bombas" de descompressão)
+MAXIMO_PIXELS = 40_000_000
+TEMPO_LIMITE_PDF = 30
+# Um worker que parou no meio deixa o arquivo "processando"; passado esse tempo, outro retoma
+TEMPO_MAXIMO_PROCESSANDO = timedelta(minutes=10)
+
+
+class PreviaIndisponivel(Exception):
+    """O tipo do arquivo não tem como gerar prévia neste servidor."""
+
+
+def nome_da_previa(arquivo):
+    return f'{arquivo.arquivo.name}.previa.jpg'
+
+
+def _abrir_imagem(caminho):
+    imagem = Image.open(caminho)
+    if imagem.width * imagem.height > MAXIMO_PIXELS:
+        imagem.close()
+        raise ValueError("Imagem grande demais para gerar prévia.")
+    return imagem
+
+
+def _renderizar_pdf(caminho):
+    """Primeira página do PDF já no tamanho da prévia."""
+    pdftoppm = shutil.which('pdftoppm')
+    if pdftoppm is None:
+        raise PreviaIndisponivel
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = os.path.join(pasta, 'pagina')
+        subprocess.run(
+            [pdftoppm, '-f', '1', '-l', '1', '-singlefile', '-png',
+             '-scale-to', str(max(TAMANHO_PREVIA)), caminho, saida],
+            check=True, capture_output=True, timeout=TEMPO_LIMITE_PDF,
+        )
+        imagem = Image.open(saida + '.png')
+        imagem.load()
+        return imagem
+
+
+def reduzir(imagem):
+    """Miniatura RGB da imagem (primeiro quadro, orientação do EXIF aplicada)."""
+    # Em JPEG, thumbnail() decodifica direto numa escala menor (draft)
+    imagem.thumbnail(TAMANHO_PREVIA)
+    imagem = ImageOps.exif_transpose(imagem)
+    if imagem.mode in ('RGB', 'L'):
+        return imagem.convert('RGB')
+    # Transparência vira fundo branco
+    imagem = imagem.convert('RGBA')
+    fundo = Image.new('RGB', imagem.size, 'white')
+    fundo.paste(imagem, mask=imagem.getchannel('A'))
+    return fundo
+
+
+def gerar_previa(arquivo):
+    """Gera a miniatura de um ArquivoAnexo e grava o resultado. Retorna o status."""
+    try:
+        if arquivo.tipo == 'application/pdf':
+            imagem = _renderizar_pdf(arquivo.arquivo.path)
+        else:
+            imagem = _abrir_imagem(arquivo.arquivo.path)
+        with imagem:
+            previa = reduzir(imagem)
+        nome = nome_da_previa(arquivo)
+        destino = armazenamento_anexos.path(nome)
+        # Grava num temporário e troca: quem lê nunca vê a miniatura pela metade
+        temporario = destino + '.tmp'
+        previa.save(temporario, 'JPEG', quality=QUALIDADE_JPEG, optimize=True)
+        os.replace(temporario, destino)
+        arquivo.previa = nome
+        arquivo.previa_status = 'pronta'
+    except PreviaIndisponivel:
+        arquivo.previa_status = 'indisponivel'
+    except (OSError, ValueError, Image.DecompressionBombError, subprocess.SubprocessError):
+        # Arquivo corrompido ou que o Pillow/pdftoppm não conseguiu ler
+        arquivo.previa_status = 'falhou'
+    arquivo.previa_atualizada_em = timezone.now()
+    arquivo.save(update_fields=['previa', 'previa_status', 'previa_atualizada_em'])
+    return arquivo.previa_status
+
+
+def previas_a_gerar(agora):
+    return ArquivoAnexo.objects.filter(
+        Q(previa_status='pendente')
+        | Q(previa_status='processando', previa_atualizada_em__lt=agora - TEMPO_MAXIMO_PROCESSANDO)
+    )
+
+
+def reservar_lote(agora=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Marca até `tamanho_lote` arquivos como "processando" e os retorna. Com
+    skip_locked, workers simultâneos pegam lotes diferentes.
+    """
+    agora = agora or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            previas_a_gerar(agora).select_for_update(skip_locked=True)
+            .order_by('id')
+            .values_list('id', flat=True)[:tamanho_lote]
+        )
+        ArquivoAnexo.objects.filter(id__in=ids).update(previa_status='processando', previa_atualizada_em=agora)
+    return list(ArquivoAnexo.objects.filter(id__in=ids).order_by('id'))
+
+
+def gerar_previas(tamanho_lote=TAMANHO_LOTE):
+    """Gera as prévias de todos os arquivos pendentes. Retorna {status: quantidade}."""
+    resultado = {}
+    while True:
+        lote = reservar_lote(tamanho_lote=tamanho_lote)
+        for arquivo in lote:
+            status = gerar_previa(arquivo)
+            resultado[status] = resultado.get(status, 0) + 1
+        if len(lote) < tamanho_lote:
+            return resultado
@@ -0,0 +1,109 @@
+# Chamados/roteamento.py
+"""
+Distribuição automática dos chamados novos entre os atendentes do setor.
+
+O atendente escolhido é o de menor carga (chamados em andamento atribuídos
+a ele). As cargas ficam em contadores no cache, ajustados pelos sinais
+quando um chamado muda de responsável ou de status, como em contadores.py;
+o banco só é consultado (com uma agregação para todos os atendentes
+faltantes) quando algum contador não está em cache.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from App.versoes import trocar_versao, versao
+
+from .models import AtendenteSetor, Chamado
+
+PREFIXO_CARGA = 'chamados:carga:'
+CHAVE_VERSAO_CARGA = PREFIXO_CARGA + 'versao'
+PREFIXO_ATENDENTES = 'chamados:atendentes:'
+# Rede de segurança contra contadores que se percam (ex.: queryset.update())
+TIMEOUT_CARGAS = 60 * 10
+# Idem para mudanças no cadastro que não passam pelos sinais
+TIMEOUT_ATENDENTES = 60 * 10
+
+
+def _versao():
+    # Invalidar todas as cargas de uma vez = trocar a versão que compõe as chaves
+    return versao(CHAVE_VERSAO_CARGA)
+
+
+def _chave_carga(atendente_id, versao):
+    return f'{PREFIXO_CARGA}{versao}:{atendente_id}'
+
+
+def contar_cargas(atendentes_ids):
+    """Chamados em andamento por atendente, numa única consulta."""
+    cargas = dict.fromkeys(atendentes_ids, 0)
+    contagem = (
+        Chamado.objects.filter(responsavel_id__in=atendentes_ids, status__in=Chamado.STATUS_EM_ANDAMENTO)
+        .values('responsavel_id')
+        .annotate(quantidade=Count('id'))
+        .order_by()
+    )
+    for linha in contagem:
+        cargas[linha['responsavel_id']] = linha['quantidade']
+    return cargas
+
+
+def obter_cargas(atendentes_ids):
+    """{atendente_id: carga} lendo do cache; só conta no banco os ausentes."""
+    versao = _versao()
+    chaves = {_chave_carga(id_, versao): id_ for id_ in atendentes_ids}
+    em_cache = cache.get_many(list(chaves))
+    cargas = {chaves[chave]: valor for chave, valor in em_cache.items()}
+    faltantes = [id_ for id_ in atendentes_ids if id_ not in cargas]
+    if faltantes:
+        contadas = contar_cargas(faltantes)
+        cache.set_many({_chave_carga(id_, versao): valor for id_, valor in contadas.items()}, TIMEOUT_CARGAS)
+        cargas.update(contadas)
+    return cargas
+
+
+def ajustar_carga(atendente_id, delta):
+    if atendente_id is None:
+        return
+    try:
+        cache.incr(_chave_carga(atendente_id, _versao()), delta)
+    except ValueError:
+        # Contador ausente: será recontado na próxima leitura
+        pass
+
+
+def invalidar_cargas():
+    trocar_versao(CHAVE_VERSAO_CARGA)
+
+
+def atendentes_do_setor(setor):
+    """Ids dos atendentes ativos do setor (em cache até o cadastro mudar, no máximo TIMEOUT_ATENDENTES)."""
+    chave = PREFIXO_ATENDENTES + setor
+    atendentes = cache.get(chave)
+    if atendentes is None:
+        atendentes = list(
+            AtendenteSetor.objects.filter(setor=setor, ativo=True, atendente__is_active=True, atendente__is_staff=True)
+            .order_by('atendente_id')
+            .values_list('atendente_id', flat=True)
+        )
+        cache.set(chave, atendentes, TIMEOUT_ATENDENTES)
+    return atendentes
+
+
+def invalidar_atendentes(setor):
+    cache.delete(PREFIXO_ATENDENTES + setor)
+
+
+def escolher_responsavel(setor):
+    """Id do atendente do setor com menor carga (empate: o de menor id), ou None."""
+    atendentes = atendentes_do_setor(setor)
+    if not atendentes:
+        return None
+    cargas = obter_cargas(atendentes)
+    return min(atendentes, key=lambda id_: (cargas[id_], id_))
+
+
+def rotear(chamado):
+    """Atribui o chamado (ainda não salvo) a um atendente do setor, se houver."""
+    if chamado.responsavel_id is None:
+        chamado.responsavel_id = escolher_responsavel(chamado.setor)
+    return chamado
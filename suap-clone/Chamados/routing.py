@@ -0,0 +1,8 @@
+# Chamados/routing.py
+from django.urls import re_path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(r'^ws/chamados/$', consumers.StatusChamadosConsumer.as_asgi()),
+]
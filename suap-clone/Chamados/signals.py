@@ -0,0 +1,163 @@
+# Chamados/signals.py
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .busca import indice
+from .contadores import ajustar_contadores, invalidar_contadores
+from .meus_chamados import invalidar as invalidar_lista, invalidar_donos
+from .models import Anexo, ArquivoAnexo, AtendenteSetor, AtualizacaoChamado, Chamado
+from .notificacoes import evento_de_status, notificar_status
+from .roteamento import ajustar_carga, invalidar_atendentes, invalidar_cargas
+from .sla import aplicar_prazo
+
+
+User = get_user_model()
+
+_DESCONHECIDO = object()
+
+
+def _atendente_com_carga(chamado):
+    """Atendente para quem o chamado conta como carga (None se não conta)."""
+    if 'responsavel_id' not in chamado.__dict__ or 'status' not in chamado.__dict__:
+        return _DESCONHECIDO
+    if chamado.status not in Chamado.STATUS_EM_ANDAMENTO:
+        return None
+    return chamado.responsavel_id
+
+
+@receiver(post_init, sender=Chamado)
+def guardar_status_original(sender, instance, **kwargs):
+    # Permite saber, no post_save, se o status mudou sem consultar o banco.
+    # Lê direto do __dict__ para não disparar a carga de um campo adiado.
+    instance._status_original = instance.__dict__.get('status') if instance.pk else None
+    instance._sla_original = (instance.__dict__.get('setor'), instance.__dict__.get('urgencia'))
+    instance._atendente_original = _atendente_com_carga(instance) if instance.pk else None
+
+
+@receiver(pre_save, sender=Chamado)
+def definir_prazo_sla(sender, instance, **kwargs):
+    if instance._state.adding:
+        if instance.prazo_sla is None:
+            aplicar_prazo(instance)
+    elif (
+        instance.sla_estourado_em is None
+        and None not in instance._sla_original
+        and instance._sla_original != (instance.setor, instance.urgencia)
+    ):
+        # Urgência ou setor mudaram antes do estouro: o prazo é recalculado
+        aplicar_prazo(instance)
+        instance._sla_original = (instance.setor, instance.urgencia)
+
+
+@receiver(post_save, sender=Chamado)
+def atualizar_contadores_ao_salvar(sender, instance, created, **kwargs):
+    status_anterior = instance._status_original
+    instance._status_original = instance.status
+
+    if created:
+        ajuste = partial(ajustar_contadores, status_novo=instance.status, delta_total=1)
+    elif status_anterior is None:
+        # O status não estava carregado: não dá para saber o que mudou.
+        ajuste = invalidar_contadores
+    elif status_anterior != instance.status:
+        ajuste = partial(ajustar_contadores, status_anterior=status_anterior, status_novo=instance.status)
+    else:
+        return
+    transaction.on_commit(ajuste)
+
+
+@receiver(post_delete, sender=Chamado)
+def atualizar_contadores_ao_excluir(sender, instance, **kwargs):
+    transaction.on_commit(
+        partial(ajustar_contadores, status_anterior=instance.status, delta_total=-1)
+    )
+
+
+@receiver(post_save, sender=Chamado)
+def atualizar_carga_dos_atendentes(sender, instance, created, **kwargs):
+    anterior = instance._atendente_original
+    atual = _atendente_com_carga(instance)
+    instance._atendente_original = atual
+    if anterior is _DESCONHECIDO:
+        # Responsável ou status não estavam carregados: recontagem completa
+        transaction.on_commit(invalidar_cargas)
+    elif anterior != atual:
+        transaction.on_commit(partial(ajustar_carga, anterior, -1))
+        transaction.on_commit(partial(ajustar_carga, atual, 1))
+
+
+@receiver(post_delete, sender=Chamado)
+def descontar_carga_ao_excluir(sender, instance, **kwargs):
+    atendente = _atendente_com_carga(instance)
+    if atendente is _DESCONHECIDO:
+        transaction.on_commit(invalidar_cargas)
+    else:
+        transaction.on_commit(partial(ajustar_carga, atendente, -1))
+
+
+@receiver(post_save, sender=AtendenteSetor)
+@receiver(post_delete, sender=AtendenteSetor)
+def atualizar_atendentes_do_setor(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidar_atendentes, instance.setor))
+
+
+def _situacao_de_atendente(user):
+    return user.__dict__.get('is_active'), user.__dict__.get('is_staff')
+
+
+@receiver(post_init, sender=User)
+def guardar_situacao_de_atendente(sender, instance, **kwargs):
+    instance._situacao_original = _situacao_de_atendente(instance)
+
+
+@receiver(post_save, sender=User)
+def atualizar_atendentes_do_usuario(sender, instance, created, **kwargs):
+    # Atendente desativado ou que saiu da equipe deixa de receber chamados
+    situacao = _situacao_de_atendente(instance)
+    if created or situacao == instance._situacao_original:
+        return
+    instance._situacao_original = situacao
+    for setor in AtendenteSetor.objects.filter(atendente=instance).values_list('setor', flat=True):
+        transaction.on_commit(partial(invalidar_atendentes, setor))
+
+
+@receiver(post_save, sender=Chamado)
+def atualizar_indice_de_busca(sender, instance, **kwargs):
+    transaction.on_commit(partial(indice.atualizar, instance))
+
+
+@receiver(post_delete, sender=Chamado)
+def remover_do_indice_de_busca(sender, instance, **kwargs):
+    transaction.on_commit(partial(indice.remover, instance.pk))
+
+
+@receiver(post_save, sender=Chamado)
+@receiver(post_delete, sender=Chamado)
+def invalidar_lista_do_dono(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidar_lista, instance.criado_por_id))
+
+
+@receiver(post_save, sender=Anexo)
+@receiver(post_delete, sender=Anexo)
+def invalidar_lista_ao_anexar(sender, instance, **kwargs):
+    # A lista mostra as miniaturas dos anexos
+    transaction.on_commit(partial(invalidar_donos, Chamado.objects.filter(id=instance.chamado_id)))
+
+
+@receiver(post_save, sender=ArquivoAnexo)
+def invalidar_listas_com_previa(sender, instance, update_fields=None, **kwargs):
+    if update_fields and 'previa_status' in update_fields:
+        transaction.on_commit(partial(invalidar_donos, Chamado.objects.filter(anexos__arquivo=instance)))
+
+
+@receiver(post_save, sender=AtualizacaoChamado)
+def publicar_mudanca_de_status(sender, instance, created, **kwargs):
+    if not created:
+        return
+    dono_id = instance.chamado.criado_por_id
+    evento = evento_de_status(instance, dono_id)
+    transaction.on_commit(partial(notificar_status, [evento]))
@@ -0,0 +1,90 @@
+# Chamados/sla.py
+"""
+Prazos de atendimento (SLA) dos chamados e a verificação de estouros.
+
+O prazo é gravado em Chamado.prazo_sla quando o chamado é criado (ou
+quando a urgência/setor mudam), então encontrar os chamados atrasados é
+uma única consulta por faixa no índice chamado_sla_idx, sem percorrer os
+chamados em aberto. Cada estouro vira uma AtualizacaoChamado, gravadas em
+lote pelo comando check_sla.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AtualizacaoChamado, Chamado
+
+PRAZOS_POR_URGENCIA = {
+    'alta': timedelta(hours=4),
+    'media': timedelta(hours=24),
+    'baixa': timedelta(hours=72),
+}
+
+# Exceções por setor: serviços que dependem de terceiros ou de compra de material
+PRAZOS_POR_SETOR = {
+    'manutencao': {'media': timedelta(hours=48), 'baixa': timedelta(days=7)},
+    'financeiro': {'baixa': timedelta(days=5)},
+}
+
+TAMANHO_LOTE = 500
+
+
+def prazo_para(setor, urgencia, inicio):
+    prazo = PRAZOS_POR_SETOR.get(setor, {}).get(urgencia) or PRAZOS_POR_URGENCIA.get(urgencia)
+    return inicio + prazo if prazo else None
+
+
+def aplicar_prazo(chamado, inicio=None):
+    """Define o prazo de SLA do chamado, contado a partir da abertura."""
+    inicio = inicio or chamado.data_criacao or timezone.now()
+    chamado.prazo_sla = prazo_para(chamado.setor, chamado.urgencia, inicio)
+    return chamado
+
+
+def chamados_estourados(agora):
+    return Chamado.objects.filter(
+        status__in=Chamado.STATUS_EM_ANDAMENTO,
+        sla_estourado_em__isnull=True,
+        prazo_sla__lt=agora,
+    )
+
+
+def escalar_lote(agora=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Registra o estouro de até `tamanho_lote` chamados: marca sla_estourado_em
+    com um UPDATE e grava as AtualizacaoChamado com um bulk_create, na mesma
+    transação. Retorna quantos chamados foram escalados.
+    """
+    agora = agora or timezone.now()
+    with transaction.atomic():
+        estourados = list(
+            chamados_estourados(agora).select_for_update()
+            .order_by('prazo_sla')
+            .values_list('id', 'status', 'prazo_sla')[:tamanho_lote]
+        )
+        if not estourados:
+            return 0
+        Chamado.objects.filter(id__in=[id_ for id_, _, _ in estourados]).update(sla_estourado_em=agora)
+        AtualizacaoChamado.objects.bulk_create([
+            AtualizacaoChamado(
+                chamado_id=id_,
+                responsavel=None,
+                status_anterior=status,
+                status_novo=status,
+                mensagem=f"Prazo de atendimento estourado (venceu em {timezone.localtime(prazo):%d/%m/%Y %H:%M})",
+            )
+            for id_, status, prazo in estourados
+        ])
+    return len(estourados)
+
+
+def verificar_sla(agora=None, tamanho_lote=TAMANHO_LOTE):
+    """Escala todos os chamados com prazo vencido, um lote por transação."""
+    agora = agora or timezone.now()
+    total = 0
+    while True:
+        escalados = escalar_lote(agora, tamanho_lote)
+        total += escalados
+        if escalados < tamanho_lote:
+            return total
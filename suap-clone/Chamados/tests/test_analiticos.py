@@ -0,0 +1,101 @@
+import io
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..analiticos import atualizar_resumos, calcular_resumos_do_dia, consultar_indicadores, dias_pendentes
+from ..models import AtualizacaoChamado, Chamado, ResumoDiario
+
+
+class IndicadoresTestCase(TestCase):
+    """ Resumos diários e a página de indicadores """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        # Uma segunda-feira e o dia seguinte
+        self.segunda = timezone.localdate() - timedelta(days=timezone.localdate().weekday() + 7)
+        self.terca = self.segunda + timedelta(days=1)
+
+    def _em(self, dia, hora):
+        return timezone.make_aware(datetime.combine(dia, datetime.min.time()) + timedelta(hours=hora))
+
+    def _chamado(self, dia, setor='ti', urgencia='alta', hora=8):
+        chamado = Chamado.objects.create(criado_por=self.user, assunto='Chamado', setor=setor, urgencia=urgencia)
+        Chamado.objects.filter(id=chamado.id).update(data_criacao=self._em(dia, hora))
+        return chamado
+
+    def _mudar(self, chamado, anterior, novo, dia, hora):
+        atualizacao = AtualizacaoChamado.objects.create(
+            chamado=chamado, responsavel=self.staff_user, status_anterior=anterior, status_novo=novo,
+        )
+        AtualizacaoChamado.objects.filter(id=atualizacao.id).update(data_atualizacao=self._em(dia, hora))
+
+    def _cenario(self):
+        a = self._chamado(self.segunda, 'ti', hora=8)
+        b = self._chamado(self.segunda, 'rh', 'baixa', hora=9)
+        self._chamado(self.terca, 'ti', hora=10)
+        self._mudar(a, 'aberto', 'em_analise', self.segunda, 9)
+        self._mudar(a, 'em_analise', 'resolvido', self.segunda, 10)   # 2h
+        self._mudar(b, 'aberto', 'resolvido', self.terca, 9)          # 24h
+
+    def test_daily_rollup(self):
+        self._cenario()
+        with self.assertNumQueries(2):
+            resumos = calcular_resumos_do_dia(self.segunda)
+        por_chave = {(r.setor, r.urgencia, r.status): r for r in resumos}
+        self.assertEqual(por_chave[('ti', 'alta', 'aberto')].criados, 1)
+        self.assertEqual(por_chave[('rh', 'baixa', 'aberto')].criados, 1)
+        resolvido = por_chave[('ti', 'alta', 'resolvido')]
+        self.assertEqual((resolvido.entradas, resolvido.segundos_resolucao), (1, 7200))
+        self.assertEqual(resolvido.histograma_resolucao, [0, 1, 0, 0, 0, 0])
+
+    def test_refresh_is_idempotent(self):
+        self._cenario()
+        atualizar_resumos(self.segunda, self.terca)
+        quantidade = ResumoDiario.objects.count()
+        atualizar_resumos(self.segunda, self.terca)
+        self.assertEqual(ResumoDiario.objects.count(), quantidade)
+
+    def test_weekly_indicators(self):
+        self._cenario()
+        atualizar_resumos(self.segunda, self.terca)
+        indicadores = consultar_indicadores(self.segunda, self.terca, 'semana')
+        self.assertEqual(len(indicadores['periodos']), 1)
+        periodo = indicadores['periodos'][0]
+        self.assertEqual(periodo['inicio'], self.segunda.isoformat())
+        self.assertEqual(periodo['criados_por_setor']['ti'], 2)
+        self.assertEqual(periodo['entradas_por_status']['resolvido'], 2)
+        self.assertEqual(indicadores['resolucao']['media_horas'], 13.0)
+        self.assertEqual(indicadores['resolucao']['por_setor']['rh']['media_horas'], 24.0)
+        self.assertEqual(consultar_indicadores(self.segunda, self.terca, 'dia')['periodos'][1]['criados'], 1)
+
+    def test_incremental_command(self):
+        self.assertIsNone(dias_pendentes())
+        self._cenario()
+        self.assertEqual(dias_pendentes()[0], self.segunda)
+        call_command('atualizar_resumos', stdout=io.StringIO())
+        self.assertTrue(ResumoDiario.objects.filter(dia=self.terca).exists())
+        # Depois da primeira execução só os dias desde a última atualização são recalculados
+        self.assertEqual(dias_pendentes()[0], timezone.localdate())
+
+    def test_page_reads_only_rollups(self):
+        self._cenario()
+        atualizar_resumos(self.segunda, self.terca)
+        self.client.login(username='staffuser', password='password123')
+        url = reverse('Chamados:indicadores_chamados')
+        params = {'desde': self.segunda.isoformat(), 'ate': self.terca.isoformat(), 'formato': 'json'}
+        # sessão + usuário + resumos
+        with self.assertNumQueries(3):
+            response = self.client.get(url, params)
+        self.assertEqual(response.json()['resolucao']['quantidade'], 2)
+        response = self.client.get(url, {**params, 'formato': 'html'})
+        self.assertContains(response, 'Chamados abertos por setor')
+
+    def test_page_is_staff_only(self):
+        self.client.login(username='testuser', password='password123')
+        self.assertEqual(self.client.get(reverse('Chamados:indicadores_chamados')).status_code, 302)
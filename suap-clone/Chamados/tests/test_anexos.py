@@ -0,0 +1,143 @@
+import io
+import os
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import MidiaTemporariaMixin
+from .. import anexos
+from ..models import Anexo, ArquivoAnexo, Chamado, EnvioAnexo
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 40
+
+
+class AnexosTestCase(MidiaTemporariaMixin, TestCase):
+    """ Envio em partes, deduplicação, cota e download com Range """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.chamado = Chamado.objects.create(criado_por=self.user, assunto='Tela azul', setor='ti', urgencia='alta')
+        self.client.login(username='testuser', password='password123')
+
+    def _iniciar(self, nome='tela.png', tamanho=len(PNG), chamado=None):
+        url = reverse('Chamados:iniciar_anexo', args=[(chamado or self.chamado).id])
+        return self.client.post(url, {'nome': nome, 'tamanho': tamanho})
+
+    def _parte(self, url, conteudo, inicio, total=len(PNG)):
+        fim = inicio + len(conteudo) - 1
+        return self.client.put(url, conteudo, content_type='application/octet-stream',
+                               headers={'Content-Range': f'bytes {inicio}-{fim}/{total}'})
+
+    def _enviar(self, conteudo=PNG, nome='tela.png', parte=4000):
+        url = self._iniciar(nome, len(conteudo)).json()['url']
+        for inicio in range(0, len(conteudo), parte):
+            response = self._parte(url, conteudo[inicio:inicio + parte], inicio, len(conteudo))
+        return response
+
+    def test_chunked_upload_and_download(self):
+        response = self._enviar()
+        self.assertEqual(response.status_code, 201)
+        anexo = Anexo.objects.get()
+        self.assertEqual(anexo.nome, 'tela.png')
+        self.assertEqual(anexo.arquivo.tipo, 'image/png')
+        self.assertFalse(EnvioAnexo.objects.exists())
+
+        download = self.client.get(response.json()['anexo']['url'])
+        self.assertEqual(b''.join(download.streaming_content), PNG)
+        self.assertEqual(download['Accept-Ranges'], 'bytes')
+
+    def test_resume_after_interruption(self):
+        url = self._iniciar().json()['url']
+        self._parte(url, PNG[:3000], 0)
+        # Parte repetida ou fora de ordem: o servidor diz onde continuar
+        conflito = self._parte(url, PNG[1000:2000], 1000)
+        self.assertEqual((conflito.status_code, conflito.json()['recebido']), (409, 3000))
+        self.assertEqual(self.client.get(url).json(), {'recebido': 3000, 'tamanho': len(PNG)})
+        self.assertEqual(self._parte(url, PNG[3000:], 3000).status_code, 201)
+        with Anexo.objects.get().arquivo.arquivo.open('rb') as arquivo:
+            self.assertEqual(arquivo.read(), PNG)
+
+    def test_complete_upload_can_be_finished_again(self):
+        url = self._iniciar().json()['url']
+        with mock.patch.object(Anexo.objects, 'create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self._parte(url, PNG, 0)
+        self.assertEqual(self.client.get(url).json(), {'recebido': len(PNG), 'tamanho': len(PNG)})
+        # A repetição do último PUT conclui o envio em vez de ser recusada
+        self.assertEqual(self._parte(url, PNG, 0).status_code, 201)
+        with Anexo.objects.get().arquivo.arquivo.open('rb') as arquivo:
+            self.assertEqual(arquivo.read(), PNG)
+        self.assertFalse(EnvioAnexo.objects.exists())
+
+    def test_identical_files_are_stored_once(self):
+        self._enviar()
+        self._enviar(nome='copia.png')
+        self.assertEqual(Anexo.objects.count(), 2)
+        self.assertEqual(ArquivoAnexo.objects.count(), 1)
+        pasta = os.path.join(self.media, 'anexos')
+        arquivos = [nome for _, _, nomes in os.walk(pasta) for nome in nomes]
+        self.assertEqual(len(arquivos), 1)
+
+    def test_rejects_wrong_type_and_mismatched_content(self):
+        self.assertEqual(self._iniciar(nome='script.exe').status_code, 400)
+        response = self._enviar(conteudo=b'nada de png aqui' * 10)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Anexo.objects.exists())
+        self.assertFalse(EnvioAnexo.objects.exists())
+
+    def test_webp_must_be_a_riff_webp_container(self):
+        wav = b'RIFF\x24\x00\x00\x00WAVEfmt ' + bytes(100)
+        self.assertEqual(self._enviar(conteudo=wav, nome='som.webp').status_code, 400)
+        webp = b'RIFF\x24\x00\x00\x00WEBPVP8 ' + bytes(100)
+        self.assertEqual(self._enviar(conteudo=webp, nome='foto.webp').status_code, 201)
+
+    def test_quota(self):
+        with mock.patch.object(anexos, 'COTA_POR_USUARIO', len(PNG) * 2):
+            self._enviar()
+            self.assertEqual(self._iniciar().status_code, 201)  # ainda em andamento, conta na cota
+            self.assertEqual(self._iniciar().status_code, 400)
+
+    def test_range_requests(self):
+        url = self._enviar().json()['anexo']['url']
+        parcial = self.client.get(url, headers={'Range': 'bytes=10-19'})
+        self.assertEqual(parcial.status_code, 206)
+        self.assertEqual(b''.join(parcial.streaming_content), PNG[10:20])
+        self.assertEqual(parcial['Content-Range'], f'bytes 10-19/{len(PNG)}')
+        final = self.client.get(url, headers={'Range': 'bytes=-5'})
+        self.assertEqual(b''.join(final.streaming_content), PNG[-5:])
+        self.assertEqual(self.client.get(url, headers={'Range': f'bytes={len(PNG)}-'}).status_code, 416)
+
+    @override_settings(ANEXOS_X_ACCEL_REDIRECT='/protegido/')
+    def test_x_accel_redirect(self):
+        url = self._enviar().json()['anexo']['url']
+        response = self.client.get(url)
+        self.assertTrue(response['X-Accel-Redirect'].startswith('/protegido/anexos/'))
+        self.assertEqual(response.content, b'')
+
+    def test_other_users_cannot_attach_or_download(self):
+        url = self._enviar().json()['anexo']['url']
+        User.objects.create_user(username='outro', password='password123')
+        self.client.login(username='outro', password='password123')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self._iniciar().status_code, 404)
+
+    def test_cleanup_command(self):
+        self._iniciar()
+        EnvioAnexo.objects.update(criado_em=timezone.now() - timedelta(days=2))
+        self._enviar()
+        self._enviar(conteudo=PNG[:-1] + b'!')
+        Anexo.objects.all().delete()
+        # O conteúdo recente pode estar no meio de um envio: ainda não tem o Anexo
+        recente = ArquivoAnexo.objects.latest('id')
+        ArquivoAnexo.objects.exclude(id=recente.id).update(criado_em=timezone.now() - timedelta(days=2))
+        stdout = io.StringIO()
+        call_command('limpar_anexos', stdout=stdout)
+        self.assertIn('1 envio(s) abandonado(s) e 1 arquivo(s)', stdout.getvalue())
+        self.assertEqual(list(ArquivoAnexo.objects.all()), [recente])
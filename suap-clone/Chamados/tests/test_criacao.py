@@ -0,0 +1,92 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import limites
+from ..models import Chamado
+
+DADOS = {
+    'assunto': 'Computador não liga',
+    'descricao': 'Descrição longa o bastante para o formulário.',
+    'setor': 'ti',
+    'urgencia': 'alta',
+}
+
+
+class CriacaoAssincronaTestCase(TestCase):
+    """ Criação de chamados com Idempotency-Key e limite por usuário """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        self.url = reverse('Chamados:criar_chamado')
+
+    def _post(self, dados=DADOS, chave=None):
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        if chave:
+            headers['Idempotency-Key'] = chave
+        return self.client.post(self.url, dados, headers=headers)
+
+    def test_get_renders_form(self):
+        self.assertTemplateUsed(self.client.get(self.url), 'Chamados/chamado.html')
+
+    def test_same_key_creates_one_ticket(self):
+        primeira = self._post(chave='abc')
+        repetida = self._post(chave='abc')
+        self.assertEqual(primeira.status_code, 200)
+        self.assertEqual(repetida.json(), primeira.json())
+        self.assertEqual(repetida['Idempotent-Replayed'], 'true')
+        self.assertEqual(Chamado.objects.count(), 1)
+        self._post(chave='outra')
+        self.assertEqual(Chamado.objects.count(), 2)
+
+    def test_replay_does_not_touch_the_database(self):
+        self._post(chave='abc')
+        with CaptureQueriesContext(connection) as ctx:
+            self._post(chave='abc')
+        # Só a sessão e o usuário da autenticação
+        self.assertFalse([q for q in ctx.captured_queries if 'App_chamado' in q['sql']])
+
+    def test_key_is_scoped_to_the_user(self):
+        self._post(chave='abc')
+        User.objects.create_user(username='outro', password='password123')
+        self.client.login(username='outro', password='password123')
+        self._post(chave='abc')
+        self.assertEqual(Chamado.objects.filter(criado_por__username='outro').count(), 1)
+
+    def test_in_progress_key_returns_conflict(self):
+        cache.set(f'chamados:idempotencia:{self.user.pk}:abc', 'em_andamento')
+        self.assertEqual(self._post(chave='abc').status_code, 409)
+        self.assertEqual(Chamado.objects.count(), 0)
+
+    def test_invalid_submission_is_replayed_too(self):
+        self.assertEqual(self._post({'assunto': 'curto'}, chave='abc').status_code, 400)
+        self.assertEqual(self._post(chave='abc').status_code, 400)
+        self.assertEqual(self._post(chave='nova').status_code, 200)
+
+    @mock.patch.object(limites, 'RAJADA', 2)
+    def test_rate_limit(self):
+        self.assertEqual(self._post().status_code, 200)
+        self.assertEqual(self._post().status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._post(chave='xyz')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '10')
+        self.assertFalse([q for q in ctx.captured_queries if 'App_chamado' in q['sql']])
+        self.assertEqual(Chamado.objects.count(), 2)
+        # A chave recusada pelo limite pode ser usada de novo depois
+        self.assertIsNone(cache.get(f'chamados:idempotencia:{self.user.pk}:xyz'))
+
+    def test_bucket_refills(self):
+        consumir = async_to_sync(limites.consumir_ficha)
+        for _ in range(limites.RAJADA):
+            self.assertTrue(consumir(1, agora=1000)[0])
+        self.assertEqual(consumir(1, agora=1000), (False, 10))
+        self.assertTrue(consumir(1, agora=1010)[0])
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..exportacao import chamados_para_exportar, linhas_jsonl
+from ..models import AtualizacaoChamado, Chamado
+
+
+class ExportacaoTestCase(TestCase):
+    """ Exportação em streaming dos chamados com o histórico """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        self.chamados = [
+            Chamado.objects.create(criado_por=self.user, assunto=f'Chamado {i}', descricao='Linha 1\nLinha "2"', setor='ti', urgencia='baixa')
+            for i in range(5)
+        ]
+        for chamado in self.chamados[::2]:
+            AtualizacaoChamado.objects.create(
+                chamado=chamado, responsavel=self.staff_user,
+                status_anterior='aberto', status_novo='resolvido', mensagem='Feito',
+            )
+        antigo = self.chamados[0]
+        Chamado.objects.filter(id=antigo.id).update(data_criacao=timezone.now() - timedelta(days=400))
+
+    def _jsonl(self, chamados=None, tamanho_lote=2):
+        return [json.loads(linha) for linha in linhas_jsonl(chamados or chamados_para_exportar(), tamanho_lote)]
+
+    def test_history_survives_chunking(self):
+        dados = self._jsonl()
+        self.assertEqual([d['id'] for d in dados], [c.id for c in self.chamados])
+        historicos = {d['id']: d['historico'] for d in dados}
+        self.assertEqual(historicos[self.chamados[2].id][0]['responsavel'], 'staffuser')
+        self.assertEqual(historicos[self.chamados[1].id], [])
+
+    def test_queries_per_chunk_not_per_ticket(self):
+        # lotes de 2, 2 e 1: uma consulta dos chamados e uma do histórico por lote
+        with CaptureQueriesContext(connection) as contexto:
+            self._jsonl(tamanho_lote=2)
+        self.assertEqual(len(contexto.captured_queries), 6)
+        # Cada lote é uma consulta limitada, não um cursor sobre a tabela toda
+        consultas = [c['sql'] for c in contexto.captured_queries if f'FROM "{Chamado._meta.db_table}"' in c['sql']]
+        self.assertEqual(len(consultas), 3)
+        self.assertTrue(all('LIMIT 2' in sql for sql in consultas))
+
+    def test_chunks_split_tickets_created_at_the_same_instant(self):
+        Chamado.objects.update(data_criacao=timezone.now())
+        self.assertEqual(sorted(d['id'] for d in self._jsonl(tamanho_lote=2)), sorted(c.id for c in self.chamados))
+
+    def test_date_filter(self):
+        hoje = timezone.localdate()
+        dados = self._jsonl(chamados_para_exportar(desde=hoje - timedelta(days=1), ate=hoje))
+        self.assertEqual(len(dados), 4)
+
+    def test_streaming_csv_endpoint(self):
+        self.client.login(username='staffuser', password='password123')
+        response = self.client.get(reverse('Chamados:exportar_chamados'), {'formato': 'csv'})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertIn('attachment', response['Content-Disposition'])
+        linhas = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(linhas), 5)
+        self.assertEqual(linhas[0]['descricao'], 'Linha 1\nLinha "2"')
+        self.assertEqual(json.loads(linhas[0]['historico'])[0]['status_novo'], 'resolvido')
+
+    def test_endpoint_is_staff_only_and_validates(self):
+        self.client.login(username='testuser', password='password123')
+        self.assertEqual(self.client.get(reverse('Chamados:exportar_chamados')).status_code, 302)
+        self.client.login(username='staffuser', password='password123')
+        self.assertEqual(self.client.get(reverse('Chamados:exportar_chamados'), {'formato': 'xml'}).status_code, 400)
+
+    def test_command_writes_file(self):
+        Chamado.objects.filter(id=self.chamados[3].id).update(status='resolvido')
+        with tempfile.TemporaryDirectory() as pasta:
+            saida = os.path.join(pasta, 'chamados.jsonl')
+            call_command('export_chamados', formato='jsonl', saida=saida, status='resolvido', stderr=io.StringIO())
+            with open(saida, encoding='utf-8') as arquivo:
+                dados = [json.loads(linha) for linha in arquivo]
+        self.assertEqual([d['id'] for d in dados], [self.chamados[3].id])
+        stdout = io.StringIO()
+        call_command('export_chamados', stdout=stdout)
+        self.assertEqual(len(list(csv.reader(io.StringIO(stdout.getvalue())))), 6)
+
+    def test_command_rejects_invalid_dates(self):
+        for comando in ('export_chamados', 'atualizar_resumos'):
+            with self.subTest(comando=comando), self.assertRaisesMessage(CommandError, 'Data inválida'):
+                call_command(comando, '--desde', '2024-02-30', stdout=io.StringIO())
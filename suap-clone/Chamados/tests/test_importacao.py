@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..busca import buscar_ids, indice
+from ..contadores import obter_contadores
+from ..importacao import importar_lote
+from ..models import Chamado
+from ..sla import prazo_para
+
+DESCRICAO = 'Descrição longa o bastante para passar na validação.'
+
+
+class ImportacaoTestCase(TestCase):
+    """ Importação em lotes de chamados legados """
+
+    def setUp(self):
+        cache.clear()
+        indice.limpar()
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        for nome in ('ana', 'bruno'):
+            User.objects.create_user(username=nome)
+
+    def _arquivo(self, nome, conteudo):
+        caminho = os.path.join(self.pasta.name, nome)
+        with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+            arquivo.write(conteudo)
+        return caminho
+
+    def _csv(self, linhas):
+        saida = io.StringIO()
+        escritor = csv.DictWriter(saida, ['criado_por', 'assunto', 'descricao', 'setor', 'urgencia', 'status', 'data_criacao'])
+        escritor.writeheader()
+        escritor.writerows(linhas)
+        return self._arquivo('chamados.csv', saida.getvalue())
+
+    def _linha(self, **campos):
+        return {'criado_por': 'ana', 'assunto': 'Computador não liga', 'descricao': DESCRICAO,
+                'setor': 'ti', 'urgencia': 'alta', 'status': 'resolvido', **campos}
+
+    def test_import_csv_with_rejected_report(self):
+        caminho = self._csv([
+            self._linha(),
+            self._linha(assunto='Curto'),
+            self._linha(criado_por='fantasma'),
+            self._linha(setor='marketing'),
+            self._linha(criado_por='bruno', status=''),
+        ])
+        stdout = io.StringIO()
+        call_command('import_chamados', caminho, lote=2, stdout=stdout, stderr=io.StringIO())
+
+        self.assertEqual(Chamado.objects.count(), 2)
+        self.assertEqual(Chamado.objects.get(criado_por__username='bruno').status, 'aberto')
+        self.assertIn('2 chamado(s) importado(s), 3 rejeitado(s) de 5 linha(s)', stdout.getvalue())
+        with open(caminho + '.rejeitados.csv', encoding='utf-8') as arquivo:
+            rejeitados = list(csv.DictReader(arquivo))
+        self.assertEqual([r['linha'] for r in rejeitados], ['3', '4', '5'])
+        self.assertIn('assunto', rejeitados[0]['erro'])
+        self.assertIn('fantasma', rejeitados[1]['erro'])
+        self.assertIn('setor', rejeitados[2]['erro'])
+
+    def test_import_jsonl(self):
+        conteudo = '\n'.join([json.dumps(self._linha()), 'não é json', json.dumps(self._linha(status='inventado'))])
+        caminho = self._arquivo('chamados.jsonl', conteudo + '\n')
+        rejeitados = os.path.join(self.pasta.name, 'erros.csv')
+        call_command('import_chamados', caminho, rejeitados=rejeitados, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(Chamado.objects.count(), 1)
+        with open(rejeitados, encoding='utf-8') as arquivo:
+            self.assertEqual(len(list(csv.DictReader(arquivo))), 2)
+
+    def test_original_creation_date_survives(self):
+        caminho = self._csv([
+            self._linha(data_criacao='2019-03-04T10:30:00-03:00'),
+            self._linha(criado_por='bruno', data_criacao='2019-03-05'),
+            self._linha(data_criacao='ontem'),
+        ])
+        call_command('import_chamados', caminho, stdout=io.StringIO(), stderr=io.StringIO())
+
+        chamado = Chamado.objects.get(criado_por__username='ana')
+        self.assertEqual(chamado.data_criacao, datetime(2019, 3, 4, 13, 30, tzinfo=dt_timezone.utc))
+        # O prazo de SLA conta a partir da abertura original
+        self.assertEqual(chamado.prazo_sla, prazo_para(chamado.setor, chamado.urgencia, chamado.data_criacao))
+        self.assertEqual(Chamado.objects.get(criado_por__username='bruno').data_criacao.date(), date(2019, 3, 5))
+        with open(caminho + '.rejeitados.csv', encoding='utf-8') as arquivo:
+            self.assertIn('data_criacao', next(csv.DictReader(arquivo))['erro'])
+
+    def test_one_lookup_and_one_insert_per_batch(self):
+        lote = list(enumerate([self._linha(criado_por=nome) for nome in ('ana', 'bruno') * 10], start=2))
+        # autores do lote + INSERT (+ savepoint e release da transação)
+        with self.assertNumQueries(4):
+            quantidade, rejeitados = importar_lote(lote)
+        self.assertEqual((quantidade, rejeitados), (20, []))
+
+    def test_counters_and_search_index_see_imported_tickets(self):
+        obter_contadores()
+        buscar_ids('computador')
+        with self.captureOnCommitCallbacks(execute=True):
+            importar_lote([(2, self._linha())])
+        self.assertEqual(obter_contadores()['resolvido'], 1)
+        self.assertEqual(len(buscar_ids('computador')), 1)
@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..meus_chamados import POR_PAGINA, TAMANHO_RESUMO
+from ..models import Chamado
+from ..operacoes import alterar_status_em_massa
+
+
+class MeusChamadosTestCase(TestCase):
+    """ Lista "Meus chamados": paginada, com resumo da descrição e em cache por usuário """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.outro = User.objects.create_user(username='outro', password='password123')
+        for i in range(POR_PAGINA + 5):
+            Chamado.objects.create(
+                criado_por=self.user, assunto=f'Chamado {i:02d}', descricao='x' * 5000,
+                status='resolvido' if i % 4 == 0 else 'aberto',
+            )
+        self.client.login(username='testuser', password='password123')
+        self.url = reverse('Chamados:ver_chamados')
+
+    def test_paginates_with_cursor(self):
+        primeira = self.client.get(self.url)
+        self.assertEqual(primeira.content.count(b'data-chamado-id'), POR_PAGINA)
+        cursor = primeira.content.decode().split('?cursor=')[1].split('"')[0]
+        segunda = self.client.get(self.url + '?cursor=' + cursor)
+        self.assertEqual(segunda.content.count(b'data-chamado-id'), 5)
+        self.assertContains(segunda, 'Chamado 00')
+        self.assertNotContains(segunda, 'Chamado 16')
+
+    def test_only_an_excerpt_of_the_description_is_loaded(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url)
+        sql = next(q['sql'] for q in consultas.captured_queries if 'assunto' in q['sql'])
+        # A descrição só aparece dentro do corte feito pelo banco
+        self.assertEqual(sql.count('descricao'), 1)
+        self.assertIn(str(TAMANHO_RESUMO + 1), sql)
+        self.assertContains(response, 'x' * (TAMANHO_RESUMO // 2))
+        self.assertContains(response, '…')
+        self.assertNotContains(response, 'x' * (TAMANHO_RESUMO + 1))
+
+    def test_status_filter(self):
+        response = self.client.get(self.url, {'status': 'resolvido'})
+        self.assertEqual(response.content.count(b'data-chamado-id'), 5)
+        # Status desconhecido é ignorado
+        response = self.client.get(self.url, {'status': 'inexistente'})
+        self.assertEqual(response.content.count(b'data-chamado-id'), POR_PAGINA)
+
+    def test_list_is_cached_until_the_owner_changes_a_ticket(self):
+        self.client.get(self.url)
+        # Em cache: só a sessão e o usuário são consultados
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        # Chamados de outro usuário não invalidam a lista
+        with self.captureOnCommitCallbacks(execute=True):
+            Chamado.objects.create(criado_por=self.outro, assunto='De outra pessoa')
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Chamado.objects.create(criado_por=self.user, assunto='Impressora parada')
+        self.assertContains(self.client.get(self.url), 'Impressora parada')
+
+    def test_evicted_version_does_not_bring_back_stale_pages(self):
+        self.client.get(self.url)
+        # O cache despeja a versão, mas as páginas gravadas com ela continuam lá
+        cache.delete(f'chamados:meus:versao:{self.user.id}')
+        with self.captureOnCommitCallbacks(execute=True):
+            Chamado.objects.create(criado_por=self.user, assunto='Impressora parada')
+        self.assertContains(self.client.get(self.url), 'Impressora parada')
+
+    def test_bulk_status_change_invalidates_owner_list(self):
+        self.client.get(self.url, {'status': 'fechado'})
+        with self.captureOnCommitCallbacks(execute=True):
+            alterar_status_em_massa(Chamado.objects.filter(status='resolvido'), 'fechado', None)
+        response = self.client.get(self.url, {'status': 'fechado'})
+        self.assertEqual(response.content.count(b'data-chamado-id'), 5)
+
+    def test_lists_are_not_shared_between_users(self):
+        self.client.get(self.url)
+        self.client.login(username='outro', password='password123')
+        self.assertContains(self.client.get(self.url), 'Nenhum chamado encontrado')
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..contadores import contar_por_status, obter_contadores
+from ..models import AtualizacaoChamado, Chamado
+from ..operacoes import ALTERADO, INALTERADO, NAO_ENCONTRADO, alterar_status_em_massa
+
+
+class AlterarStatusEmMassaTestCase(TestCase):
+    """ Triagem em massa: um UPDATE, um bulk_create e resultado por chamado """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        self.abertos = [
+            Chamado.objects.create(criado_por=self.user, assunto=f'Sem rede {i}', setor='ti', status='aberto')
+            for i in range(5)
+        ]
+        self.resolvido = Chamado.objects.create(criado_por=self.user, assunto='Impressora', setor='rh', status='resolvido')
+
+    def test_one_update_and_one_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            alterar_status_em_massa(Chamado.objects.all(), 'resolvido', self.staff_user)
+        escritas = [q['sql'].split()[0] for q in ctx.captured_queries if q['sql'].startswith(('UPDATE', 'INSERT'))]
+        self.assertEqual(escritas, ['UPDATE', 'INSERT'])
+        self.assertEqual(Chamado.objects.filter(status='resolvido').count(), 6)
+        self.assertEqual(AtualizacaoChamado.objects.filter(status_anterior='aberto', status_novo='resolvido').count(), 5)
+
+    def test_results_per_ticket(self):
+        ids = [self.abertos[0].id, self.resolvido.id, 999999]
+        resultados = alterar_status_em_massa(Chamado.objects.all(), 'resolvido', self.staff_user, ids=ids)
+        por_id = {r['id']: r for r in resultados}
+        self.assertEqual(por_id[self.abertos[0].id], {'id': self.abertos[0].id, 'status_anterior': 'aberto', 'resultado': ALTERADO})
+        self.assertEqual(por_id[self.resolvido.id]['resultado'], INALTERADO)
+        self.assertEqual(por_id[999999]['resultado'], NAO_ENCONTRADO)
+        self.assertEqual(Chamado.objects.get(id=self.abertos[1].id).status, 'aberto')
+        self.assertFalse(AtualizacaoChamado.objects.filter(chamado=self.resolvido).exists())
+
+    def test_counters_follow_the_update(self):
+        obter_contadores()
+        with self.captureOnCommitCallbacks(execute=True):
+            alterar_status_em_massa(Chamado.objects.filter(setor='ti'), 'em_analise', self.staff_user)
+        self.assertEqual(obter_contadores(), contar_por_status())
+        self.assertEqual(obter_contadores()['em_analise'], 5)
+
+    def test_owners_are_notified_after_commit(self):
+        with mock.patch('Chamados.operacoes.notificar_status') as notificar:
+            with self.captureOnCommitCallbacks(execute=True):
+                alterar_status_em_massa(Chamado.objects.all(), 'fechado', self.staff_user, 'Queda de energia')
+        eventos = notificar.call_args.args[0]
+        self.assertEqual(len(eventos), 6)
+        self.assertEqual({e['dono_id'] for e in eventos}, {self.user.id})
+        self.assertEqual({e['mensagem'] for e in eventos}, {'Queda de energia'})
+
+    def test_endpoint(self):
+        self.client.login(username='staffuser', password='password123')
+        response = self.client.post(reverse('Chamados:alterar_status_em_massa'), {
+            'status': 'em_analise', 'filtro_setor': 'ti',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['alterados'], 5)
+        self.assertEqual(Chamado.objects.get(id=self.resolvido.id).status, 'resolvido')
+
+    def test_endpoint_requires_ids_or_filter(self):
+        self.client.login(username='staffuser', password='password123')
+        response = self.client.post(reverse('Chamados:alterar_status_em_massa'), {'status': 'fechado'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Chamado.objects.filter(status='fechado').exists())
+
+    def test_endpoint_is_staff_only(self):
+        self.client.login(username='testuser', password='password123')
+        response = self.client.post(reverse('Chamados:alterar_status_em_massa'), {'status': 'fechado', 'ids': str(self.resolvido.id)})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Chamado.objects.get(id=self.resolvido.id).status, 'resolvido')
+
+    def test_admin_action(self):
+        User.objects.create_superuser(username='admin', password='password123')
+        self.client.login(username='admin', password='password123')
+        response = self.client.post(reverse('admin:Chamados_chamado_changelist'), {
+            'action': 'marcar_como_fechado',
+            '_selected_action': [c.id for c in self.abertos[:3]],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Chamado.objects.filter(status='fechado').count(), 3)
+        self.assertEqual(AtualizacaoChamado.objects.filter(status_novo='fechado').count(), 3)
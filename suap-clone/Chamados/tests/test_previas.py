@@ -0,0 +1,134 @@
+import io
+import os
+import shutil
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import MidiaTemporariaMixin
+from .. import previas
+from ..models import Anexo, ArquivoAnexo, Chamado, armazenamento_anexos
+
+
+def imagem_png(largura=1200, altura=900, modo='RGB'):
+    saida = io.BytesIO()
+    Image.new(modo, (largura, altura), 'red').save(saida, 'PNG')
+    return saida.getvalue()
+
+
+class PreviasTestCase(MidiaTemporariaMixin, TestCase):
+    """ Miniaturas geradas em segundo plano e lidas pelas páginas """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.chamado = Chamado.objects.create(criado_por=self.user, assunto='Tela azul', setor='ti', urgencia='alta')
+        self.client.login(username='testuser', password='password123')
+
+    def _anexar(self, conteudo, tipo='image/png', nome='tela.png', sha256=None):
+        sha256 = sha256 or f'{ArquivoAnexo.objects.count():064x}'
+        caminho = f'anexos/{sha256[:2]}/{sha256}'
+        armazenamento_anexos.save(caminho, ContentFile(conteudo))
+        arquivo = ArquivoAnexo.objects.create(sha256=sha256, arquivo=caminho, tamanho=len(conteudo), tipo=tipo)
+        return Anexo.objects.create(chamado=self.chamado, enviado_por=self.user, arquivo=arquivo, nome=nome)
+
+    def test_generates_thumbnail_next_to_original(self):
+        anexo = self._anexar(imagem_png(modo='RGBA'))
+        self.assertEqual(anexo.arquivo.previa_status, 'pendente')
+
+        self.assertEqual(previas.gerar_previas(), {'pronta': 1})
+
+        arquivo = ArquivoAnexo.objects.get()
+        self.assertEqual(arquivo.previa_status, 'pronta')
+        self.assertEqual(arquivo.previa.name, arquivo.arquivo.name + '.previa.jpg')
+        with Image.open(arquivo.previa.path) as miniatura:
+            self.assertEqual(miniatura.format, 'JPEG')
+            self.assertLessEqual(max(miniatura.size), max(previas.TAMANHO_PREVIA))
+            self.assertEqual(miniatura.size, (320, 240))
+        # Já processado: a próxima execução não refaz nada
+        self.assertEqual(previas.gerar_previas(), {})
+
+    def test_corrupted_and_oversized_images_fail(self):
+        self._anexar(b'\x89PNG\r\n\x1a\n' + b'lixo' * 100)
+        with mock.patch.object(previas, 'MAXIMO_PIXELS', 100):
+            self._anexar(imagem_png(), sha256='f' * 64)
+            self.assertEqual(previas.gerar_previas(), {'falhou': 2})
+        self.assertFalse(ArquivoAnexo.objects.exclude(previa='').exists())
+
+    def test_pdf_without_renderer_is_unavailable(self):
+        self._anexar(b'%PDF-1.4\n', tipo='application/pdf', nome='nota.pdf')
+        with mock.patch.object(previas.shutil, 'which', return_value=None):
+            self.assertEqual(previas.gerar_previas(), {'indisponivel': 1})
+
+    @skipUnless(shutil.which('pdftoppm'), "pdftoppm não instalado")
+    def test_pdf_first_page_preview(self):
+        saida = io.BytesIO()
+        Image.new('RGB', (600, 800), 'white').save(saida, 'PDF')
+        self._anexar(saida.getvalue(), tipo='application/pdf', nome='nota.pdf')
+        self.assertEqual(previas.gerar_previas(), {'pronta': 1})
+
+    def test_stale_reservations_are_retried(self):
+        anexo = self._anexar(imagem_png())
+        agora = timezone.now()
+        self.assertEqual(len(previas.reservar_lote(agora)), 1)
+        # Reservado por outro worker: fica de fora até o prazo vencer
+        self.assertEqual(previas.reservar_lote(agora), [])
+        depois = agora + previas.TEMPO_MAXIMO_PROCESSANDO + timedelta(seconds=1)
+        self.assertEqual([a.id for a in previas.reservar_lote(depois)], [anexo.arquivo_id])
+
+    def test_pages_use_only_ready_thumbnails(self):
+        pronto = self._anexar(imagem_png(), nome='pronto.png')
+        previas.gerar_previas()
+        pendente = self._anexar(imagem_png(), nome='pendente.png')
+
+        # Listagem: uma consulta para os chamados e outra para as miniaturas
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('Chamados:ver_chamados'))
+        self.assertContains(response, reverse('Chamados:previa_anexo', args=[pronto.id]))
+        self.assertNotContains(response, reverse('Chamados:previa_anexo', args=[pendente.id]))
+
+        response = self.client.get(reverse('Chamados:detalhe_chamado', args=[self.chamado.id]))
+        self.assertContains(response, reverse('Chamados:previa_anexo', args=[pronto.id]))
+        self.assertNotContains(response, reverse('Chamados:previa_anexo', args=[pendente.id]))
+
+        # Nenhuma página abre o arquivo original
+        with mock.patch.object(Image, 'open', side_effect=AssertionError):
+            self.client.get(reverse('Chamados:ver_chamados'))
+            self.client.get(reverse('Chamados:detalhe_chamado', args=[self.chamado.id]))
+
+    def test_thumbnail_view(self):
+        anexo = self._anexar(imagem_png())
+        url = reverse('Chamados:previa_anexo', args=[anexo.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        previas.gerar_previas()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(b''.join(response.streaming_content), open(ArquivoAnexo.objects.get().previa.path, 'rb').read())
+
+        User.objects.create_user(username='outro', password='password123')
+        self.client.login(username='outro', password='password123')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_command_and_cleanup(self):
+        self._anexar(imagem_png())
+        saida = io.StringIO()
+        call_command('gerar_previas', stdout=saida)
+        self.assertIn('1 pronta', saida.getvalue())
+
+        previa = ArquivoAnexo.objects.get().previa.path
+        Anexo.objects.all().delete()
+        ArquivoAnexo.objects.update(criado_em=timezone.now() - timedelta(days=2))
+        call_command('limpar_anexos', stdout=io.StringIO())
+        self.assertFalse(os.path.exists(previa))
@@ -0,0 +1,144 @@
+# Chamados/tests/test_query_plans.py
+import datetime
+import re
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from Calendario.models import Evento
+from Mural.listagem import trecho_do_mural
+from Mural.models import Card
+from ..models import AtualizacaoChamado, Chamado
+from ..sla import chamados_estourados
+
+
+def varreduras_completas(sql):
+    """
+    Roda EXPLAIN na consulta e devolve as tabelas lidas por inteiro: sem
+    índice nenhum ou percorrendo um índice todo. Percorrer um índice só é
+    aceito num "top N" sem WHERE, em que a leitura para no LIMIT.
+    """
+    sql_maiusculo = sql.upper()
+    top_n = ' LIMIT ' in sql_maiusculo and ' WHERE ' not in sql_maiusculo
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            tabelas = []
+            for *_, detalhe in cursor.fetchall():
+                m = re.fullmatch(r'SCAN (\S+)( USING (COVERING )?INDEX \S+)?', detalhe)
+                if m and not (m.group(2) and top_n):
+                    tabelas.append(m.group(1))
+            return tabelas
+        cursor.execute('EXPLAIN ' + sql)
+        colunas = [col[0].lower() for col in cursor.description]
+        linhas = [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+        return [linha['table'] for linha in linhas
+                if linha.get('type') == 'ALL' or (linha.get('type') == 'index' and not top_n)]
+
+
+def sql_da_consulta(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        return connection.ops.last_executed_query(cursor, sql, params)
+
+
+class QueryPlanTestCase(TestCase):
+    """ Nenhuma consulta das views de chamados pode cair em varredura completa """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='password123')
+        cls.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        status = [valor for valor, _ in Chamado.STATUS_CHOICES]
+        Chamado.objects.bulk_create([
+            Chamado(criado_por=cls.user if i % 2 else cls.staff_user, assunto=f'Chamado {i}',
+                    descricao='...', setor='ti', urgencia='baixa', status=status[i % len(status)],
+                    responsavel=cls.staff_user if i % 10 == 0 else None)
+            for i in range(200)
+        ])
+        cls.chamado = Chamado.objects.filter(criado_por=cls.user).first()
+        AtualizacaoChamado.objects.create(chamado=cls.chamado, responsavel=cls.staff_user,
+                                          status_anterior='aberto', status_novo='em_analise')
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def setUp(self):
+        cache.clear()
+
+    def assertSemVarreduraCompleta(self, url, params=None, aquecer=False):
+        if aquecer:
+            self.client.get(url, params)
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        for consulta in contexto.captured_queries:
+            sql = consulta['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            with self.subTest(sql=sql):
+                self.assertEqual(varreduras_completas(sql), [])
+        return response
+
+    def test_ver_chamados(self):
+        self.client.login(username='testuser', password='password123')
+        self.assertSemVarreduraCompleta(reverse('Chamados:ver_chamados'))
+
+    def test_detalhe_chamado(self):
+        self.client.login(username='testuser', password='password123')
+        self.assertSemVarreduraCompleta(reverse('Chamados:detalhe_chamado', args=[self.chamado.id]))
+
+    def test_ver_chamados_admin(self):
+        self.client.login(username='staffuser', password='password123')
+        url = reverse('Chamados:ver_chamados_admin')
+        response = self.assertSemVarreduraCompleta(url, aquecer=True)
+        self.assertSemVarreduraCompleta(url, {'cursor': response.context['chamados'].cursor_proxima})
+        self.assertSemVarreduraCompleta(url, {'status': 'em_analise'}, aquecer=True)
+        self.assertSemVarreduraCompleta(url, {'search': 'testuser'}, aquecer=True)
+
+    def test_minha_fila(self):
+        self.client.login(username='staffuser', password='password123')
+        self.assertSemVarreduraCompleta(reverse('Chamados:minha_fila'))
+
+    def test_dashboard_admin(self):
+        self.client.login(username='staffuser', password='password123')
+        # A agregação dos contadores varre a tabela, mas só quando o cache está vazio
+        self.assertSemVarreduraCompleta(reverse('App:dashboard_admin'), aquecer=True)
+
+    def test_historico_do_chamado(self):
+        queryset = AtualizacaoChamado.objects.filter(chamado=self.chamado).order_by('data_atualizacao')
+        self.assertEqual(varreduras_completas(sql_da_consulta(queryset)), [])
+
+    def test_eventos_por_intervalo_de_datas(self):
+        queryset = Evento.objects.filter(data_evento__range=(datetime.date(2025, 3, 1), datetime.date(2025, 3, 31)))
+        self.assertEqual(varreduras_completas(sql_da_consulta(queryset)), [])
+
+    def test_feed_do_mural(self):
+        # Os expirados, que só se acumulam, ficam de fora pelo índice
+        agora = timezone.now()
+        Card.objects.bulk_create([
+            Card(titulo=f'Card {i}', descricao='...', fixado=i % 7 == 0,
+                 expira_em=agora + datetime.timedelta(days=i % 3 - 1) if i % 2 else None)
+            for i in range(60)
+        ])
+        for user in (self.staff_user, self.user):
+            for antes_de in (None, 30):
+                with self.subTest(user=user.username, antes_de=antes_de):
+                    cache.clear()
+                    with CaptureQueriesContext(connection) as contexto:
+                        trecho_do_mural(user, antes_de)
+                    for consulta in contexto.captured_queries:
+                        self.assertEqual(varreduras_completas(consulta['sql']), [], consulta['sql'])
+
+    def test_varredura_de_sla(self):
+        queryset = chamados_estourados(timezone.now()).order_by('prazo_sla')
+        self.assertEqual(varreduras_completas(sql_da_consulta(queryset)), [])
+
+    def test_detecta_varredura_completa(self):
+        queryset = Chamado.objects.filter(descricao='...')
+        self.assertEqual(varreduras_completas(sql_da_consulta(queryset)), [Chamado._meta.db_table])
@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import AtendenteSetor, Chamado
+from ..operacoes import alterar_status_em_massa
+from ..roteamento import contar_cargas, escolher_responsavel, obter_cargas
+
+
+class RoteamentoTestCase(TestCase):
+    """ Atribuição automática por setor e carga dos atendentes """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.ana = User.objects.create_user(username='ana', password='password123', is_staff=True)
+        self.bruno = User.objects.create_user(username='bruno', password='password123', is_staff=True)
+        self.carla = User.objects.create_user(username='carla', password='password123', is_staff=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            for atendente in (self.ana, self.bruno):
+                AtendenteSetor.objects.create(atendente=atendente, setor='ti')
+            AtendenteSetor.objects.create(atendente=self.carla, setor='rh')
+
+    def _criar(self, setor='ti'):
+        self.client.login(username='testuser', password='password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('Chamados:criar_chamado'), {
+                'assunto': 'Computador não liga', 'descricao': 'Descrição longa o bastante para o formulário.',
+                'setor': setor, 'urgencia': 'alta',
+            })
+        return Chamado.objects.latest('id')
+
+    def _assert_cargas_consistentes(self):
+        ids = [self.ana.id, self.bruno.id, self.carla.id]
+        self.assertEqual(obter_cargas(ids), contar_cargas(ids))
+
+    def test_new_tickets_are_balanced_within_sector(self):
+        responsaveis = [self._criar().responsavel for _ in range(4)]
+        self.assertEqual(responsaveis, [self.ana, self.bruno, self.ana, self.bruno])
+        self.assertEqual(self._criar('rh').responsavel, self.carla)
+        self.assertIsNone(self._criar('limpeza').responsavel)
+        self._assert_cargas_consistentes()
+
+    def test_routing_reads_counters_not_count_queries(self):
+        self._criar()
+        with self.assertNumQueries(0):
+            self.assertEqual(escolher_responsavel('ti'), self.bruno.id)
+
+    def test_load_follows_status_and_reassignment(self):
+        primeiro = self._criar()
+        self._criar()
+        with self.captureOnCommitCallbacks(execute=True):
+            primeiro.status = 'resolvido'
+            primeiro.save()
+        self._assert_cargas_consistentes()
+        self.assertEqual(escolher_responsavel('ti'), primeiro.responsavel_id)
+
+        segundo = Chamado.objects.exclude(id=primeiro.id).get()
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.responsavel = self.carla
+            segundo.save()
+        self._assert_cargas_consistentes()
+
+    def test_deferred_fields_and_bulk_updates_force_recount(self):
+        self._criar()
+        self._criar()
+        obter_cargas([self.ana.id, self.bruno.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            chamado = Chamado.objects.only('assunto').first()
+            chamado.assunto = 'Outro assunto'
+            chamado.save()
+        self._assert_cargas_consistentes()
+        with self.captureOnCommitCallbacks(execute=True):
+            alterar_status_em_massa(Chamado.objects.all(), 'fechado', self.ana)
+        self._assert_cargas_consistentes()
+
+    def test_inactive_attendants_get_no_tickets(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AtendenteSetor.objects.filter(atendente=self.ana).get().delete()
+        self.assertEqual([self._criar().responsavel for _ in range(2)], [self.bruno, self.bruno])
+
+    def test_deactivated_or_demoted_users_get_no_tickets(self):
+        self.assertEqual(escolher_responsavel('ti'), self.ana.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ana.is_active = False
+            self.ana.save()
+        self.assertEqual(escolher_responsavel('ti'), self.bruno.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bruno.is_staff = False
+            self.bruno.save()
+        self.assertIsNone(escolher_responsavel('ti'))
+        # Outras mudanças no usuário não mexem no cache
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.carla.last_name = 'Souza'
+            self.carla.save()
+        self.assertEqual(callbacks, [])
+
+    def test_my_queue_lists_only_assigned_open_tickets(self):
+        meus = [self._criar() for _ in range(3)]
+        self.client.login(username='ana', password='password123')
+        response = self.client.get(reverse('Chamados:minha_fila'))
+        ids = [c.id for c in response.context['chamados']]
+        self.assertEqual(sorted(ids), sorted(c.id for c in meus if c.responsavel == self.ana))
+        response = self.client.get(reverse('Chamados:minha_fila'), {'status': 'resolvido'})
+        self.assertEqual(list(response.context['chamados']), [])
@@ -0,0 +1,108 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..analiticos import atualizar_resumos
+from ..models import AtualizacaoChamado, Chamado, ResumoDiario
+from ..sla import escalar_lote, prazo_para, verificar_sla
+
+
+class SlaTestCase(TestCase):
+    """ Prazos de atendimento e a verificação de estouros """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+
+    def _chamado(self, setor='ti', urgencia='alta', status='aberto', atraso=None):
+        chamado = Chamado.objects.create(criado_por=self.user, assunto='Chamado', setor=setor, urgencia=urgencia, status=status)
+        if atraso is not None:
+            Chamado.objects.filter(id=chamado.id).update(prazo_sla=timezone.now() - atraso)
+        return chamado
+
+    def test_deadline_from_urgency_and_sector(self):
+        agora = timezone.now()
+        self.assertEqual(prazo_para('ti', 'alta', agora), agora + timedelta(hours=4))
+        self.assertEqual(prazo_para('manutencao', 'baixa', agora), agora + timedelta(days=7))
+        self.assertEqual(prazo_para('manutencao', 'alta', agora), agora + timedelta(hours=4))
+        chamado = self._chamado(urgencia='media')
+        self.assertAlmostEqual(chamado.prazo_sla - chamado.data_criacao, timedelta(hours=24), delta=timedelta(seconds=1))
+        self.assertEqual(chamado.situacao_sla, 'no_prazo')
+
+    def test_deadline_follows_urgency_change(self):
+        chamado = Chamado.objects.get(id=self._chamado(urgencia='baixa').id)
+        chamado.urgencia = 'alta'
+        chamado.save()
+        chamado.refresh_from_db()
+        self.assertAlmostEqual(chamado.prazo_sla - chamado.data_criacao, timedelta(hours=4), delta=timedelta(seconds=1))
+
+    def test_escalates_only_overdue_open_tickets(self):
+        atrasado = self._chamado(atraso=timedelta(hours=1))
+        self._chamado(status='resolvido', atraso=timedelta(hours=1))
+        self._chamado()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(escalar_lote(), 1)
+        escritas = [q['sql'].split()[0] for q in ctx.captured_queries if q['sql'].startswith(('UPDATE', 'INSERT'))]
+        self.assertEqual(escritas, ['UPDATE', 'INSERT'])
+
+        atrasado.refresh_from_db()
+        self.assertIsNotNone(atrasado.sla_estourado_em)
+        self.assertEqual(atrasado.situacao_sla, 'estourado')
+        atualizacao = AtualizacaoChamado.objects.get(chamado=atrasado)
+        self.assertEqual((atualizacao.status_anterior, atualizacao.status_novo), ('aberto', 'aberto'))
+        # Já escalado: não entra de novo
+        self.assertEqual(escalar_lote(), 0)
+
+    def test_escalation_is_not_a_status_entry(self):
+        chamado = self._chamado(atraso=timedelta(hours=1))
+        hoje = timezone.localdate()
+
+        def entradas():
+            atualizar_resumos(hoje, hoje)
+            return sorted(ResumoDiario.objects.filter(entradas__gt=0).values_list('status', 'entradas'))
+
+        antes = entradas()
+        call_command('check_sla', stdout=io.StringIO())
+        self.assertEqual(entradas(), antes)
+
+        # Na linha do tempo aparece só a mensagem, sem "Aberto → Aberto"
+        self.client.login(username='testuser', password='password123')
+        response = self.client.get(reverse('Chamados:detalhe_chamado', args=[chamado.id]))
+        self.assertContains(response, 'Prazo de atendimento estourado')
+        self.assertNotContains(response, 'Aberto → <strong>Aberto</strong>')
+
+    def test_batches(self):
+        for _ in range(5):
+            self._chamado(atraso=timedelta(minutes=5))
+        self.assertEqual(verificar_sla(tamanho_lote=2), 5)
+        self.assertEqual(AtualizacaoChamado.objects.count(), 5)
+
+    def test_command(self):
+        self._chamado(atraso=timedelta(minutes=5))
+        stdout = io.StringIO()
+        call_command('check_sla', stdout=stdout)
+        self.assertIn('1 chamado(s) com SLA estourado', stdout.getvalue())
+
+    def test_admin_queue_shows_sla_without_extra_queries(self):
+        self._chamado(atraso=timedelta(minutes=5))
+        self._chamado()
+        self.client.login(username='staffuser', password='password123')
+        url = reverse('Chamados:ver_chamados_admin')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as poucos:
+            response = self.client.get(url)
+        self.assertContains(response, 'data-sla="estourado"')
+        self.assertContains(response, 'data-sla="no_prazo"')
+        for _ in range(5):
+            self._chamado()
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as muitos:
+            self.client.get(url)
+        self.assertEqual(len(muitos.captured_queries), len(poucos.captured_queries))
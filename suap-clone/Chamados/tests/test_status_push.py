@@ -0,0 +1,61 @@
+# Chamados/tests/test_status_push.py
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.test import Client, TransactionTestCase
+
+from core.asgi import application
+from ..models import AtualizacaoChamado, Chamado
+
+
+class StatusPushTestCase(TransactionTestCase):
+    """ Mudanças de status chegam ao dono do chamado pelo WebSocket /ws/chamados/ """
+
+    def setUp(self):
+        self.dono = User.objects.create_user(username='dono', password='password123')
+        self.outro = User.objects.create_user(username='outro', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        self.chamado = Chamado.objects.create(
+            criado_por=self.dono, assunto='Projetor sem imagem', descricao='...', setor='ti', urgencia='media'
+        )
+        self.sessoes = {}
+        for usuario in (self.dono, self.outro):
+            cliente = Client()
+            cliente.force_login(usuario)
+            self.sessoes[usuario.pk] = cliente.cookies['sessionid'].value
+
+    def _comunicador(self, usuario):
+        cookie = f"sessionid={self.sessoes[usuario.pk]}"
+        return WebsocketCommunicator(application, "/ws/chamados/", headers=[(b"cookie", cookie.encode("ascii")), (b"origin", b"http://localhost")])
+
+    def _alterar_status(self, status):
+        anterior = self.chamado.status
+        self.chamado.status = status
+        self.chamado.save()
+        AtualizacaoChamado.objects.create(
+            chamado=self.chamado, responsavel=self.staff_user,
+            status_anterior=anterior, status_novo=status, mensagem="Status alterado pelo admin",
+        )
+
+    async def test_owner_receives_status_change(self):
+        do_dono = self._comunicador(self.dono)
+        do_outro = self._comunicador(self.outro)
+        self.assertTrue((await do_dono.connect(timeout=5))[0])
+        self.assertTrue((await do_outro.connect(timeout=5))[0])
+
+        await database_sync_to_async(self._alterar_status)('em_analise')
+
+        evento = await do_dono.receive_json_from(timeout=5)
+        self.assertEqual(evento['chamado_id'], self.chamado.id)
+        self.assertEqual(evento['status'], 'em_analise')
+        self.assertEqual(evento['status_display'], 'Em Análise')
+        self.assertEqual(evento['status_anterior'], 'aberto')
+        self.assertTrue(await do_outro.receive_nothing(timeout=0.2))
+
+        await do_dono.disconnect()
+        await do_outro.disconnect()
+
+    async def test_anonymous_is_rejected(self):
+        communicator = WebsocketCommunicator(application, "/ws/chamados/")
+        connected, _ = await communicator.connect(timeout=5)
+        self.assertFalse(connected)
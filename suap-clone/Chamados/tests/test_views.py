@@ -0,0 +1,203 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..busca import buscar_ids, indice, tokenizar
+from ..models import AtualizacaoChamado, Chamado
+
+
+class VerChamadosAdminCursorTestCase(TestCase):
+    """ Paginação por cursor da fila de chamados da equipe """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        for i in range(25):
+            Chamado.objects.create(
+                criado_por=self.user,
+                assunto=f'Chamado {i:02d}',
+                status='resolvido' if i % 5 == 0 else 'aberto',
+            )
+        # Vários chamados com a mesma data: o desempate tem que ser pelo id
+        Chamado.objects.filter(id__lte=Chamado.objects.order_by('id')[11].id).update(data_criacao=timezone.now())
+        self.client.login(username='staffuser', password='password123')
+
+    def _percorrer(self, params=None, cursor_attr='cursor_proxima', cursor=None):
+        vistos = []
+        while True:
+            query = dict(params or {})
+            if cursor:
+                query['cursor'] = cursor
+            pagina = self.client.get(reverse('Chamados:ver_chamados_admin'), query).context['chamados']
+            vistos.append([c.id for c in pagina])
+            cursor = getattr(pagina, cursor_attr)
+            if cursor is None:
+                return vistos, pagina
+
+    def test_cursor_walks_every_ticket_once_in_order(self):
+        paginas, _ = self._percorrer()
+        ids = [i for pagina in paginas for i in pagina]
+        esperado = list(Chamado.objects.order_by('-data_criacao', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperado)
+        self.assertEqual([len(p) for p in paginas], [10, 10, 5])
+
+    def test_previous_cursor_returns_previous_page(self):
+        primeira = self.client.get(reverse('Chamados:ver_chamados_admin')).context['chamados']
+        segunda = self.client.get(reverse('Chamados:ver_chamados_admin'), {'cursor': primeira.cursor_proxima}).context['chamados']
+        self.assertTrue(segunda.has_previous())
+        volta = self.client.get(reverse('Chamados:ver_chamados_admin'), {'cursor': segunda.cursor_anterior}).context['chamados']
+        self.assertEqual([c.id for c in volta], [c.id for c in primeira])
+        self.assertFalse(volta.has_previous())
+        self.assertTrue(volta.has_next())
+
+    def test_cursor_keeps_status_filter(self):
+        paginas, _ = self._percorrer({'status': 'resolvido'})
+        self.assertEqual(sum(len(p) for p in paginas), 5)
+        response = self.client.get(reverse('Chamados:ver_chamados_admin'), {'status': 'resolvido'})
+        self.assertEqual(response.context['total_aproximado'], 5)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('Chamados:ver_chamados_admin'), {'cursor': 'lixo'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['chamados']), 10)
+
+    def test_deep_page_does_not_count(self):
+        _, pagina = self._percorrer()
+        # sessão + usuário + página (o total vem dos contadores em cache)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('Chamados:ver_chamados_admin'), {'cursor': pagina.cursor_anterior})
+
+
+class BuscaChamadosTestCase(TestCase):
+    """ Busca textual (índice invertido usado fora do MySQL) """
+
+    def setUp(self):
+        cache.clear()
+        indice.limpar()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        self.impressora = Chamado.objects.create(
+            criado_por=self.user, assunto='Impressora sem toner',
+            descricao='A impressora do bloco B parou de imprimir.')
+        self.rede = Chamado.objects.create(
+            criado_por=self.user, assunto='Rede lenta no laboratório',
+            descricao='Depois da troca da impressora a rede ficou lenta.')
+        self.ar = Chamado.objects.create(
+            criado_por=self.staff_user, assunto='Ar-condicionado pingando',
+            descricao='Sala 12 com vazamento.', status='resolvido')
+
+    def test_tokenizar_ignores_accents_and_short_words(self):
+        self.assertEqual(tokenizar('Laboratório de Informática: PC nº 3'), ['laboratorio', 'informatica'])
+
+    def test_results_are_ranked_by_relevance(self):
+        self.assertEqual(buscar_ids('impressora'), [self.impressora.id, self.rede.id])
+        self.assertEqual(buscar_ids('laboratorio lenta'), [self.rede.id])
+        self.assertEqual(buscar_ids('de a'), [])
+
+    def test_index_is_updated_on_save_and_delete(self):
+        buscar_ids('impressora')  # monta o índice
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ar.descricao = 'Pingando em cima da impressora.'
+            self.ar.save()
+        self.assertIn(self.ar.id, buscar_ids('impressora'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.impressora.delete()
+        self.assertEqual(buscar_ids('toner'), [])
+
+    def test_username_substring_lists_the_authors_tickets(self):
+        # Como na busca antiga (icontains no nome de usuário), depois dos resultados pelo texto
+        self.assertEqual(buscar_ids('staff'), [self.ar.id])
+        self.assertEqual(buscar_ids('TESTU'), [self.rede.id, self.impressora.id])
+        self.assertEqual(buscar_ids('user'), [self.ar.id, self.rede.id, self.impressora.id])
+
+    def test_short_and_numeric_terms_count(self):
+        sala = Chamado.objects.create(criado_por=self.user, assunto='Projetor da sala 12', descricao='Sem imagem.')
+        Chamado.objects.create(criado_por=self.user, assunto='Projetor da sala 3', descricao='Sem som.')
+        # "12" é curto demais para o índice, mas ainda restringe o resultado
+        self.assertEqual(buscar_ids('projetor 12'), [sala.id])
+        self.assertEqual(buscar_ids('12'), [sala.id, self.ar.id])
+
+    def test_search_respects_queryset_filters(self):
+        self.assertEqual(buscar_ids('pingando', Chamado.objects.filter(status='aberto')), [])
+
+    def test_admin_queue_search(self):
+        self.client.login(username='staffuser', password='password123')
+        response = self.client.get(reverse('Chamados:ver_chamados_admin'), {'search': 'impressora'})
+        self.assertEqual([c.id for c in response.context['chamados']], [self.impressora.id, self.rede.id])
+        self.assertEqual(response.context['total_aproximado'], 2)
+
+        response = self.client.get(reverse('Chamados:ver_chamados_admin'), {'search': 'staffuser'})
+        self.assertEqual([c.id for c in response.context['chamados']], [self.ar.id])
+
+    def test_model_admin_search(self):
+        self.staff_user.is_superuser = True
+        self.staff_user.save()
+        self.client.login(username='staffuser', password='password123')
+        response = self.client.get(reverse('admin:Chamados_chamado_changelist'), {'q': 'toner'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.impressora])
+
+
+class LinhaDoTempoTestCase(TestCase):
+    """ Linha do tempo das atualizações no detalhe do chamado e no admin """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.chamado = Chamado.objects.create(criado_por=self.user, assunto='Impressora', status='resolvido')
+
+    def _criar_atualizacoes(self, quantidade):
+        for i in range(quantidade):
+            responsavel = User.objects.create_user(username=f'tecnico{AtualizacaoChamado.objects.count()}')
+            AtualizacaoChamado.objects.create(
+                chamado=self.chamado, responsavel=responsavel,
+                status_anterior='aberto', status_novo='em_analise', mensagem=f'Passo {i}',
+            )
+
+    def test_timeline_is_rendered_in_order(self):
+        self._criar_atualizacoes(3)
+        self.client.login(username='testuser', password='password123')
+        response = self.client.get(reverse('Chamados:detalhe_chamado', args=[self.chamado.id]))
+        self.assertEqual([a.mensagem for a in response.context['chamado'].atualizacoes], ['Passo 0', 'Passo 1', 'Passo 2'])
+        self.assertContains(response, 'tecnico0')
+        self.assertContains(response, 'Em Análise')
+        self.assertNotContains(response, 'Nenhuma atualização disponível')
+
+    def test_empty_timeline(self):
+        self.client.login(username='testuser', password='password123')
+        response = self.client.get(reverse('Chamados:detalhe_chamado', args=[self.chamado.id]))
+        self.assertContains(response, 'Nenhuma atualização disponível')
+
+    def test_detail_query_count_does_not_grow_with_updates(self):
+        self.client.login(username='testuser', password='password123')
+        url = reverse('Chamados:detalhe_chamado', args=[self.chamado.id])
+        self._criar_atualizacoes(1)
+        # sessão + usuário + chamado + linha do tempo (já com o responsável) + anexos
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        self._criar_atualizacoes(5)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_admin_pages_query_count_does_not_grow_with_updates(self):
+        User.objects.create_superuser(username='admin', password='password123')
+        self.client.login(username='admin', password='password123')
+        paginas = [
+            reverse('admin:Chamados_atualizacaochamado_changelist'),
+            reverse('admin:Chamados_chamado_change', args=[self.chamado.id]),
+        ]
+        self._criar_atualizacoes(1)
+        consultas = {}
+        for url in paginas:
+            self.client.get(url)  # aquece o cache de content types do admin
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            consultas[url] = len(ctx.captured_queries)
+        self._criar_atualizacoes(5)
+        for url in paginas:
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            self.assertEqual(len(ctx.captured_queries), consultas[url], url)
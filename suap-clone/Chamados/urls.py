@@ -9,5 +9,13 @@ urlpatterns = [
     path('criar/', views.criar_chamado, name='criar_chamado'),
     path('meus/', views.ver_chamados, name='ver_chamados'),
     path('meus/<int:id>/', views.detalhe_chamado, name='detalhe_chamado'),
+    path('meus/<int:id>/anexos/', views.iniciar_anexo, name='iniciar_anexo'),
+    path('anexos/envios/<uuid:envio_id>/', views.envio_anexo, name='envio_anexo'),
+    path('anexos/<int:id>/', views.baixar_anexo, name='baixar_anexo'),
+    path('anexos/<int:id>/previa/', views.previa_anexo, name='previa_anexo'),
     path('admin/', views.ver_chamados_admin, name='ver_chamados_admin'),
+    path('admin/minha-fila/', views.minha_fila, name='minha_fila'),
+    path('admin/indicadores/', views.indicadores_chamados, name='indicadores_chamados'),
+    path('admin/exportar/', views.exportar_chamados, name='exportar_chamados'),
+    path('admin/status-em-massa/', views.alterar_status_em_massa_view, name='alterar_status_em_massa'),
 ]
\ No newline at end of file
@@ -1,66 +1,367 @@
 # Chamados/views.py
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.admin.views.decorators import staff_member_required
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
-from .models import Chamado
-from .forms import ChamadoForm 
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import content_disposition_header
+from django.views.decorators.http import require_http_methods, require_POST
+from App.condicional import get_condicional
+from .models import Anexo, AtualizacaoChamado, Chamado, EnvioAnexo
+from .forms import AlteracaoStatusEmMassaForm, ChamadoForm, ExportacaoForm, IndicadoresForm
+from .analiticos import consultar_indicadores
+from .anexos import (
+    TAMANHO_MAXIMO_PARTE, AnexoInvalido, ConflitoDeEnvio, iniciar_envio, interpretar_range, ler_intervalo, receber_parte,
+)
+from .busca import buscar_ids
+from .contadores import total_por_status
+from .exportacao import chamados_para_exportar, exportar
+from .idempotencia import TAMANHO_MAXIMO_CHAVE, chave_de, gravar_resposta, liberar, reservar
+from .limites import consumir_ficha
+from .meus_chamados import (
+    POR_PAGINA, TAMANHO_RESUMO, TIMEOUT_LISTA, chamados_do_usuario, chave_da_pagina, versao_da_lista,
+)
+from .operacoes import ALTERADO, OperacaoGrandeDemais, alterar_status_em_massa
+from .paginacao import paginar_ids_ranqueados, paginar_por_cursor
+from .roteamento import rotear
 
 @login_required
 def chamados(request):
     return render(request, 'Chamados/chamado.html')
 
-@login_required
-def criar_chamado(request):
-    if request.method == 'POST':
+def _salvar_chamado(chamado):
+    rotear(chamado)
+    chamado.save()
+
+
+async def criar_chamado(request):
+    """
+    Criação assíncrona: o limite por usuário e a deduplicação por
+    Idempotency-Key são resolvidos só no cache, antes de tocar no banco.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    if request.method != 'POST':
+        return await sync_to_async(render)(request, 'Chamados/chamado.html')
+
+    chave = None
+    idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+    if idempotency_key:
+        if len(idempotency_key) > TAMANHO_MAXIMO_CHAVE:
+            return JsonResponse({'success': False, 'message': 'Idempotency-Key longa demais.'}, status=400)
+        chave = chave_de(user.pk, idempotency_key)
+        nova, gravada = await reservar(chave)
+        if not nova:
+            if isinstance(gravada, dict):
+                response = JsonResponse(gravada['corpo'], status=gravada['status'])
+                response['Idempotent-Replayed'] = 'true'
+                return response
+            return JsonResponse({'success': False, 'message': 'Este envio ainda está sendo processado.'}, status=409)
+
+    permitido, espera = await consumir_ficha(user.pk)
+    if not permitido:
+        if chave:
+            await liberar(chave)
+        response = JsonResponse(
+            {'success': False, 'message': f'Muitos chamados em pouco tempo. Tente novamente em {espera}s.'},
+            status=429,
+        )
+        response['Retry-After'] = str(espera)
+        return response
+
+    try:
         form = ChamadoForm(request.POST)
         if form.is_valid():
             chamado = form.save(commit=False)
-            chamado.criado_por = request.user
-            chamado.save()
-            return JsonResponse({'success': True, 'message': 'Chamado criado com sucesso!'})
-        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
-    return render(request, 'Chamados/chamado.html')
+            chamado.criado_por = user
+            await sync_to_async(_salvar_chamado)(chamado)
+            status, corpo = 200, {'success': True, 'message': 'Chamado criado com sucesso!', 'id': chamado.id}
+        else:
+            status, corpo = 400, {'success': False, 'errors': {campo: list(erros) for campo, erros in form.errors.items()}}
+    except BaseException:
+        # Falhou antes de responder: a mesma chave pode ser reenviada
+        if chave:
+            await liberar(chave)
+        raise
+    if chave:
+        await gravar_resposta(chave, status, corpo)
+    return JsonResponse(corpo, status=status)
+
+def _marcas_da_lista(request):
+    # A versão muda a cada alteração nos chamados (ou anexos) do usuário
+    return (versao_da_lista(request.user.id),)
 
 @login_required
+@get_condicional(_marcas_da_lista)
 def ver_chamados(request):
-    chamados_list = Chamado.objects.filter(criado_por=request.user).order_by('-data_criacao')
-    return render(request, 'Chamados/ver_chamados.html', {'chamados': chamados_list})
+    status_filter = request.GET.get('status', '')
+    if status_filter not in dict(Chamado.STATUS_CHOICES):
+        status_filter = ''
+    search_query = request.GET.get('search', '').strip()
+    cursor = request.GET.get('cursor', '')
+
+    # O HTML da lista fica em cache por usuário até algum chamado dele mudar
+    chave = chave_da_pagina(request.user.id, status=status_filter, search=search_query, cursor=cursor)
+    lista = cache.get(chave)
+    if lista is None:
+        # Só as miniaturas prontas, numa consulta extra; os originais nunca são lidos aqui
+        previas = Anexo.objects.filter(arquivo__previa_status='pronta').select_related('arquivo').order_by('data_envio')
+        chamados_list = chamados_do_usuario(request.user.id, status_filter).prefetch_related(
+            Prefetch('anexos', queryset=previas, to_attr='anexos_com_previa')
+        )
+        if search_query:
+            ids = buscar_ids(search_query, chamados_list)
+            chamados = paginar_ids_ranqueados(chamados_list, ids, cursor, por_pagina=POR_PAGINA)
+        else:
+            chamados = paginar_por_cursor(chamados_list, cursor, por_pagina=POR_PAGINA)
+        lista = render_to_string('Chamados/partials/lista_meus_chamados.html', {
+            'chamados': chamados,
+            'status_filter': status_filter,
+            'search_query': search_query,
+            'tamanho_resumo': TAMANHO_RESUMO,
+        })
+        cache.set(chave, lista, TIMEOUT_LISTA)
+
+    context = {
+        'lista': lista,
+        'status_filter': status_filter,
+        'search_query': search_query,
+        'chamado_status_choices': Chamado.STATUS_CHOICES,
+    }
+    return render(request, 'Chamados/ver_chamados.html', context)
 
 @login_required
 def detalhe_chamado(request, id):
-    chamado = get_object_or_404(Chamado, id=id, criado_por=request.user) # Garante que o user só veja os seus
+    # Linha do tempo numa única consulta extra, já com o responsável de cada atualização
+    chamados = Chamado.objects.prefetch_related(
+        Prefetch('atualizacaochamado_set', queryset=AtualizacaoChamado.objects.linha_do_tempo(), to_attr='atualizacoes'),
+        Prefetch('anexos', queryset=Anexo.objects.select_related('arquivo').order_by('data_envio')),
+    )
+    chamado = get_object_or_404(chamados, id=id, criado_por=request.user) # Garante que o user só veja os seus
     return render(request, 'Chamados/detalhe_chamado.html', {'chamado': chamado})
 
 @staff_member_required
 def ver_chamados_admin(request):
-    chamados_list = Chamado.objects.all().order_by('-data_criacao')
-    # ... (lógica de filtro e paginação que estava em App/views.py)
+    chamados_list = Chamado.objects.select_related('criado_por', 'responsavel')
     status_filter = request.GET.get('status')
     if status_filter:
         chamados_list = chamados_list.filter(status=status_filter)
     search_query = request.GET.get('search')
+    autor = None
     if search_query:
-        chamados_list = chamados_list.filter(
-            Q(assunto__icontains=search_query) |
-            Q(descricao__icontains=search_query) |
-            Q(criado_por__username__icontains=search_query)
-        )
-    paginator = Paginator(chamados_list, 10)
-    page_number = request.GET.get('page')
-    try:
-        chamados = paginator.page(page_number)
-    except PageNotAnInteger:
-        chamados = paginator.page(1)
-    except EmptyPage:
-        chamados = paginator.page(paginator.num_pages)
+        autor = get_user_model().objects.filter(username=search_query).first()
+    if autor:
+        # A busca é exatamente o nome de um usuário: lista os chamados dele
+        chamados_list = chamados_list.filter(criado_por=autor)
+        chamados = paginar_por_cursor(chamados_list, request.GET.get('cursor'), por_pagina=10)
+        total_aproximado = None
+    elif search_query:
+        # Busca pelo índice textual, ordenada por relevância
+        ids = buscar_ids(search_query, chamados_list)
+        chamados = paginar_ids_ranqueados(chamados_list, ids, request.GET.get('cursor'), por_pagina=10)
+        total_aproximado = len(ids)
+    else:
+        # Paginação por cursor em (data_criacao, id): sem COUNT(*) nem OFFSET por página
+        chamados = paginar_por_cursor(chamados_list, request.GET.get('cursor'), por_pagina=10)
+        total_aproximado = total_por_status(status_filter)
 
     context = {
         'chamados': chamados,
+        'total_aproximado': total_aproximado,
         'status_filter': status_filter,
         'search_query': search_query,
         'chamado_status_choices': Chamado.STATUS_CHOICES,
     }
-    return render(request, 'Chamados/ver_chamados_admin.html', context)
\ No newline at end of file
+    return render(request, 'Chamados/ver_chamados_admin.html', context)
+
+@staff_member_required
+def minha_fila(request):
+    # Só os chamados atribuídos ao atendente (índice chamado_fila_idx)
+    status_filter = request.GET.get('status')
+    chamados_list = Chamado.objects.select_related('criado_por').filter(responsavel=request.user)
+    if status_filter:
+        chamados_list = chamados_list.filter(status=status_filter)
+    else:
+        chamados_list = chamados_list.filter(status__in=Chamado.STATUS_EM_ANDAMENTO)
+    context = {
+        'chamados': paginar_por_cursor(chamados_list, request.GET.get('cursor'), por_pagina=10),
+        'status_filter': status_filter,
+        'chamado_status_choices': Chamado.STATUS_CHOICES,
+    }
+    return render(request, 'Chamados/minha_fila.html', context)
+
+@staff_member_required
+@require_POST
+def alterar_status_em_massa_view(request):
+    form = AlteracaoStatusEmMassaForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    try:
+        resultados = alterar_status_em_massa(
+            Chamado.objects.filter(**form.filtros()),
+            form.cleaned_data['status'],
+            request.user,
+            form.cleaned_data['mensagem'],
+            ids=form.cleaned_data['ids'],
+        )
+    except OperacaoGrandeDemais as erro:
+        return JsonResponse({'success': False, 'errors': {'__all__': [str(erro)]}}, status=400)
+    return JsonResponse({
+        'success': True,
+        'alterados': sum(r['resultado'] == ALTERADO for r in resultados),
+        'resultados': resultados,
+    })
+
+@staff_member_required
+def exportar_chamados(request):
+    form = ExportacaoForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    dados = form.cleaned_data
+    formato = dados['formato'] or 'csv'
+    chamados = chamados_para_exportar(dados['status'], dados['desde'], dados['ate'])
+    # Gera o arquivo enquanto envia: não monta o resultado inteiro na memória
+    response = StreamingHttpResponse(
+        exportar(chamados, formato),
+        content_type='text/csv; charset=utf-8' if formato == 'csv' else 'application/x-ndjson; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="chamados.{formato}"'
+    return response
+
+@staff_member_required
+def indicadores_chamados(request):
+    form = IndicadoresForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    # Padrão: as últimas 12 semanas, agrupadas por semana
+    ate = form.cleaned_data['ate'] or timezone.localdate()
+    desde = form.cleaned_data['desde'] or ate - timedelta(weeks=12)
+    indicadores = consultar_indicadores(desde, ate, form.cleaned_data['agrupamento'] or 'semana')
+    if form.cleaned_data['formato'] == 'json':
+        return JsonResponse(indicadores)
+    return render(request, 'Chamados/indicadores.html', {
+        'indicadores': indicadores,
+        'atualizado_em': parse_datetime(indicadores['atualizado_em'] or ''),
+        'setores': Chamado.SETOR_CHOICES,
+        'status_choices': Chamado.STATUS_CHOICES,
+    })
+
+def _chamados_visiveis(user):
+    # O dono vê os seus chamados; a equipe vê todos
+    return Chamado.objects.all() if user.is_staff else Chamado.objects.filter(criado_por=user)
+
+
+def _dados_do_anexo(anexo):
+    return {
+        'id': anexo.id,
+        'nome': anexo.nome,
+        'tamanho': anexo.arquivo.tamanho,
+        'tipo': anexo.arquivo.tipo,
+        'url': reverse('Chamados:baixar_anexo', args=[anexo.id]),
+        'previa': reverse('Chamados:previa_anexo', args=[anexo.id]) if anexo.arquivo.previa_status == 'pronta' else None,
+    }
+
+
+@login_required
+@require_POST
+def iniciar_anexo(request, id):
+    chamado = get_object_or_404(_chamados_visiveis(request.user), id=id)
+    try:
+        tamanho = int(request.POST.get('tamanho', ''))
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Informe o tamanho do arquivo.'}, status=400)
+    try:
+        envio = iniciar_envio(chamado, request.user, request.POST.get('nome'), tamanho)
+    except AnexoInvalido as erro:
+        return JsonResponse({'success': False, 'message': str(erro)}, status=400)
+    return JsonResponse({
+        'success': True,
+        'url': reverse('Chamados:envio_anexo', args=[envio.id]),
+        'recebido': 0,
+        'tamanho_parte': TAMANHO_MAXIMO_PARTE,
+    }, status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'PUT'])
+def envio_anexo(request, envio_id):
+    """GET: quanto do envio já chegou (para retomar). PUT: uma parte, com Content-Range."""
+    if request.method == 'GET':
+        envio = get_object_or_404(EnvioAnexo, id=envio_id, enviado_por=request.user)
+        return JsonResponse({'recebido': envio.recebido, 'tamanho': envio.tamanho})
+    try:
+        envio, anexo = receber_parte(envio_id, request.user, request, request.headers.get('Content-Range'))
+    except EnvioAnexo.DoesNotExist:
+        raise Http404
+    except ConflitoDeEnvio as erro:
+        return JsonResponse({'success': False, 'message': str(erro), 'recebido': erro.recebido}, status=409)
+    except AnexoInvalido as erro:
+        return JsonResponse({'success': False, 'message': str(erro)}, status=400)
+    if anexo is None:
+        return JsonResponse({'success': True, 'recebido': envio.recebido, 'tamanho': envio.tamanho})
+    return JsonResponse({'success': True, 'recebido': envio.tamanho, 'anexo': _dados_do_anexo(anexo)}, status=201)
+
+
+@login_required
+def baixar_anexo(request, id):
+    anexo = get_object_or_404(
+        Anexo.objects.select_related('arquivo'), id=id, chamado__in=_chamados_visiveis(request.user)
+    )
+    arquivo = anexo.arquivo
+    disposicao = content_disposition_header(False, anexo.nome)
+
+    if settings.ANEXOS_X_ACCEL_REDIRECT:
+        # O nginx envia o arquivo (e trata o Range) a partir da location interna
+        response = HttpResponse(content_type=arquivo.tipo)
+        response['X-Accel-Redirect'] = settings.ANEXOS_X_ACCEL_REDIRECT.rstrip('/') + '/' + arquivo.arquivo.name
+        response['Content-Disposition'] = disposicao
+        return response
+
+    intervalo = interpretar_range(request.headers.get('Range'), arquivo.tamanho)
+    if intervalo is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{arquivo.tamanho}'
+        return response
+    if intervalo is None:
+        response = FileResponse(arquivo.arquivo.open('rb'), content_type=arquivo.tipo)
+    else:
+        inicio, fim = intervalo
+        response = StreamingHttpResponse(
+            ler_intervalo(arquivo.arquivo.path, inicio, fim), status=206, content_type=arquivo.tipo
+        )
+        response['Content-Length'] = str(fim - inicio + 1)
+        response['Content-Range'] = f'bytes {inicio}-{fim}/{arquivo.tamanho}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposicao
+    # O conteúdo de um anexo nunca muda (o nome do arquivo é o hash)
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+@login_required
+def previa_anexo(request, id):
+    """Miniatura já gerada pelo comando gerar_previas; 404 enquanto não existir."""
+    anexo = get_object_or_404(
+        Anexo.objects.select_related('arquivo'),
+        id=id, arquivo__previa_status='pronta', chamado__in=_chamados_visiveis(request.user),
+    )
+    previa = anexo.arquivo.previa
+    if settings.ANEXOS_X_ACCEL_REDIRECT:
+        response = HttpResponse(content_type='image/jpeg')
+        response['X-Accel-Redirect'] = settings.ANEXOS_X_ACCEL_REDIRECT.rstrip('/') + '/' + previa.name
+    else:
+        response = FileResponse(previa.open('rb'), content_type='image/jpeg')
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
@@ -4,5 +4,7 @@ from .models import Card
 # Register your models here.
 @admin.register(Card)
 class CardAdmin(admin.ModelAdmin):
-    list_display = ('id', 'titulo', 'descricao')
-    search_fields = ('titulo', 'descricao')
\ No newline at end of file
+    list_display = ('id', 'titulo', 'publicar_em', 'expira_em', 'fixado')
+    list_filter = ('fixado', 'publico')
+    search_fields = ('titulo', 'descricao')
+    filter_horizontal = ('publico',)
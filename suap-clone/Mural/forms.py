@@ -1,17 +1,26 @@
 # Mural/forms.py
 from django import forms
+from django.utils import timezone
 from .models import Card
 
 class CardForm(forms.ModelForm):
     class Meta:
         model = Card
-        fields = ['titulo', 'descricao']
+        fields = ['titulo', 'descricao', 'publicar_em', 'expira_em', 'fixado', 'publico']
         widgets = {
             'descricao': forms.Textarea(attrs={
                 'rows': 4,
                 'class': 'form-control',
                 'placeholder': 'Digite a descrição do card...'
             }),
+            'publicar_em': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
+            'expira_em': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
+            'publico': forms.CheckboxSelectMultiple,
+        }
+        help_texts = {
+            'publicar_em': 'Vazio: publica agora.',
+            'expira_em': 'Vazio: fica no mural até ser removido.',
+            'publico': 'Nenhum grupo marcado: visível para todos.',
         }
     
     def __init__(self, *args, **kwargs):
@@ -20,9 +29,25 @@ class CardForm(forms.ModelForm):
             'class': 'form-control',
             'placeholder': 'Título do card'
         })
+        for campo in ('publicar_em', 'expira_em'):
+            self.fields[campo].widget.attrs.update({
+                'class': 'block w-full px-3 py-2 bg-white border border-gray-300 rounded-lg text-gray-700 focus:outline-none focus:ring-2 focus:ring-[#9ec178]'
+            })
+        self.fields['publicar_em'].required = False
         
     def clean_titulo(self):
         titulo = self.cleaned_data.get('titulo')
         if len(titulo) < 5:
             raise forms.ValidationError("O título deve ter pelo menos 5 caracteres.")
-        return titulo
\ No newline at end of file
+        return titulo
+
+    def clean_publicar_em(self):
+        return self.cleaned_data.get('publicar_em') or timezone.now()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        publicar_em = cleaned_data.get('publicar_em')
+        expira_em = cleaned_data.get('expira_em')
+        if publicar_em and expira_em and expira_em <= publicar_em:
+            self.add_error('expira_em', "A expiração deve ser depois da publicação.")
+        return cleaned_data
@@ -0,0 +1,184 @@
+# Mural/listagem.py
+"""
+Feed do mural na página inicial.
+
+Só entram os cards ativos (publicar_em <= agora < expira_em, índice
+card_janela_idx) cujo público inclua o usuário. Os fixados (até
+MAXIMO_FIXADOS) vêm no topo da primeira página; os que passam disso seguem
+no fluxo normal. Os demais são paginados por id, do mais novo para o mais
+antigo: cada trecho traz POR_PAGINA cards e o id a partir do qual o próximo
+começa.
+
+O HTML de cada trecho fica em cache, compartilhado por quem tem o mesmo
+público (a equipe tem sua própria variante, com os botões de edição). As
+chaves levam uma versão que os sinais de Card trocam a cada criação, edição
+ou exclusão (ver signals.py). Cada entrada vale até a próxima publicação ou
+expiração agendada, quando o conjunto de cards ativos muda sozinho, e
+nunca mais que TIMEOUT_MAXIMO: é a rede de segurança caso uma troca de
+versão não chegue a algum processo (ex.: cache em memória, um por processo).
+"""
+import hashlib
+import math
+
+from django.core.cache import cache
+from django.db.models import Exists, Min, OuterRef, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from App.versoes import trocar_versao, versao
+
+from .models import Card
+
+POR_PAGINA = 10
+MAXIMO_FIXADOS = 5
+PREFIXO = 'mural:'
+CHAVE_VERSAO = PREFIXO + 'versao'
+TIMEOUT_MAXIMO = 60 * 10
+
+
+def _versao():
+    return versao(CHAVE_VERSAO)
+
+
+def invalidar():
+    trocar_versao(CHAVE_VERSAO)
+
+
+def grupos_do_publico(user):
+    """Grupos que definem o que o usuário vê; None para a equipe, que vê tudo."""
+    if user.is_staff:
+        return None
+    # Guardado no próprio usuário: a ETag e o feed consultam na mesma requisição
+    if not hasattr(user, '_grupos_do_publico'):
+        user._grupos_do_publico = sorted(user.groups.values_list('id', flat=True))
+    return user._grupos_do_publico
+
+
+def _publicados(agora, grupos):
+    cards = Card.objects.filter(publicar_em__lte=agora)
+    if grupos is not None:
+        publico = Card.publico.through.objects.filter(card_id=OuterRef('pk'))
+        visivel = ~Exists(publico)
+        if grupos:
+            visivel |= Exists(publico.filter(group_id__in=grupos))
+        cards = cards.filter(visivel)
+    return cards
+
+
+def cards_ativos(agora, grupos=None):
+    return _publicados(agora, grupos).filter(Q(expira_em__isnull=True) | Q(expira_em__gt=agora))
+
+
+def _ids_ativos(agora, grupos, limite, antes_de=None, excluir=(), **filtros):
+    """
+    Ids dos `limite` cards ativos mais novos (abaixo de `antes_de`, se dado).
+
+    Uma consulta para cada lado de "expira_em nulo ou > agora": com o OR e o
+    ORDER BY id, o banco prefere percorrer a tabela toda pela chave primária,
+    passando pelos expirados. Separados, os dois lados vão por card_janela_idx.
+    """
+    publicados = _publicados(agora, grupos).filter(**filtros).exclude(id__in=excluir)
+    sem_validade = publicados.filter(expira_em__isnull=True)
+    if antes_de is not None:
+        sem_validade = sem_validade.filter(id__lt=antes_de)
+    ids = list(sem_validade.order_by('-id').values_list('id', flat=True)[:limite])
+    # Com validade ainda por vencer estão só os que estão no ar, poucos: vêm
+    # todos, e o corte pelo cursor fica aqui (no SQL o banco voltaria à chave primária)
+    ids += [
+        id_card for id_card in publicados.filter(expira_em__gt=agora).values_list('id', flat=True)
+        if antes_de is None or id_card < antes_de
+    ]
+    return sorted(ids, reverse=True)[:limite]
+
+
+def cards_fixados(agora, grupos=None):
+    """Os MAXIMO_FIXADOS fixados mais novos, mostrados no topo da primeira página."""
+    ids = _ids_ativos(agora, grupos, MAXIMO_FIXADOS, fixado=True)
+    return list(Card.objects.filter(id__in=ids).order_by('-id')) if ids else []
+
+
+def ids_em_destaque(agora, grupos=None):
+    return _ids_ativos(agora, grupos, MAXIMO_FIXADOS, fixado=True)
+
+
+def pagina_de_cards(agora, grupos=None, antes_de=None, por_pagina=POR_PAGINA, em_destaque=None):
+    """
+    (cards, id do cursor da próxima página ou None) a partir do id `antes_de`.
+    Ficam de fora só os fixados do topo (`em_destaque`); os que passam de
+    MAXIMO_FIXADOS seguem no fluxo normal, pela ordem do id.
+    """
+    if em_destaque is None:
+        em_destaque = ids_em_destaque(agora, grupos)
+    # Um card a mais só para saber se existe próxima página
+    ids = _ids_ativos(agora, grupos, por_pagina + 1, antes_de, excluir=em_destaque)
+    cards = list(Card.objects.filter(id__in=ids[:por_pagina]).order_by('-id')) if ids else []
+    if len(ids) > por_pagina:
+        return cards, ids[por_pagina - 1]
+    return cards, None
+
+
+def proxima_mudanca(agora):
+    """Próximo instante em que algum card entra ou sai do ar (None se nenhum está agendado)."""
+    # Uma consulta por fronteira, cada uma pelo seu índice
+    datas = [
+        Card.objects.filter(publicar_em__gt=agora).aggregate(data=Min('publicar_em'))['data'],
+        Card.objects.filter(expira_em__gt=agora).aggregate(data=Min('expira_em'))['data'],
+    ]
+    datas = [data for data in datas if data is not None]
+    return min(datas) if datas else None
+
+
+def _validade(agora):
+    """Segundos que uma entrada do mural pode ficar em cache a partir de agora."""
+    mudanca = proxima_mudanca(agora)
+    if mudanca is None:
+        return TIMEOUT_MAXIMO
+    return min(math.ceil((mudanca - agora).total_seconds()), TIMEOUT_MAXIMO)
+
+
+def renderizar_cards(cards, equipe, proximo=None, fixados=()):
+    return render_to_string('partials/card_list.html', {
+        'cards': cards, 'fixados': fixados, 'equipe': equipe, 'proximo': proximo,
+    })
+
+
+def _chave(grupos, antes_de):
+    if grupos is None:
+        publico = 'equipe'
+    elif grupos:
+        publico = hashlib.sha256(','.join(map(str, grupos)).encode()).hexdigest()[:16]
+    else:
+        publico = 'todos'
+    return f"{PREFIXO}{_versao()}:{publico}:{antes_de or 'inicio'}"
+
+
+def marca_do_mural():
+    """
+    Identifica o conteúdo atual do mural sem consultar os cards: a versão
+    mais o instante em que ela foi vista pela última vez, guardado até a
+    próxima publicação ou expiração agendada (quando o mural muda sozinho),
+    no máximo TIMEOUT_MAXIMO.
+    """
+    versao = _versao()
+    chave = f'{PREFIXO}{versao}:marca'
+    marca = cache.get(chave)
+    if marca is None:
+        agora = timezone.now()
+        marca = f'{versao}.{agora.timestamp()}'
+        cache.set(chave, marca, _validade(agora))
+    return marca
+
+
+def trecho_do_mural(user, antes_de=None):
+    """HTML de uma página do feed para o público do usuário, lido do cache quando possível."""
+    grupos = grupos_do_publico(user)
+    chave = _chave(grupos, antes_de)
+    trecho = cache.get(chave)
+    if trecho is None:
+        agora = timezone.now()
+        fixados = cards_fixados(agora, grupos) if antes_de is None else ()
+        em_destaque = [card.id for card in fixados] if antes_de is None else None
+        cards, proximo = pagina_de_cards(agora, grupos, antes_de, em_destaque=em_destaque)
+        trecho = renderizar_cards(cards, grupos is None, proximo, fixados)
+        cache.set(chave, trecho, _validade(agora))
+    return trecho
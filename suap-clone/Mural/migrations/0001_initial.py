@@ -8,18 +8,25 @@ class Migration(migrations.Migration):
     initial = True
 
     dependencies = [
+        ('App', '0007_remove_chamado_chat_room_name_alter_chamado_setor_and_more'),
     ]
 
     operations = [
-        migrations.CreateModel(
-            name='Card',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('titulo', models.CharField(max_length=100)),
-                ('descricao', models.TextField()),
+        # As tabelas já existem: foram criadas pelas migrações do app App.
+        # Aqui os modelos só passam a fazer parte do estado deste app.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Card',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('titulo', models.CharField(max_length=100)),
+                        ('descricao', models.TextField()),
+                    ],
+                    options={
+                        'db_table': 'App_card',
+                    },
+                ),
             ],
-            options={
-                'db_table': 'App_card',
-            },
         ),
     ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mural', '0002_alter_card_table'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='expira_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='fixado',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='publicar_em',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='publico',
+            field=models.ManyToManyField(blank=True, related_name='cards', to='auth.group'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['publicar_em', 'expira_em'], name='card_janela_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['expira_em'], name='card_expiracao_idx'),
+        ),
+    ]
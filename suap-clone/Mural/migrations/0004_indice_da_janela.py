@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mural', '0003_janela_de_publicacao'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='card',
+            name='card_janela_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='card',
+            name='card_expiracao_idx',
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['expira_em', 'id'], name='card_janela_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['publicar_em'], name='card_publicacao_idx'),
+        ),
+    ]
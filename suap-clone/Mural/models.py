@@ -1,9 +1,27 @@
+from django.contrib.auth.models import Group
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 class Card(models.Model):
     titulo = models.CharField(max_length=100)
     descricao = models.TextField()
+    # Janela em que o card aparece no mural (sem expira_em: até ser removido)
+    publicar_em = models.DateTimeField(default=timezone.now)
+    expira_em = models.DateTimeField(null=True, blank=True)
+    fixado = models.BooleanField(default=False)
+    # Sem grupos: visível para todos
+    publico = models.ManyToManyField(Group, blank=True, related_name='cards')
 
     def __str__(self):
-        return self.titulo
\ No newline at end of file
+        return self.titulo
+
+    class Meta:
+        indexes = [
+            # Cards ativos: expira_em nulo ou > agora, lidos do mais novo para o mais
+            # antigo. Deixa de fora os expirados, que só se acumulam; também serve
+            # para achar a próxima expiração (validade do mural em cache).
+            models.Index(fields=['expira_em', 'id'], name='card_janela_idx'),
+            # Próxima publicação agendada
+            models.Index(fields=['publicar_em'], name='card_publicacao_idx'),
+        ]
@@ -0,0 +1,17 @@
+# Mural/signals.py
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .listagem import invalidar
+from .models import Card
+
+
+@receiver(post_save, sender=Card)
+@receiver(post_delete, sender=Card)
+@receiver(m2m_changed, sender=Card.publico.through)
+def invalidar_mural(sender, instance, action=None, **kwargs):
+    if action and action.startswith('pre_'):
+        # m2m_changed: basta invalidar depois que o público mudou
+        return
+    transaction.on_commit(invalidar)
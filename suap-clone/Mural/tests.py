@@ -1,3 +1,157 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import listagem
+from .listagem import POR_PAGINA
+from .models import Card
+
+
+class MuralFeedTestCase(TestCase):
+    """ Feed do mural paginado por id e compartilhado em cache """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.staff_user = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        self.cards = [Card.objects.create(titulo=f'Aviso {i:02d}', descricao='...') for i in range(POR_PAGINA + 3)]
+        self.client.login(username='testuser', password='password123')
+
+    def test_home_shows_first_page_and_cursor(self):
+        response = self.client.get(reverse('App:home'))
+        self.assertEqual(response.content.count(b'data-card-id="'), POR_PAGINA)
+        self.assertContains(response, 'Aviso 12')
+        self.assertNotContains(response, 'Aviso 02')
+        proximo = self.cards[3].id
+        self.assertContains(response, f"{reverse('Mural:feed')}?antes={proximo}")
+
+        response = self.client.get(reverse('Mural:feed'), {'antes': proximo})
+        self.assertEqual(response.content.count(b'data-card-id="'), 3)
+        self.assertContains(response, 'Aviso 00')
+        self.assertNotContains(response, 'data-mural-mais')
+
+    def test_feed_is_rendered_once_and_shared(self):
+        self.client.get(reverse('App:home'))
+        self.client.login(username='staffuser', password='password123')
+        self.client.get(reverse('App:home'))
+
+        outro = User.objects.create_user(username='outro', password='password123')
+        self.client.force_login(outro)
+        # Só a sessão, o usuário e os grupos dele: o mural vem do cache
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('App:home'))
+        # A variante da equipe (com edição) não vaza para os demais
+        self.assertNotContains(response, 'Editar Card')
+
+    def test_staff_variant_has_edit_controls(self):
+        self.client.login(username='staffuser', password='password123')
+        self.assertContains(self.client.get(reverse('App:home')), 'Editar Card')
+
+    def test_card_changes_invalidate_the_feed(self):
+        self.client.get(reverse('App:home'))
+        self.client.login(username='staffuser', password='password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('Mural:criar_card'), {'titulo': 'Aviso novo', 'descricao': 'Reunião'})
+        self.assertContains(self.client.get(reverse('App:home')), 'Aviso novo')
+
+        card = Card.objects.get(titulo='Aviso novo')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('Mural:editar_card', args=[card.id]), {'titulo': 'Aviso editado', 'descricao': 'x'})
+        self.assertContains(self.client.get(reverse('App:home')), 'Aviso editado')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('Mural:deletar_card', args=[card.id]))
+        self.assertNotContains(self.client.get(reverse('App:home')), 'Aviso editado')
+
+    def test_evicted_version_does_not_bring_back_stale_pages(self):
+        self.client.get(reverse('App:home'))
+        # O cache despeja a versão, mas os trechos gravados com ela continuam lá
+        cache.delete(listagem.CHAVE_VERSAO)
+        with self.captureOnCommitCallbacks(execute=True):
+            Card.objects.create(titulo='Aviso novo', descricao='Reunião')
+        self.assertContains(self.client.get(reverse('App:home')), 'Aviso novo')
+
+    def test_invalid_cursor_returns_first_page(self):
+        response = self.client.get(reverse('Mural:feed'), {'antes': 'abc'})
+        self.assertContains(response, 'Aviso 12')
+
+
+class JanelaDePublicacaoTestCase(TestCase):
+    """ Publicação agendada, expiração, cards fixados e público por grupo """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.professores = Group.objects.create(name='Professores')
+        self.client.login(username='testuser', password='password123')
+        self.agora = timezone.now()
+
+    def _home(self):
+        return self.client.get(reverse('App:home'))
+
+    def test_only_cards_in_the_active_window_are_shown(self):
+        Card.objects.create(titulo='No ar', descricao='.')
+        Card.objects.create(titulo='Agendado', descricao='.', publicar_em=self.agora + timedelta(hours=1))
+        Card.objects.create(titulo='Expirado', descricao='.', expira_em=self.agora - timedelta(minutes=1),
+                            publicar_em=self.agora - timedelta(days=1))
+        response = self._home()
+        self.assertContains(response, 'No ar')
+        self.assertNotContains(response, 'Agendado')
+        self.assertNotContains(response, 'Expirado')
+
+    def test_pinned_cards_come_first(self):
+        Card.objects.create(titulo='Fixado antigo', descricao='.', fixado=True)
+        Card.objects.create(titulo='Mais recente', descricao='.')
+        conteudo = self._home().content.decode()
+        self.assertLess(conteudo.index('Fixado antigo'), conteudo.index('Mais recente'))
+
+    def test_pinned_cards_beyond_the_cap_stay_in_the_feed(self):
+        for i in range(listagem.MAXIMO_FIXADOS + 2):
+            Card.objects.create(titulo=f'Fixado {i}', descricao='.', fixado=True)
+        for i in range(3):
+            Card.objects.create(titulo=f'Normal {i}', descricao='.')
+        conteudo = self._home().content.decode()
+        self.assertEqual(conteudo.count('data-card-id="'), listagem.MAXIMO_FIXADOS + 5)
+        # Os fixados mais antigos descem para o fluxo normal, depois dos cards mais novos
+        self.assertLess(conteudo.index('Fixado 2'), conteudo.index('Normal 2'))
+        self.assertLess(conteudo.index('Normal 0'), conteudo.index('Fixado 1'))
+        self.assertLess(conteudo.index('Fixado 1'), conteudo.index('Fixado 0'))
+
+    def test_audience_by_group(self):
+        card = Card.objects.create(titulo='Só professores', descricao='.')
+        card.publico.add(self.professores)
+        self.assertNotContains(self._home(), 'Só professores')
+
+        self.user.groups.add(self.professores)
+        self.assertContains(self._home(), 'Só professores')
+
+    def test_cache_expires_at_the_next_boundary(self):
+        Card.objects.create(titulo='No ar', descricao='.', expira_em=self.agora + timedelta(hours=2))
+        Card.objects.create(titulo='Agendado', descricao='.', publicar_em=self.agora + timedelta(minutes=5))
+        with mock.patch.object(listagem.cache, 'set', wraps=listagem.cache.set) as gravar:
+            self._home()
+        timeout = gravar.call_args.args[2]
+        self.assertAlmostEqual(timeout, 300, delta=5)
+
+    def test_cache_without_schedule_keeps_a_safety_ttl(self):
+        # A troca de versão pode não chegar a todos os processos; a entrada expira de qualquer jeito
+        Card.objects.create(titulo='No ar', descricao='.')
+        Card.objects.create(titulo='Agendado', descricao='.', publicar_em=self.agora + timedelta(days=3))
+        with mock.patch.object(listagem.cache, 'set', wraps=listagem.cache.set) as gravar:
+            self._home()
+        self.assertEqual(gravar.call_args.args[2], listagem.TIMEOUT_MAXIMO)
 
-# Create your tests here.
+    def test_form_rejects_expiry_before_publication(self):
+        staff = User.objects.create_user(username='staffuser', password='password123', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.post(reverse('Mural:criar_card'), {
+            'titulo': 'Aviso com prazo', 'descricao': '.',
+            'publicar_em': '2030-01-02T10:00', 'expira_em': '2030-01-01T10:00',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Card.objects.exists())
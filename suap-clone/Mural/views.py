@@ -1,18 +1,38 @@
 # Mural/views.py
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_GET, require_http_methods
 from .models import Card
 from .forms import CardForm
+from .listagem import renderizar_cards, trecho_do_mural
+
+def _e_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+@login_required
+@require_GET
+def feed(request):
+    # Próximo trecho do mural (rolagem infinita), a partir do id informado
+    try:
+        antes_de = int(request.GET['antes'])
+    except (KeyError, ValueError):
+        antes_de = None
+    return HttpResponse(trecho_do_mural(request.user, antes_de))
 
 @staff_member_required
 def criar_card(request):
     if request.method == 'POST':
         form = CardForm(request.POST)
         if form.is_valid():
-            form.save()
+            card = form.save()
+            if _e_ajax(request):
+                # O card já renderizado, para entrar no topo do mural sem recarregar
+                return JsonResponse({'success': True, 'id': card.id, 'html': renderizar_cards([card], equipe=True)})
             return redirect('App:home')
+        if _e_ajax(request):
+            return JsonResponse({'success': False, 'errors': form.errors}, status=400)
     else:
         form = CardForm()
     return render(request, 'criar_card.html', {'form': form})
@@ -35,6 +55,6 @@ def editar_card(request, id):
 def deletar_card(request, id):
     card = get_object_or_404(Card, id=id)
     card.delete()
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+    if _e_ajax(request):
         return JsonResponse({'success': True})
-    return redirect('App:home')
\ No newline at end of file
+    return redirect('App:home')
@@ -5,4 +5,24 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
\ No newline at end of file
+# Inicializa o Django antes de importar qualquer coisa que use os models
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from App.fila_mensagens import ciclo_de_vida  # noqa: E402
+from App.routing import websocket_urlpatterns as chat_urlpatterns  # noqa: E402
+from Chamados.routing import websocket_urlpatterns as chamados_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    # Os sockets se autenticam pelo cookie de sessão: sem conferir o Origin,
+    # qualquer outro site poderia abri-los em nome do usuário logado
+    'websocket': AllowedHostsOriginValidator(
+        AuthMiddlewareStack(URLRouter(chat_urlpatterns + chamados_urlpatterns))
+    ),
+    # Grava as mensagens do chat ainda na fila quando o servidor encerra
+    'lifespan': ciclo_de_vida,
+})
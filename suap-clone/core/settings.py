@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 from django.contrib.messages import constants as messages
 from pathlib import Path, os
-from decouple import config
+from decouple import Choices, config
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -80,14 +80,47 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 # Adicione esta linha para o ASGI Application
 ASGI_APPLICATION = 'core.asgi.application' 
-CHANNEL_LAYERS = {
-    'default': {
+# Camada de canais: 'redis' em produção (vários processos), 'memory' para um
+# processo só (desenvolvimento, testes e benchmark sem Redis).
+CHANNEL_LAYER = config('CHANNEL_LAYER', default='redis', cast=Choices(['memory', 'redis']))
+REDIS_HOST = config('REDIS_HOST', default='127.0.0.1')
+REDIS_PORT = config('REDIS_PORT', default=6379, cast=int)
+CHANNEL_LAYERS_DISPONIVEIS = {
+    'memory': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        # O padrão (100) descarta mensagens de grupo em rajadas de uma sala cheia
+        'CONFIG': {'capacity': 1000},
+    },
+    'redis': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer', 
         'CONFIG': {
-            "hosts": [('127.0.0.1', 6379)], # Onde o Redis está rodando
+            "hosts": [(REDIS_HOST, REDIS_PORT)], # Onde o Redis está rodando
         },
     },
 }
+CHANNEL_LAYERS = {
+    'default': CHANNEL_LAYERS_DISPONIVEIS[CHANNEL_LAYER],
+}
+
+# Cache: precisa ser o mesmo para todos os processos em produção. O limite de
+# criação de chamados, a deduplicação por Idempotency-Key e as versões das
+# páginas em cache (mural, "Meus chamados", calendário) só valem entre
+# processos com um cache compartilhado. 'memory' (um cache por processo) serve
+# apenas para um processo só; por padrão acompanha a camada de canais.
+CACHE = config('CACHE', default=CHANNEL_LAYER, cast=Choices(['memory', 'redis']))
+CACHES_DISPONIVEIS = {
+    'memory': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        # Banco 1: o 0 fica com a camada de canais
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/1',
+    },
+}
+CACHES = {
+    'default': CACHES_DISPONIVEIS[CACHE],
+}
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
@@ -150,6 +183,9 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_ROOT = os.path.join(BASE_DIR,'media')
 MEDIA_URL ='/media/'
+# Prefixo de uma location "internal" do nginx apontando para MEDIA_ROOT; se
+# definido, o download de anexos responde com X-Accel-Redirect e o nginx envia o arquivo
+ANEXOS_X_ACCEL_REDIRECT = config('ANEXOS_X_ACCEL_REDIRECT', default='')
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
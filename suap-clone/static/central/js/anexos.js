@@ -0,0 +1,103 @@
+// Envio de anexos em partes: cada parte vai num PUT com Content-Range e,
+// se a conexão cair, o envio continua de onde o servidor parou.
+(function () {
+    const TENTATIVAS = 5;
+
+    function csrfToken() {
+        const campo = document.querySelector('[name=csrfmiddlewaretoken]');
+        return campo ? campo.value : '';
+    }
+
+    async function enviarParte(url, arquivo, inicio, tamanhoParte) {
+        const fim = Math.min(inicio + tamanhoParte, arquivo.size) - 1;
+        const resposta = await fetch(url, {
+            method: 'PUT',
+            body: arquivo.slice(inicio, fim + 1),
+            headers: {
+                'Content-Type': 'application/octet-stream',
+                'Content-Range': `bytes ${inicio}-${fim}/${arquivo.size}`,
+                'X-CSRFToken': csrfToken(),
+            },
+        });
+        const dados = await resposta.json();
+        if (!resposta.ok && resposta.status !== 409) {
+            throw new Error(dados.message || `Erro no servidor: ${resposta.status}`);
+        }
+        // 409: o servidor está em outra posição; seguimos a partir dela
+        return dados;
+    }
+
+    async function enviar(container, arquivo) {
+        const progresso = container.querySelector('[data-progresso-anexo]');
+        const corpo = new FormData();
+        corpo.append('nome', arquivo.name);
+        corpo.append('tamanho', arquivo.size);
+        const inicio = await fetch(container.dataset.urlInicio, {
+            method: 'POST', body: corpo, headers: { 'X-CSRFToken': csrfToken() },
+        });
+        const envio = await inicio.json();
+        if (!inicio.ok) {
+            throw new Error(envio.message);
+        }
+
+        progresso.classList.remove('hidden');
+        let recebido = envio.recebido;
+        let falhas = 0;
+        while (true) {
+            let dados;
+            try {
+                dados = await enviarParte(envio.url, arquivo, recebido, envio.tamanho_parte);
+            } catch (erro) {
+                if (++falhas >= TENTATIVAS || !(erro instanceof TypeError)) throw erro;
+                // Falha de rede: pergunta ao servidor quanto já chegou e retoma
+                await new Promise(function (ok) { setTimeout(ok, 1000 * falhas); });
+                dados = await (await fetch(envio.url)).json();
+            }
+            recebido = dados.recebido;
+            progresso.value = Math.round(100 * recebido / arquivo.size);
+            if (dados.anexo) return dados.anexo;
+        }
+    }
+
+    function mostrarAnexo(container, anexo) {
+        const lista = container.querySelector('[data-lista-anexos]');
+        lista.querySelectorAll('[data-sem-anexos]').forEach(function (vazio) { vazio.remove(); });
+        const item = document.createElement('li');
+        item.className = 'flex items-center gap-2';
+        // Arquivo já conhecido (deduplicado) pode chegar com a miniatura pronta
+        if (anexo.previa) {
+            const previa = document.createElement('img');
+            previa.src = anexo.previa;
+            previa.alt = anexo.nome;
+            previa.className = 'w-16 h-16 object-cover rounded border border-gray-200';
+            item.append(previa);
+        }
+        const link = document.createElement('a');
+        link.href = anexo.url;
+        link.target = '_blank';
+        link.className = 'text-green-600 hover:underline';
+        link.textContent = anexo.nome;
+        item.append(link);
+        lista.append(item);
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-anexos]').forEach(function (container) {
+            const campo = container.querySelector('[data-arquivo-anexo]');
+            campo.addEventListener('change', async function () {
+                const arquivo = campo.files[0];
+                if (!arquivo) return;
+                campo.disabled = true;
+                try {
+                    mostrarAnexo(container, await enviar(container, arquivo));
+                } catch (erro) {
+                    alert(`Erro ao enviar anexo: ${erro.message}`);
+                } finally {
+                    campo.disabled = false;
+                    campo.value = '';
+                    container.querySelector('[data-progresso-anexo]').classList.add('hidden');
+                }
+            });
+        });
+    });
+})();
@@ -0,0 +1,44 @@
+// Rolagem infinita do mural: o marcador [data-mural-mais] no fim de cada
+// trecho aponta para o próximo; quando ele aparece na tela (ou o botão é
+// clicado), o trecho seguinte é buscado e entra no lugar do marcador.
+(function () {
+    async function carregarMais(marcador) {
+        if (marcador.dataset.carregando) return;
+        marcador.dataset.carregando = '1';
+        try {
+            const resposta = await fetch(marcador.dataset.url);
+            if (!resposta.ok) throw new Error(`Erro no servidor: ${resposta.status}`);
+            const modelo = document.createElement('template');
+            modelo.innerHTML = await resposta.text();
+            const proximo = modelo.content.querySelector('[data-mural-mais]');
+            marcador.replaceWith(modelo.content);
+            if (proximo) observar(proximo);
+        } catch (erro) {
+            console.error(erro);
+            delete marcador.dataset.carregando;
+        }
+    }
+
+    const observador = 'IntersectionObserver' in window ? new IntersectionObserver(function (entradas) {
+        entradas.forEach(function (entrada) {
+            if (entrada.isIntersecting) {
+                observador.unobserve(entrada.target);
+                carregarMais(entrada.target);
+            }
+        });
+    }) : null;
+
+    function observar(marcador) {
+        if (observador) observador.observe(marcador);
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        const mural = document.getElementById('mural');
+        if (!mural) return;
+        mural.addEventListener('click', function (e) {
+            const marcador = e.target.closest('[data-mural-mais]');
+            if (marcador) carregarMais(marcador);
+        });
+        mural.querySelectorAll('[data-mural-mais]').forEach(observar);
+    });
+})();
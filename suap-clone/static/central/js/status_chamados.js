@@ -0,0 +1,39 @@
+// Atualiza o status dos chamados na página assim que a equipe o altera,
+// recebendo os eventos pelo WebSocket /ws/chamados/ (sem recarregar a página).
+(function () {
+    const CLASSES_STATUS = {
+        aberto: 'bg-green-100 text-green-800',
+        em_analise: 'bg-yellow-100 text-yellow-800',
+        resolvido: 'bg-blue-100 text-blue-800',
+        fechado: 'bg-gray-100 text-gray-800',
+    };
+    const TODAS_AS_CLASSES = Object.values(CLASSES_STATUS).join(' ').split(' ');
+
+    function atualizarStatus(evento) {
+        const seletor = `[data-chamado-id="${evento.chamado_id}"] [data-status-badge]`;
+        document.querySelectorAll(seletor).forEach(function (badge) {
+            badge.classList.remove(...TODAS_AS_CLASSES);
+            badge.classList.add(...(CLASSES_STATUS[evento.status] || CLASSES_STATUS.fechado).split(' '));
+            badge.textContent = evento.status_display;
+        });
+        // Outras partes da página (ex.: a linha do tempo) podem reagir ao evento
+        document.dispatchEvent(new CustomEvent('chamado:status', { detail: evento }));
+    }
+
+    function conectar(espera) {
+        const protocolo = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${protocolo}://${window.location.host}/ws/chamados/`);
+        socket.onopen = function () { espera = 1000; };
+        socket.onmessage = function (mensagem) { atualizarStatus(JSON.parse(mensagem.data)); };
+        // Reconecta com espera crescente (até 30s) se a conexão cair
+        socket.onclose = function () {
+            setTimeout(function () { conectar(Math.min(espera * 2, 30000)); }, espera);
+        };
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        if (document.querySelector('[data-chamado-id]')) {
+            conectar(1000);
+        }
+    });
+})();